@@ -0,0 +1,151 @@
+"""Benchmark per-step executor overhead on chain, diamond and fan-out DAGs.
+
+Steps are trivial coroutines, so the measured time is the executor's own
+scheduling, dataflow and recovery overhead. Results can be compared against
+stored baselines to catch regressions; baselines are machine-specific, so
+record them on the machine that checks them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from axiomflow.dsl.plan import ExecutionPlan  # noqa: E402
+from axiomflow.runtime.executor import WorkflowExecutor  # noqa: E402
+from axiomflow.runtime.recovery import SINGLE_ATTEMPT  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "executor_overhead.json"
+
+
+def _step(sid: str, parents: list[str]) -> Dict[str, Any]:
+    return {
+        "id": sid,
+        "inputs": {f"in{i}": f"{p}.out" for i, p in enumerate(parents)},
+        "outputs": {"out": "int"},
+    }
+
+
+def chain(steps: int) -> Dict[str, Any]:
+    """``s0 -> s1 -> ... -> sN``."""
+    nodes = [_step(f"s{i}", [f"s{i - 1}"] if i else []) for i in range(steps)]
+    edges = [{"from": f"s{i - 1}", "to": f"s{i}"} for i in range(1, steps)]
+    return {"steps": nodes, "edges": edges}
+
+
+def diamond(steps: int) -> Dict[str, Any]:
+    """Repeated ``top -> (left, right) -> bottom`` diamonds in series."""
+    nodes = [_step("d0", [])]
+    edges = []
+    prev = "d0"
+    for k in range(max(1, (steps - 1) // 3)):
+        left, right, bottom = f"l{k}", f"r{k}", f"d{k + 1}"
+        nodes += [_step(left, [prev]), _step(right, [prev])]
+        nodes.append(_step(bottom, [left, right]))
+        edges += [
+            {"from": prev, "to": left},
+            {"from": prev, "to": right},
+            {"from": left, "to": bottom},
+            {"from": right, "to": bottom},
+        ]
+        prev = bottom
+    return {"steps": nodes, "edges": edges}
+
+
+def fanout(steps: int) -> Dict[str, Any]:
+    """One root feeding ``steps - 1`` independent leaves."""
+    nodes = [_step("root", [])]
+    nodes += [_step(f"leaf{i}", ["root"]) for i in range(steps - 1)]
+    edges = [{"from": "root", "to": f"leaf{i}"} for i in range(steps - 1)]
+    return {"steps": nodes, "edges": edges}
+
+
+SHAPES: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "chain": chain,
+    "diamond": diamond,
+    "fanout": fanout,
+}
+
+
+async def _noop(**inputs: Any) -> Dict[str, int]:
+    return {"out": 1}
+
+
+def measure(shape: str, steps: int, repeat: int) -> Dict[str, float]:
+    """Return the best per-step overhead and throughput of ``shape``.
+
+    The fastest of ``repeat`` runs is reported, as the least disturbed by
+    other load on the machine.
+    """
+    plan = ExecutionPlan.from_workflow(SHAPES[shape](steps))
+    funcs = {step.id: _noop for step in plan.steps}
+    # The steps never fail; measure the single-attempt path the baselines use.
+    executor = WorkflowExecutor(max_concurrency=None, default_retry=SINGLE_ATTEMPT)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(executor.run_workflow(plan, funcs))
+        timings.append(time.perf_counter() - start)
+    elapsed = min(timings)
+    count = len(plan.steps)
+    return {
+        "steps": count,
+        "us_per_step": round(elapsed / count * 1e6, 2),
+        "steps_per_second": round(count / elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--shape", choices=sorted(SHAPES), action="append")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="fail if any shape is slower than its baseline beyond --tolerance",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--update", action="store_true", help="store new baselines")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    args = parser.parse_args()
+
+    baselines = {}
+    if args.baseline.exists():
+        baselines = json.loads(args.baseline.read_text())
+    results = {}
+    regressions = []
+    for shape in args.shape or sorted(SHAPES):
+        result = results[shape] = measure(shape, args.steps, args.repeat)
+        line = (
+            f"{shape:8} steps={result['steps']:<6} "
+            f"{result['us_per_step']:8.1f} us/step "
+            f"{result['steps_per_second']:10.0f} steps/s"
+        )
+        base = baselines.get(shape)
+        if base is not None:
+            ratio = result["us_per_step"] / base["us_per_step"]
+            line += f"  ({ratio:.2f}x baseline)"
+            if ratio > 1.0 + args.tolerance:
+                regressions.append(shape)
+        print(line)
+
+    if args.update:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        baselines.update(results)
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baselines written to {args.baseline}")
+    if args.check and regressions:
+        print(f"regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark validation and ordering of large generated workflows."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from axiomflow.core.graph import StepGraph  # noqa: E402
+from axiomflow.dsl.parser import WorkflowParser  # noqa: E402
+
+
+def generate_workflow(steps: int, fan_in: int, seed: int) -> Dict[str, Any]:
+    """Generate a random DAG where each step depends on earlier steps."""
+    rng = random.Random(seed)
+    nodes = []
+    edges = []
+    for i in range(steps):
+        parents = {rng.randrange(i) for _ in range(min(i, fan_in))}
+        nodes.append(
+            {
+                "id": f"s{i}",
+                "persona": "dev",
+                "inputs": {f"in{p}": f"s{p}.result" for p in parents},
+                "outputs": {"result": "string"},
+            }
+        )
+        edges.extend({"from": f"s{p}", "to": f"s{i}"} for p in parents)
+    return {"personas": [{"id": "dev"}], "gates": [], "steps": nodes, "edges": edges}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=100_000)
+    parser.add_argument("--fan-in", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workflow = generate_workflow(args.steps, args.fan_in, args.seed)
+    edges = len(workflow["edges"])
+
+    start = time.perf_counter()
+    WorkflowParser()._validate_semantics(workflow)
+    validated = time.perf_counter()
+    graph = StepGraph.from_workflow(workflow)
+    graph.topological_order()
+    ordered = time.perf_counter()
+    levels = graph.levels()
+    levelled = time.perf_counter()
+
+    print(f"steps={args.steps} edges={edges} levels={len(levels)}")
+    print(f"validate: {(validated - start) * 1000:.1f} ms")
+    print(f"order:    {(ordered - validated) * 1000:.1f} ms")
+    print(f"levels:   {(levelled - ordered) * 1000:.1f} ms")
+    print(f"total:    {(levelled - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
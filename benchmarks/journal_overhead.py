@@ -0,0 +1,44 @@
+"""Benchmark run journal write overhead per step."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from axiomflow.runtime.journal import RunJournal, result_digest  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=10_000)
+    parser.add_argument("--commit-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    result = {"value": list(range(16)), "runtime": 0.1, "cost": 0.01}
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = RunJournal(
+            Path(tmp) / "bench.jsonl", commit_interval=args.commit_interval
+        )
+        start = time.perf_counter()
+        for i in range(args.steps):
+            journal.append("step_start", step=f"s{i}")
+            journal.append(
+                "step_finish", step=f"s{i}", digest=result_digest(result), result=result
+            )
+            journal.maybe_commit()
+        journal.close()
+        elapsed = time.perf_counter() - start
+
+    stats = journal.stats
+    print(f"steps={args.steps} records={stats.records} commits={stats.commits}")
+    print(f"per step (total): {elapsed / args.steps * 1e6:.1f} us")
+    print(f"per record (fsync): {stats.seconds_per_record * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Index-backed dependency graph shared by the DSL parser and executor.
+
+The graph is built once from a list of step IDs and ``from``/``to`` edges.
+Nodes are mapped to dense integer indexes so ordering, cycle detection and
+level grouping all run iteratively in ``O(V + E)`` time without recursion.
+
+Example:
+    >>> graph = StepGraph(["a", "b", "c"], [("a", "b"), ("a", "c")])
+    >>> graph.topological_order()
+    ['a', 'b', 'c']
+    >>> graph.levels()
+    [['a'], ['b', 'c']]
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+
+class CycleError(ValueError):
+    """Raised when a dependency graph contains a cycle.
+
+    Attributes:
+        cycle: Step IDs forming the cycle, with the first node repeated at
+            the end (e.g. ``["a", "b", "a"]``).
+    """
+
+    def __init__(self, cycle: List[str]) -> None:
+        self.cycle = cycle
+        super().__init__(f"Circular dependency detected: {' -> '.join(cycle)}")
+
+
+class StepGraph:
+    """Directed graph of workflow steps with adjacency and in-degree indexes.
+
+    Args:
+        nodes: Step IDs in declaration order.
+        edges: ``(from, to)`` pairs referencing IDs in ``nodes``.
+
+    Raises:
+        ValueError: If a node is duplicated or an edge references an unknown
+            node.
+    """
+
+    __slots__ = ("nodes", "index", "successors", "in_degree")
+
+    def __init__(self, nodes: Iterable[str], edges: Iterable[Tuple[str, str]]) -> None:
+        self.nodes: List[str] = list(nodes)
+        self.index: Dict[str, int] = dict(zip(self.nodes, range(len(self.nodes))))
+        if len(self.index) != len(self.nodes):
+            seen: set[str] = set()
+            dup = next(n for n in self.nodes if n in seen or seen.add(n))
+            raise ValueError(f"Duplicate step: {dup}")
+        self.successors: List[List[int]] = [[] for _ in self.nodes]
+        self.in_degree: List[int] = [0] * len(self.nodes)
+        index = self.index
+        successors = self.successors
+        in_degree = self.in_degree
+        for src, dst in edges:
+            try:
+                v = index[dst]
+                successors[index[src]].append(v)
+            except KeyError as exc:
+                raise ValueError(f"Unknown step in edge: {exc.args[0]}") from None
+            in_degree[v] += 1
+
+    @classmethod
+    def from_workflow(cls, workflow: Mapping[str, Any]) -> "StepGraph":
+        """Build a graph from a workflow's ``steps`` and ``edges``."""
+        return cls(
+            (step["id"] for step in workflow.get("steps", [])),
+            ((edge["from"], edge["to"]) for edge in workflow.get("edges", [])),
+        )
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def topological_indexes(self) -> List[int]:
+        """Return node indexes in dependency order (Kahn's algorithm).
+
+        Nodes that become ready at the same time keep their declaration
+        order, so the result is deterministic.
+
+        Raises:
+            CycleError: If the graph contains a cycle.
+        """
+        degree = self.in_degree[:]
+        successors = self.successors
+        order = [i for i, deg in enumerate(degree) if deg == 0]
+        pos = 0
+        while pos < len(order):
+            for nxt in successors[order[pos]]:
+                degree[nxt] -= 1
+                if degree[nxt] == 0:
+                    order.append(nxt)
+            pos += 1
+        if len(order) != len(self.nodes):
+            raise CycleError(self.find_cycle() or [])
+        return order
+
+    def topological_order(self) -> List[str]:
+        """Return step IDs in dependency order.
+
+        Raises:
+            CycleError: If the graph contains a cycle.
+        """
+        nodes = self.nodes
+        return [nodes[i] for i in self.topological_indexes()]
+
+    def find_cycle(self) -> List[str] | None:
+        """Return one cycle as a list of step IDs, or ``None`` if acyclic.
+
+        Uses an iterative depth-first search so arbitrarily deep chains do
+        not hit Python's recursion limit.
+        """
+        white, grey, black = 0, 1, 2
+        colour = [white] * len(self.nodes)
+        parent = [-1] * len(self.nodes)
+        successors = self.successors
+        for start in range(len(self.nodes)):
+            if colour[start] != white:
+                continue
+            colour[start] = grey
+            stack: List[Tuple[int, int]] = [(start, 0)]
+            while stack:
+                node, child = stack[-1]
+                if child < len(successors[node]):
+                    stack[-1] = (node, child + 1)
+                    nxt = successors[node][child]
+                    if colour[nxt] == white:
+                        colour[nxt] = grey
+                        parent[nxt] = node
+                        stack.append((nxt, 0))
+                    elif colour[nxt] == grey:
+                        cycle = [nxt]
+                        cur = node
+                        while cur != nxt:
+                            cycle.append(cur)
+                            cur = parent[cur]
+                        cycle.append(nxt)
+                        cycle.reverse()
+                        return [self.nodes[i] for i in cycle]
+                else:
+                    colour[node] = black
+                    stack.pop()
+        return None
+
+    def upward_ranks(self, weights: Sequence[float]) -> List[float]:
+        """Return, for each node, the heaviest path from it to a sink.
+
+        The rank of a node is its own weight plus the largest rank among its
+        successors, so the maximum rank is the critical-path length of the
+        graph.
+
+        Args:
+            weights: Per-node weights indexed like :attr:`nodes`.
+
+        Raises:
+            CycleError: If the graph contains a cycle.
+        """
+        return upward_ranks(self.successors, self.topological_indexes(), weights)
+
+    def levels(self) -> List[List[str]]:
+        """Group step IDs into wavefronts that can run concurrently.
+
+        Level ``0`` holds the steps without dependencies; every other step
+        sits one level after its deepest predecessor.
+
+        Raises:
+            CycleError: If the graph contains a cycle.
+        """
+        depth = [0] * len(self.nodes)
+        groups: List[List[str]] = []
+        for i in self.topological_indexes():
+            for nxt in self.successors[i]:
+                if depth[i] + 1 > depth[nxt]:
+                    depth[nxt] = depth[i] + 1
+            if depth[i] == len(groups):
+                groups.append([])
+            groups[depth[i]].append(self.nodes[i])
+        return groups
+
+
+def upward_ranks(
+    successors: Sequence[Sequence[int]],
+    order: Sequence[int],
+    weights: Sequence[float],
+) -> List[float]:
+    """Return, for each node, the heaviest path from it to a sink.
+
+    Args:
+        successors: Successor indexes of each node.
+        order: Node indexes in topological order.
+        weights: Per-node weights.
+    """
+    ranks = [0.0] * len(successors)
+    for i in reversed(order):
+        best = 0.0
+        for nxt in successors[i]:
+            if ranks[nxt] > best:
+                best = ranks[nxt]
+        ranks[i] = weights[i] + best
+    return ranks
+
+
+__all__ = ["CycleError", "StepGraph", "upward_ranks"]
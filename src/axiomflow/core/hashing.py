@@ -0,0 +1,29 @@
+"""Canonical hashing helpers.
+
+Mappings are serialised to JSON with sorted keys before hashing so that the
+digest depends only on content, never on insertion order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Mapping
+
+
+def canonical_json(data: Mapping[str, Any]) -> bytes:
+    """Serialise ``data`` to canonical (key-sorted) JSON bytes."""
+    return json.dumps(dict(data), sort_keys=True).encode("utf-8")
+
+
+def canonical_digest(data: Mapping[str, Any]) -> str:
+    """Return the SHA-256 hex digest of ``data``'s canonical JSON form.
+
+    Raises:
+        TypeError: If ``data`` contains values that are not JSON
+            serialisable.
+    """
+    return hashlib.sha256(canonical_json(data)).hexdigest()
+
+
+__all__ = ["canonical_digest", "canonical_json"]
@@ -0,0 +1,115 @@
+"""Compact log-bucketed histograms for latency percentiles."""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Mapping
+
+
+class LatencyHistogram:
+    """Histogram of positive values with logarithmically sized buckets.
+
+    Recording is O(1) and memory grows with the logarithm of the value
+    range rather than the number of samples. Quantiles are accurate to a
+    relative error of about ``(growth - 1) / 2``.
+
+    Args:
+        growth: Ratio between consecutive bucket bounds.
+        min_value: Values at or below this fall into the first bucket.
+    """
+
+    __slots__ = (
+        "growth",
+        "min_value",
+        "_log_growth",
+        "_buckets",
+        "count",
+        "total",
+        "min",
+        "max",
+    )
+
+    def __init__(self, growth: float = 1.05, min_value: float = 1e-6) -> None:
+        if growth <= 1.0:
+            raise ValueError("growth must be greater than 1")
+        self.growth = growth
+        self.min_value = min_value
+        self._log_growth = math.log(growth)
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Add one sample."""
+        if value <= self.min_value:
+            bucket = 0
+        else:
+            bucket = 1 + int(math.log(value / self.min_value) / self._log_growth)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        """Arithmetic mean of the samples, ``0.0`` when empty."""
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Return the approximate ``q``-quantile (``0 <= q <= 1``).
+
+        Raises:
+            ValueError: If the histogram is empty or ``q`` is out of range.
+        """
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be between 0 and 1")
+        if not self.count:
+            raise ValueError("quantile of an empty histogram")
+        if q == 1.0:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen > rank:
+                break
+        if bucket == 0:
+            value = self.min_value
+        else:
+            # Geometric midpoint of the bucket's bounds.
+            value = self.min_value * self.growth ** (bucket - 0.5)
+        return min(max(value, self.min), self.max)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the histogram as a JSON-serialisable dictionary."""
+        return {
+            "growth": self.growth,
+            "min_value": self.min_value,
+            "buckets": {str(k): n for k, n in self._buckets.items()},
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "LatencyHistogram":
+        """Rebuild a histogram saved with :meth:`to_dict`."""
+        hist = cls(growth=data["growth"], min_value=data["min_value"])
+        hist._buckets = {int(k): int(n) for k, n in data["buckets"].items()}
+        hist.count = sum(hist._buckets.values())
+        hist.total = float(data["total"])
+        if hist.count:
+            hist.min = float(data["min"])
+        hist.max = float(data["max"])
+        return hist
+
+
+__all__ = ["LatencyHistogram"]
@@ -0,0 +1,42 @@
+"""Retry policies shared by the runtime and the dry-run simulator."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Configuration for retry behaviour."""
+
+    max_attempts: int = 3
+    strategy: str = "exponential"
+    base_delay: float = 0.1
+    max_delay: float = 1.0
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "RetryPolicy":
+        """Build a policy from a step's ``retry`` settings in the DSL."""
+        defaults = cls()
+        return cls(
+            max_attempts=int(config.get("max_attempts", defaults.max_attempts)),
+            strategy=str(config.get("backoff_strategy", defaults.strategy)),
+            base_delay=float(config.get("base_delay", defaults.base_delay)),
+            max_delay=float(config.get("max_delay", defaults.max_delay)),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Compute delay before the next attempt."""
+        if self.strategy == "linear":
+            delay = self.base_delay * attempt
+        else:
+            delay = self.base_delay * (2 ** (attempt - 1))
+        return min(delay, self.max_delay)
+
+
+SINGLE_ATTEMPT = RetryPolicy(max_attempts=1)
+"""Policy of steps that must not be retried."""
+
+
+__all__ = ["SINGLE_ATTEMPT", "RetryPolicy"]
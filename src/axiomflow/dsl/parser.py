@@ -4,16 +4,42 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Set
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Protocol, Tuple
 
 import yaml
 
+from axiomflow.core.graph import CycleError, StepGraph
+
+from .plan import EdgeCondition, ExecutionPlan
+from .simulator import simulate
+
 logger = logging.getLogger(__name__)
 
 
+class LearnedEstimates(Protocol):
+    """Source of step estimates learned from past runs.
+
+    Implemented by :class:`~axiomflow.runtime.estimates.EstimateStore`; the
+    DSL layer only needs to have the learned values applied to a parsed
+    workflow.
+    """
+
+    def apply(self, workflow: Dict[str, Any]) -> int:
+        """Overwrite the static estimates of the workflow's steps in place."""
+
+
 @dataclass
 class WorkflowParser:
-    """Parser for workflow DSL definitions."""
+    """Parser for workflow DSL definitions.
+
+    Args:
+        estimates: Store of runtimes and costs learned from past runs.
+            Steps with enough history get the learned values as their
+            ``estimated_runtime`` and ``estimated_cost``.
+    """
+
+    estimates: LearnedEstimates | None = None
 
     def parse(self, text: str) -> Dict[str, Any]:
         """Parse workflow DSL text into an AST.
@@ -28,6 +54,14 @@ class WorkflowParser:
             SyntaxError: If the input text is not valid YAML/JSON.
             ValueError: If semantic validation fails.
         """
+        return self._parse(text)[0]
+
+    def _parse(self, text: str) -> Tuple[Dict[str, Any], StepGraph]:
+        """Parse ``text``, also returning the step graph built to validate it.
+
+        The graph is handed on to estimation, ordering and plan compilation
+        so that a parse builds it only once.
+        """
         logger.debug("Parsing workflow DSL")
         try:
             data = yaml.safe_load(text)
@@ -39,11 +73,35 @@ class WorkflowParser:
             raise ValueError("Missing workflow section")
         workflow = data["workflow"]
         self._validate_schema(workflow)
-        self._validate_semantics(workflow)
+        graph = self._validate_semantics(workflow)
+        if self.estimates is not None:
+            self.estimates.apply(workflow)
         workflow["resource_estimates"] = self._estimate_step_resources(workflow)
-        workflow["estimates"] = self._estimate_totals(workflow)
+        workflow["estimates"] = self._estimate_totals(workflow, graph)
         logger.debug("Workflow parsed successfully")
-        return workflow
+        return workflow, graph
+
+    def compile(self, text: str) -> ExecutionPlan:
+        """Parse workflow DSL text into an immutable execution plan.
+
+        Plans are cached by source text, so repeated calls for the same
+        workflow version skip parsing and validation entirely and return
+        the shared plan instance. Parsers with an estimate store compile a
+        fresh plan on every call, since learned estimates keep changing.
+
+        Args:
+            text: YAML or JSON workflow definition.
+
+        Returns:
+            Compiled :class:`ExecutionPlan`.
+
+        Raises:
+            SyntaxError: If the input text is not valid YAML/JSON.
+            ValueError: If semantic validation fails.
+        """
+        if self.estimates is not None:
+            return ExecutionPlan.from_workflow(*self._parse(text))
+        return _compile_cached(text)
 
     def _validate_schema(self, workflow: Dict[str, Any]) -> None:
         """Validate required workflow fields.
@@ -61,12 +119,15 @@ class WorkflowParser:
             logger.error("Missing fields: %s", missing)
             raise ValueError(f"Missing fields: {missing}")
 
-    def _validate_semantics(self, workflow: Dict[str, Any]) -> None:
+    def _validate_semantics(self, workflow: Dict[str, Any]) -> StepGraph:
         """Validate semantic rules for workflow.
 
         Args:
             workflow: Workflow dictionary.
 
+        Returns:
+            The workflow's step graph, checked to be acyclic.
+
         Raises:
             ValueError: If semantic rules are violated.
         """
@@ -74,7 +135,7 @@ class WorkflowParser:
         personas = {p["id"] for p in workflow.get("personas", [])}
         gates = {g["id"] for g in workflow.get("gates", [])}
         workflow_inputs = {i["name"] for i in workflow.get("inputs", [])}
-        produced: Dict[str, Set[str]] = {}
+        produced: Dict[str, Mapping[str, Any]] = {}
         for step in workflow.get("steps", []):
             sid = step["id"]
             persona = step.get("persona")
@@ -93,51 +154,162 @@ class WorkflowParser:
                         "Invalid backoff strategy %s in step %s", strategy, sid
                     )
                     raise ValueError("Invalid backoff strategy")
+                probability = retry.get("failure_probability", 0.0)
+                if not (_is_number(probability) and 0.0 <= probability < 1.0):
+                    logger.error(
+                        "Invalid failure probability %s in step %s", probability, sid
+                    )
+                    raise ValueError("Invalid failure probability")
+            cache = step.get("cache", False)
+            if isinstance(cache, dict):
+                ttl = cache.get("ttl")
+                valid = ttl is None or (_is_number(ttl) and ttl >= 0)
+            else:
+                valid = isinstance(cache, bool)
+            if not valid:
+                logger.error("Invalid cache settings %s in step %s", cache, sid)
+                raise ValueError("Invalid cache settings")
+            timeout = step.get("timeout")
+            if timeout is not None and not (_is_number(timeout) and timeout > 0):
+                logger.error("Invalid timeout %s in step %s", timeout, sid)
+                raise ValueError("Invalid timeout")
+            if not isinstance(step.get("idempotent", False), bool):
+                logger.error("Invalid idempotent flag in step %s", sid)
+                raise ValueError("Invalid idempotent flag")
+            execution = step.get("execution", "auto")
+            if execution not in {"auto", "inline", "thread", "process"}:
+                logger.error("Invalid execution mode %s in step %s", execution, sid)
+                raise ValueError("Invalid execution mode")
+            foreach = step.get("foreach")
+            if foreach is not None and not self._valid_foreach(step, foreach):
+                logger.error("Invalid foreach settings %s in step %s", foreach, sid)
+                raise ValueError("Invalid foreach settings")
             for val in step.get("inputs", {}).values():
                 if isinstance(val, str) and "." in val:
                     ref_step, output = val.split(".", 1)
-                    if output not in produced.get(ref_step, set()):
+                    if output not in produced.get(ref_step, ()):
                         logger.error("Unsatisfied input %s in step %s", val, sid)
                         raise ValueError("Unsatisfied input reference")
                 elif isinstance(val, str):
                     if val not in workflow_inputs:
                         logger.error("Unsatisfied input %s in step %s", val, sid)
                         raise ValueError("Unsatisfied input reference")
-            produced[sid] = set(step.get("outputs", {}).keys())
-        self._check_cycles(workflow.get("edges", []))
+            produced[sid] = step.get("outputs") or {}
+        self._validate_streams(workflow)
+        self._validate_conditions(workflow)
+        graph = StepGraph.from_workflow(workflow)
+        self._check_cycles(graph)
+        return graph
+
+    @staticmethod
+    def _valid_foreach(step: Mapping[str, Any], foreach: Any) -> bool:
+        """Return ``True`` if ``foreach`` settings of ``step`` are well formed.
+
+        The ``input`` must name one of the step's inputs, ``concurrency`` and
+        ``chunk_size`` must be positive integers and ``max_failures`` a
+        non-negative integer.
+        """
+        if not isinstance(foreach, dict):
+            return False
+        if foreach.get("input") not in (step.get("inputs") or {}):
+            return False
+        if not isinstance(foreach.get("as", ""), str):
+            return False
+        for key in ("concurrency", "chunk_size"):
+            value = foreach.get(key, 1)
+            if not _is_integer(value) or value < 1:
+                return False
+        limit = foreach.get("max_failures")
+        return limit is None or (_is_integer(limit) and limit >= 0)
+
+    def _validate_streams(self, workflow: Dict[str, Any]) -> None:
+        """Validate streaming edges.
+
+        Both ends of a ``stream: true`` edge run on the event loop, since
+        items are handed over through async iterators.
+
+        Args:
+            workflow: Workflow dictionary.
+
+        Raises:
+            ValueError: If a streaming edge is malformed.
+        """
+        modes = {
+            step["id"]: step.get("execution", "auto")
+            for step in workflow.get("steps", [])
+        }
+        for edge in workflow.get("edges", []):
+            stream = edge.get("stream", False)
+            if not isinstance(stream, bool):
+                logger.error("Invalid stream flag on edge %s", edge)
+                raise ValueError("Invalid stream flag")
+            if stream and {
+                modes.get(edge["from"], "auto"),
+                modes.get(edge["to"], "auto"),
+            } - {"auto", "inline"}:
+                logger.error("Streaming edge %s leaves the event loop", edge)
+                raise ValueError("Streaming steps must run inline")
+
+    def _validate_conditions(self, workflow: Dict[str, Any]) -> None:
+        """Validate conditional edges.
+
+        An edge's ``condition`` must read a declared output of its source step as
+        ``<step>.<output>`` or ``not <step>.<output>``, and its optional
+        ``probability`` of being taken must lie in ``[0, 1]``. Streaming
+        edges cannot be conditional, since their consumer starts before the
+        producer's outputs are known.
+
+        Args:
+            workflow: Workflow dictionary.
 
-    def _check_cycles(self, edges: List[Dict[str, str]]) -> None:
+        Raises:
+            ValueError: If a conditional edge is malformed.
+        """
+        outputs = {
+            step["id"]: step.get("outputs") or {}
+            for step in workflow.get("steps", [])
+        }
+        for edge in workflow.get("edges", []):
+            expression = edge.get("condition")
+            if expression is None:
+                if "probability" in edge:
+                    logger.error("Probability on unconditional edge %s", edge)
+                    raise ValueError("Branch probability requires a condition")
+                continue
+            probability = edge.get("probability", 1.0)
+            if not (_is_number(probability) and 0.0 <= probability <= 1.0):
+                logger.error("Invalid probability %s on edge %s", probability, edge)
+                raise ValueError("Invalid branch probability")
+            condition = None
+            if isinstance(expression, str):
+                try:
+                    condition = EdgeCondition.from_edge(edge)
+                except ValueError:
+                    pass
+            if condition is None or condition.output not in outputs.get(
+                edge["from"], ()
+            ):
+                logger.error("Invalid condition %s on edge %s", expression, edge)
+                raise ValueError("Invalid edge condition")
+            if edge.get("stream", False):
+                logger.error("Conditional streaming edge %s", edge)
+                raise ValueError("Streaming edges cannot be conditional")
+
+    def _check_cycles(self, graph: StepGraph) -> None:
         """Check for circular dependencies in workflow edges.
 
         Args:
-            edges: List of edge dictionaries.
+            graph: Indexed step graph built from the workflow.
 
         Raises:
-            ValueError: If a cycle is detected.
+            CycleError: If a cycle is detected.
         """
         logger.debug("Checking workflow edges for cycles")
-        if not edges:
-            return
-        graph: Dict[str, List[str]] = {}
-        for edge in edges:
-            graph.setdefault(edge["from"], []).append(edge["to"])
-        visited: Set[str] = set()
-        stack: Set[str] = set()
-
-        def visit(node: str) -> None:
-            if node in stack:
-                logger.error("Cycle detected at node %s", node)
-                raise ValueError("Circular dependency detected")
-            if node in visited:
-                return
-            stack.add(node)
-            for nxt in graph.get(node, []):
-                visit(nxt)
-            stack.remove(node)
-            visited.add(node)
-
-        for start in list(graph):
-            visit(start)
+        try:
+            graph.topological_indexes()
+        except CycleError as exc:
+            logger.error("Cycle detected: %s", " -> ".join(exc.cycle))
+            raise
 
     def _estimate_step_resources(
         self, workflow: Dict[str, Any]
@@ -157,62 +329,70 @@ class WorkflowParser:
             estimates[step["id"]] = {"cpu": cpu, "memory": memory}
         return estimates
 
-    def _estimate_totals(self, workflow: Dict[str, Any]) -> Dict[str, float]:
-        """Compute aggregate runtime and cost estimates for the workflow."""
+    def _estimate_totals(
+        self, workflow: Dict[str, Any], graph: StepGraph
+    ) -> Dict[str, float]:
+        """Compute aggregate runtime and cost estimates for the workflow.
+
+        ``runtime`` is the serial sum of step runtimes while ``makespan`` is
+        the critical-path length, i.e. the runtime with unlimited
+        concurrency.
+        """
         runtime = 0.0
         cost = 0.0
+        weights = []
         for step in workflow.get("steps", []):
-            runtime += float(step.get("estimated_runtime", 0.0))
+            weight = float(step.get("estimated_runtime", 0.0))
+            weights.append(weight)
+            runtime += weight
             cost += float(step.get("estimated_cost", 0.0))
-        return {"runtime": runtime, "cost": cost}
+        ranks = graph.upward_ranks(weights)
+        return {"runtime": runtime, "cost": cost, "makespan": max(ranks, default=0.0)}
 
 
-def _simulate_execution(workflow: Dict[str, Any]) -> List[str]:
-    """Compute a topological execution order for the workflow steps.
+def _is_number(value: Any) -> bool:
+    """Return ``True`` for ints and floats, excluding booleans."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
 
-    Args:
-        workflow: Parsed workflow dictionary.
 
-    Returns:
-        List of step IDs in execution order.
+def _is_integer(value: Any) -> bool:
+    """Return ``True`` for ints, excluding booleans."""
+    return isinstance(value, int) and not isinstance(value, bool)
 
-    Raises:
-        ValueError: If a circular dependency is detected.
-    """
-    steps = {s["id"] for s in workflow.get("steps", [])}
-    graph: Dict[str, List[str]] = {sid: [] for sid in steps}
-    indegree: Dict[str, int] = {sid: 0 for sid in steps}
-    for edge in workflow.get("edges", []):
-        graph[edge["from"]].append(edge["to"])
-        indegree[edge["to"]] += 1
-    order: List[str] = []
-    queue: List[str] = [sid for sid, deg in indegree.items() if deg == 0]
-    while queue:
-        node = queue.pop(0)
-        order.append(node)
-        for nxt in graph[node]:
-            indegree[nxt] -= 1
-            if indegree[nxt] == 0:
-                queue.append(nxt)
-    if len(order) != len(steps):  # pragma: no cover - safeguard
-        raise ValueError("Circular dependency detected")
-    return order
-
-
-def parse_workflow(path: str, dry_run: bool = True) -> Dict[str, Any]:
+
+@lru_cache(maxsize=128)
+def _compile_cached(text: str) -> ExecutionPlan:
+    """Compile ``text`` with the default parser, memoising the plan."""
+    return ExecutionPlan.from_workflow(*WorkflowParser()._parse(text))
+
+
+def parse_workflow(
+    path: str,
+    dry_run: bool = True,
+    *,
+    workers: Mapping[str, int] | None = None,
+    default_workers: int | None = 1,
+    estimates: LearnedEstimates | None = None,
+) -> Dict[str, Any]:
     """Load and validate a workflow definition from disk.
 
     The workflow is loaded from ``path`` and converted into an AST. If
     ``dry_run`` is ``True`` the function also returns a simulated execution
-    order without performing any side effects.
+    order and a discrete-event simulation of the run without performing
+    any side effects.
 
     Args:
         path: Path to a YAML or JSON workflow file.
-        dry_run: When ``True`` simulate execution order without side effects.
+        dry_run: When ``True`` simulate execution without side effects.
+        workers: Simulated number of workers for each persona ID.
+        default_workers: Simulated workers for other personas; ``None``
+            means unlimited.
+        estimates: Learned estimates to use in place of the static ones.
 
     Returns:
         Parsed workflow dictionary augmented with resource estimates and,
-        when ``dry_run`` is ``True``, an ``execution_order`` key.
+        when ``dry_run`` is ``True``, ``execution_order`` and
+        ``simulation`` (see :meth:`SimulationReport.as_dict`) keys.
 
     Raises:
         SyntaxError: If the file contains malformed YAML/JSON.
@@ -220,8 +400,13 @@ def parse_workflow(path: str, dry_run: bool = True) -> Dict[str, Any]:
     """
     with open(path, "r", encoding="utf-8") as fh:
         text = fh.read()
-    parser = WorkflowParser()
-    workflow = parser.parse(text)
+    parser = WorkflowParser(estimates)
+    workflow, graph = parser._parse(text)
     if dry_run:
-        workflow["execution_order"] = _simulate_execution(workflow)
+        workflow["execution_order"] = graph.topological_order()
+        workflow["simulation"] = simulate(
+            ExecutionPlan.from_workflow(workflow, graph),
+            workers,
+            default_workers=default_workers,
+        ).as_dict()
     return workflow
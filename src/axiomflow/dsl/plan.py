@@ -0,0 +1,418 @@
+"""Compiled, immutable execution plans for parsed workflows.
+
+A parsed workflow is a nested dictionary that is convenient to validate but
+expensive to traverse on every run. :class:`ExecutionPlan` flattens it into
+integer-indexed steps with precomputed adjacency, predecessor counts and
+resolved input references. Plans are immutable, so a single instance can be
+cached and shared by any number of concurrent runs of the same workflow
+version.
+
+Plans are normally obtained through :meth:`WorkflowParser.compile`, which
+caches them by the workflow source text.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, List, Mapping, Sequence, Tuple
+
+from axiomflow.core.graph import StepGraph, upward_ranks
+from axiomflow.core.hashing import canonical_digest
+from axiomflow.core.retry import RetryPolicy
+
+WORKFLOW_INPUT = -1
+"""Sentinel :attr:`InputRef.step` for references to workflow-level inputs."""
+
+LITERAL = -2
+"""Sentinel :attr:`InputRef.step` for literal (non-reference) input values."""
+
+_NON_SEMANTIC_KEYS = frozenset({"id", "name", "cache", "timeout", "idempotent"})
+
+
+def step_fingerprint(step: Mapping[str, Any]) -> str:
+    """Return a content hash of the parts of ``step`` that affect its result.
+
+    Identifiers, display names, cache, timeout and idempotency settings and
+    ``estimated_*`` hints are excluded so that renaming a step or re-tuning
+    its estimates does not change the fingerprint.
+    """
+    return canonical_digest(
+        {
+            key: value
+            for key, value in step.items()
+            if key not in _NON_SEMANTIC_KEYS and not key.startswith("estimated_")
+        }
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class InputRef:
+    """A step input resolved against the plan.
+
+    Attributes:
+        name: Parameter name the value is bound to.
+        step: Index of the producing step, :data:`WORKFLOW_INPUT` or
+            :data:`LITERAL`.
+        key: Output name of the producing step or workflow input name.
+        value: Literal value when ``step`` is :data:`LITERAL`.
+        stream: Whether the value arrives item by item over a streaming
+            edge from ``step``.
+    """
+
+    name: str
+    step: int
+    key: str = ""
+    value: Any = None
+    stream: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ForeachSpec:
+    """Fan-out settings of a ``foreach`` step.
+
+    Attributes:
+        input: Name of the step input holding the list of items.
+        item: Parameter name each item is bound to.
+        concurrency: Maximum number of items processed at the same time.
+        chunk_size: Number of consecutive items a worker claims at once.
+        max_failures: Failed items tolerated before the step fails, or
+            ``None`` to always keep partial results.
+    """
+
+    input: str
+    item: str
+    concurrency: int = 8
+    chunk_size: int = 1
+    max_failures: int | None = None
+
+    @classmethod
+    def from_dict(cls, spec: Mapping[str, Any]) -> "ForeachSpec":
+        """Build the settings from the ``foreach`` mapping of a step."""
+        max_failures = spec.get("max_failures")
+        return cls(
+            input=str(spec["input"]),
+            item=str(spec.get("as", spec["input"])),
+            concurrency=int(spec.get("concurrency", 8)),
+            chunk_size=int(spec.get("chunk_size", 1)),
+            max_failures=int(max_failures) if max_failures is not None else None,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class EdgeCondition:
+    """Predicate of a conditional edge.
+
+    Written ``condition: <step>.<output>`` (or ``condition: not
+    <step>.<output>``) on an edge, where ``<step>`` is the edge's source;
+    this is the subset of the boolean expressions of the DSL specification
+    the executor evaluates. The edge is taken when that output is truthy
+    (falsy when negated).
+
+    Attributes:
+        output: Output of the source step the predicate reads.
+        negate: Whether the predicate is negated.
+        probability: Estimated probability that the edge is taken, used
+            for dry-run estimates.
+    """
+
+    output: str
+    negate: bool = False
+    probability: float = 1.0
+
+    @classmethod
+    def from_edge(cls, edge: Mapping[str, Any]) -> "EdgeCondition":
+        """Build the predicate from the ``condition`` of a workflow edge.
+
+        Raises:
+            ValueError: If the predicate does not read an output of the
+                edge's source step.
+        """
+        expression = str(edge["condition"]).strip()
+        negate = expression.startswith("not ")
+        if negate:
+            expression = expression[4:].strip()
+        source, _, output = expression.partition(".")
+        if source != edge["from"] or not output:
+            raise ValueError(
+                f"Condition {edge['condition']} must read an output of "
+                f"{edge['from']}"
+            )
+        return cls(output, negate, float(edge.get("probability", 1.0)))
+
+    def holds(self, result: Any) -> bool:
+        """Return whether the edge is taken given its source step's result."""
+        value = result.get(self.output) if isinstance(result, Mapping) else result
+        return bool(value) != self.negate
+
+
+@dataclass(frozen=True, slots=True)
+class PlanStep:
+    """A single compiled workflow step.
+
+    ``producers`` lists the distinct indexes of the steps whose outputs this
+    step consumes through its ``inputs``. ``fingerprint`` is the
+    :func:`step_fingerprint` of the step definition. ``retry_policy`` is
+    compiled from the ``retry`` block, or ``None`` when the step declares
+    none. ``cache`` is ``True`` when results may be memoised, for
+    ``cache_ttl`` seconds (``None`` meaning no expiry). ``timeout`` bounds
+    each attempt of the step in seconds.
+    ``execution`` is the step's execution mode (``auto``,
+    ``inline``, ``thread`` or ``process``). ``foreach`` holds the fan-out
+    settings of ``foreach`` steps and is ``None`` for ordinary steps.
+    ``idempotent`` marks steps that are safe to run twice, which makes
+    them eligible for hedged execution.
+    """
+
+    index: int
+    id: str
+    persona: str | None
+    inputs: Tuple[InputRef, ...]
+    outputs: Tuple[str, ...]
+    producers: Tuple[int, ...]
+    fingerprint: str
+    retry: Mapping[str, Any] | None
+    retry_policy: RetryPolicy | None
+    cache: bool
+    cache_ttl: float | None
+    timeout: float | None
+    execution: str
+    foreach: ForeachSpec | None
+    idempotent: bool
+    estimated_runtime: float
+    estimated_cost: float
+    estimated_cpu: float
+    estimated_memory: float
+
+
+def _reach_probabilities(
+    steps: Sequence[PlanStep],
+    successors: Sequence[Sequence[int]],
+    order: Sequence[int],
+    conditions: Mapping[Tuple[int, int], EdgeCondition],
+) -> List[float]:
+    """Return the probability that each step runs, assuming independent edges.
+
+    A step runs when every step it reads outputs from runs and takes its
+    edge to it; a step reading no outputs runs when any incoming edge is
+    taken, and always when it has none.
+    """
+    count = len(steps)
+    reach = [1.0] * count
+    needed = [1.0] * count
+    missed = [1.0] * count
+    incoming = [False] * count
+    for idx in order:
+        if steps[idx].producers:
+            reach[idx] = needed[idx]
+        elif incoming[idx]:
+            reach[idx] = 1.0 - missed[idx]
+        for nxt in successors[idx]:
+            condition = conditions.get((idx, nxt))
+            live = reach[idx] * (condition.probability if condition else 1.0)
+            incoming[nxt] = True
+            if idx in steps[nxt].producers:
+                needed[nxt] *= live
+            else:
+                missed[nxt] *= 1.0 - live
+    return reach
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutionPlan:
+    """Immutable, integer-indexed representation of a workflow.
+
+    Attributes:
+        name: Workflow name.
+        version: Workflow version.
+        steps: Compiled steps, indexed by position.
+        successors: For each step, indexes of the steps that depend on it.
+        predecessor_counts: For each step, number of incoming edges.
+        consumer_counts: For each step, number of steps consuming its
+            outputs.
+        stream_consumers: For each step, indexes of the successors joined
+            to it by a streaming edge. They start together with the step.
+        conditions: Predicates of the conditional edges, keyed by
+            ``(source, target)`` step indexes.
+        reach: For each step, the estimated probability that it runs given
+            the ``probability`` of the conditional edges.
+        upward_rank: For each step, the estimated runtime of the longest
+            path from the step to the end of the workflow. Used to start
+            critical-path steps first.
+        order: Step indexes in topological order.
+        index: Mapping of step IDs to indexes.
+        estimates: Aggregate serial ``runtime``, ``cost`` and critical-path
+            ``makespan`` estimates, and the ``expected_cost`` weighted by
+            ``reach``.
+    """
+
+    name: str
+    version: str
+    steps: Tuple[PlanStep, ...]
+    successors: Tuple[Tuple[int, ...], ...]
+    predecessor_counts: Tuple[int, ...]
+    consumer_counts: Tuple[int, ...]
+    stream_consumers: Tuple[Tuple[int, ...], ...]
+    conditions: Mapping[Tuple[int, int], EdgeCondition]
+    reach: Tuple[float, ...]
+    upward_rank: Tuple[float, ...]
+    order: Tuple[int, ...]
+    index: Mapping[str, int]
+    estimates: Mapping[str, float]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def upward_ranks(self, runtimes: Sequence[float]) -> Tuple[float, ...]:
+        """Return the :attr:`upward_rank` of each step for other runtimes.
+
+        Args:
+            runtimes: Runtime of each step, indexed like :attr:`steps`.
+        """
+        return tuple(upward_ranks(self.successors, self.order, runtimes))
+
+    @classmethod
+    def from_workflow(
+        cls, workflow: Mapping[str, Any], graph: StepGraph | None = None
+    ) -> "ExecutionPlan":
+        """Compile a parsed workflow dictionary into a plan.
+
+        Args:
+            workflow: Workflow dictionary, normally produced by
+                :meth:`WorkflowParser.parse`.
+            graph: :meth:`StepGraph.from_workflow` of ``workflow`` when the
+                caller already built it. It is reused unless inputs imply
+                edges the workflow does not declare.
+
+        Returns:
+            The compiled plan.
+
+        Raises:
+            CycleError: If the workflow edges contain a cycle.
+            ValueError: If an edge or input references an unknown step, or
+                an edge condition does not read its source step.
+        """
+        raw_steps = workflow.get("steps", [])
+        ids = {step["id"] for step in raw_steps}
+        edges = [(edge["from"], edge["to"]) for edge in workflow.get("edges", [])]
+        streamed = {
+            (edge["from"], edge["to"])
+            for edge in workflow.get("edges", [])
+            if edge.get("stream")
+        }
+        declared = set(edges)
+        guarded = {
+            (edge["from"], edge["to"]): EdgeCondition.from_edge(edge)
+            for edge in workflow.get("edges", [])
+            if edge.get("condition") is not None
+        }
+        for step in raw_steps:
+            for val in (step.get("inputs") or {}).values():
+                if isinstance(val, str) and "." in val:
+                    ref_step = val.partition(".")[0]
+                    if ref_step not in ids:
+                        raise ValueError(f"Unknown step in input: {ref_step}")
+                    # Data references imply an ordering dependency even when
+                    # the workflow does not declare the edge explicitly.
+                    if (ref_step, step["id"]) not in declared:
+                        declared.add((ref_step, step["id"]))
+                        edges.append((ref_step, step["id"]))
+                        graph = None
+        if graph is None:
+            graph = StepGraph((step["id"] for step in raw_steps), edges)
+        order = tuple(graph.topological_indexes())
+        index = graph.index
+        steps = []
+        consumers = [0] * len(raw_steps)
+        runtime = 0.0
+        cost = 0.0
+        for pos, step in enumerate(raw_steps):
+            inputs = []
+            for name, val in (step.get("inputs") or {}).items():
+                if isinstance(val, str) and "." in val:
+                    ref_step, _, output = val.partition(".")
+                    stream = (ref_step, step["id"]) in streamed
+                    inputs.append(
+                        InputRef(name, index[ref_step], output, stream=stream)
+                    )
+                elif isinstance(val, str):
+                    inputs.append(InputRef(name, WORKFLOW_INPUT, val))
+                else:
+                    inputs.append(InputRef(name, LITERAL, value=val))
+            producers = tuple(dict.fromkeys(r.step for r in inputs if r.step >= 0))
+            for producer in producers:
+                consumers[producer] += 1
+            retry = step.get("retry")
+            cache = step.get("cache") or False
+            ttl = cache.get("ttl") if isinstance(cache, Mapping) else None
+            foreach = step.get("foreach")
+            timeout = step.get("timeout")
+            compiled = PlanStep(
+                index=pos,
+                id=step["id"],
+                persona=step.get("persona"),
+                inputs=tuple(inputs),
+                outputs=tuple(step.get("outputs") or ()),
+                producers=producers,
+                fingerprint=step_fingerprint(step),
+                retry=MappingProxyType(dict(retry)) if retry else None,
+                retry_policy=RetryPolicy.from_config(retry) if retry else None,
+                cache=bool(cache),
+                cache_ttl=float(ttl) if ttl is not None else None,
+                timeout=float(timeout) if timeout is not None else None,
+                execution=str(step.get("execution", "auto")),
+                foreach=ForeachSpec.from_dict(foreach) if foreach else None,
+                idempotent=bool(step.get("idempotent", False)),
+                estimated_runtime=float(step.get("estimated_runtime", 0.0)),
+                estimated_cost=float(step.get("estimated_cost", 0.0)),
+                estimated_cpu=float(step.get("estimated_cpu", 0.0)),
+                estimated_memory=float(step.get("estimated_memory", 0.0)),
+            )
+            runtime += compiled.estimated_runtime
+            cost += compiled.estimated_cost
+            steps.append(compiled)
+        stream_consumers: List[List[int]] = [[] for _ in steps]
+        for src, dst in sorted(streamed):
+            stream_consumers[index[src]].append(index[dst])
+        conditions = {
+            (index[src], index[dst]): condition
+            for (src, dst), condition in guarded.items()
+        }
+        reach = _reach_probabilities(steps, graph.successors, order, conditions)
+        ranks = graph.upward_ranks([step.estimated_runtime for step in steps])
+        return cls(
+            name=str(workflow.get("name", "")),
+            version=str(workflow.get("version", "")),
+            steps=tuple(steps),
+            successors=tuple(tuple(succ) for succ in graph.successors),
+            predecessor_counts=tuple(graph.in_degree),
+            consumer_counts=tuple(consumers),
+            stream_consumers=tuple(tuple(c) for c in stream_consumers),
+            conditions=MappingProxyType(conditions),
+            reach=tuple(reach),
+            upward_rank=tuple(ranks),
+            order=order,
+            index=MappingProxyType(dict(index)),
+            estimates=MappingProxyType(
+                {
+                    "runtime": runtime,
+                    "cost": cost,
+                    "makespan": max(ranks, default=0.0),
+                    "expected_cost": sum(
+                        step.estimated_cost * p for step, p in zip(steps, reach)
+                    ),
+                }
+            ),
+        )
+
+
+__all__ = [
+    "EdgeCondition",
+    "ExecutionPlan",
+    "ForeachSpec",
+    "InputRef",
+    "LITERAL",
+    "PlanStep",
+    "WORKFLOW_INPUT",
+    "step_fingerprint",
+]
@@ -0,0 +1,349 @@
+"""Discrete-event simulation of workflow runs for dry runs.
+
+:func:`simulate` replays an :class:`ExecutionPlan` on a simulated clock
+instead of executing it. Steps take their ``estimated_runtime`` and
+``estimated_cost``, run on a limited number of workers per persona and are
+stretched by the retries their ``retry`` block predicts. The report gives
+the predicted makespan together with per-persona utilisation and queueing
+delay, which is what is needed to size worker pools or compare workflow
+variants without paying for real agent runs.
+
+Retry blocks may declare a ``failure_probability`` for each attempt. By
+default the simulation uses the expected number of attempts and backoff;
+passing ``seed`` samples attempts instead, so repeated seeded runs give a
+Monte Carlo estimate of the makespan distribution.
+
+Conditional edges are handled the same way. Without a seed every branch
+is simulated, so the makespan is that of the longest outcome, while
+``runtime`` and ``cost`` are weighted by the probability that each step
+runs (:attr:`ExecutionPlan.reach`). With a seed each conditional edge is
+taken with its ``probability`` and the steps cut off are pruned from the
+simulated run, as the executor would.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Tuple
+
+from axiomflow.core.retry import RetryPolicy
+
+from .plan import ExecutionPlan, PlanStep
+
+DEFAULT_PERSONA = "default"
+"""Persona name used for steps that do not declare one."""
+
+
+@dataclass(frozen=True)
+class PersonaStats:
+    """Simulated load of the workers of one persona.
+
+    Attributes:
+        workers: Number of workers, ``None`` for unlimited.
+        steps: Number of steps run by the persona.
+        busy: Total simulated time the persona's workers spent running.
+        utilisation: ``busy`` divided by the worker capacity over the
+            makespan; ``None`` for unlimited workers.
+        queue_delay: Mean time steps waited for a worker after becoming
+            ready.
+        max_queue_delay: Longest such wait.
+    """
+
+    workers: int | None
+    steps: int
+    busy: float
+    utilisation: float | None
+    queue_delay: float
+    max_queue_delay: float
+
+
+@dataclass(frozen=True)
+class SimulationReport:
+    """Outcome of a simulated run.
+
+    Attributes:
+        makespan: Simulated time from start to the last step finishing.
+        runtime: Sum of all simulated step durations, weighted by
+            ``reach``.
+        cost: Sum of all simulated step costs, retries included, weighted
+            by ``reach``.
+        personas: Per-persona statistics keyed by persona ID.
+        start: Simulated start time of each step, indexed like the plan.
+        finish: Simulated finish time of each step, indexed like the plan.
+        reach: Probability that each step runs, indexed like the plan;
+            ``0.0`` or ``1.0`` for steps pruned or run in a sampled run.
+    """
+
+    makespan: float
+    runtime: float
+    cost: float
+    personas: Mapping[str, PersonaStats]
+    start: Tuple[float, ...]
+    finish: Tuple[float, ...]
+    reach: Tuple[float, ...]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable summary without per-step times."""
+        return {
+            "makespan": self.makespan,
+            "runtime": self.runtime,
+            "cost": self.cost,
+            "personas": {
+                name: {
+                    "workers": stats.workers,
+                    "steps": stats.steps,
+                    "busy": stats.busy,
+                    "utilisation": stats.utilisation,
+                    "queue_delay": stats.queue_delay,
+                    "max_queue_delay": stats.max_queue_delay,
+                }
+                for name, stats in self.personas.items()
+            },
+        }
+
+
+def _attempt_profile(
+    policy: RetryPolicy, probability: float, rng: random.Random | None
+) -> Tuple[float, float]:
+    """Return ``(attempts, backoff)`` under ``policy``, expected or sampled.
+
+    ``probability`` is the chance that a single attempt fails.
+    """
+    if probability <= 0.0:
+        return 1.0, 0.0
+    if rng is None:
+        # Attempt k+1 (and the backoff before it) happens with probability
+        # p**k, the chance that the first k attempts all failed.
+        attempts = 1.0
+        backoff = 0.0
+        reach = 1.0
+        for k in range(1, policy.max_attempts):
+            reach *= probability
+            attempts += reach
+            backoff += reach * policy.backoff(k)
+        return attempts, backoff
+    attempts = 1
+    backoff = 0.0
+    while attempts < policy.max_attempts and rng.random() < probability:
+        backoff += policy.backoff(attempts)
+        attempts += 1
+    return float(attempts), backoff
+
+
+def _step_durations(
+    steps: Tuple[PlanStep, ...], rng: random.Random | None
+) -> Tuple[List[float], List[float]]:
+    """Return the simulated duration and cost of every step."""
+    durations = []
+    costs = []
+    expected: Dict[Tuple[RetryPolicy, float], Tuple[float, float]] = {}
+    for step in steps:
+        policy = step.retry_policy
+        if policy is None:
+            attempts, backoff = 1.0, 0.0
+        else:
+            probability = float(step.retry.get("failure_probability", 0.0))
+            if rng is None:
+                # Expected profiles only depend on the policy and failure
+                # probability; most steps share a handful of them.
+                key = (policy, probability)
+                profile = expected.get(key)
+                if profile is None:
+                    profile = expected[key] = _attempt_profile(
+                        policy, probability, None
+                    )
+                attempts, backoff = profile
+            else:
+                attempts, backoff = _attempt_profile(policy, probability, rng)
+        durations.append(step.estimated_runtime * attempts + backoff)
+        costs.append(step.estimated_cost * attempts)
+    return durations, costs
+
+
+def _sample_pruned(plan: ExecutionPlan, rng: random.Random) -> List[bool]:
+    """Sample the conditional edges of ``plan`` and return the pruned steps.
+
+    A step is pruned when an edge from a step it reads outputs from is not
+    taken, or when none of its incoming edges is.
+    """
+    steps = plan.steps
+    conditions = plan.conditions
+    pruned = [False] * len(steps)
+    cut = [False] * len(steps)
+    live = [0] * len(steps)
+    for idx in plan.order:
+        if cut[idx] or (plan.predecessor_counts[idx] and not live[idx]):
+            pruned[idx] = True
+        for nxt in plan.successors[idx]:
+            condition = conditions.get((idx, nxt))
+            if pruned[idx] or (
+                condition is not None and rng.random() >= condition.probability
+            ):
+                if idx in steps[nxt].producers:
+                    cut[nxt] = True
+            else:
+                live[nxt] += 1
+    return pruned
+
+
+def simulate(
+    plan: ExecutionPlan,
+    workers: Mapping[str, int] | None = None,
+    *,
+    default_workers: int | None = 1,
+    max_concurrency: int | None = None,
+    seed: int | None = None,
+) -> SimulationReport:
+    """Simulate a run of ``plan`` on a limited pool of persona workers.
+
+    Ready steps are started in the same order as by the executor: highest
+    upward rank first, i.e. steps on the longest remaining path. Pruned
+    steps finish as soon as they become ready, without taking a worker.
+
+    Args:
+        plan: Compiled plan to simulate.
+        workers: Number of workers for each persona ID.
+        default_workers: Workers for personas missing from ``workers``;
+            ``None`` means unlimited.
+        max_concurrency: Cap on the number of steps running at once across
+            all personas, like the executor's ``max_concurrency``.
+        seed: Sample retries and conditional edges with this seed instead
+            of using their expected values.
+
+    Returns:
+        The simulation report.
+
+    Raises:
+        ValueError: If a worker count is smaller than one.
+    """
+    workers = dict(workers or {})
+    for name, count in workers.items():
+        if count < 1:
+            raise ValueError(f"Persona {name} needs at least one worker")
+    if default_workers is not None and default_workers < 1:
+        raise ValueError("default_workers must be at least 1")
+    rng = random.Random(seed) if seed is not None else None
+    steps = plan.steps
+    count = len(steps)
+    rank = plan.upward_rank
+    successors = plan.successors
+    remaining = list(plan.predecessor_counts)
+
+    personas = [step.persona or DEFAULT_PERSONA for step in steps]
+    names = list(dict.fromkeys(personas))
+    slot = {name: pos for pos, name in enumerate(names)}
+    persona_of = [slot[name] for name in personas]
+    capacity = [workers.get(name, default_workers) for name in names]
+    free = [math.inf if cap is None else cap for cap in capacity]
+    queues: List[List[Tuple[float, int]]] = [[] for _ in names]
+    busy = [0.0] * len(names)
+    waited = [0.0] * len(names)
+    max_wait = [0.0] * len(names)
+    ran = [0] * len(names)
+    global_free = math.inf if max_concurrency is None else max_concurrency
+
+    ready_at = [0.0] * count
+    start = [0.0] * count
+    finish = [0.0] * count
+    durations, costs = _step_durations(steps, rng)
+    if rng is not None and plan.conditions:
+        pruned = _sample_pruned(plan, rng)
+        reach = tuple(0.0 if cut else 1.0 for cut in pruned)
+    else:
+        pruned = [False] * count
+        reach = plan.reach
+    events: List[Tuple[float, int]] = []
+    now = 0.0
+
+    def ready(idx: int) -> None:
+        # Pruned steps finish on the spot, unlocking their successors.
+        stack = [idx]
+        while stack:
+            idx = stack.pop()
+            if not pruned[idx]:
+                ready_at[idx] = now
+                heapq.heappush(queues[persona_of[idx]], (-rank[idx], idx))
+                continue
+            start[idx] = finish[idx] = now
+            for nxt in successors[idx]:
+                remaining[nxt] -= 1
+                if remaining[nxt] == 0:
+                    stack.append(nxt)
+
+    for idx in range(count):
+        if remaining[idx] == 0:
+            ready(idx)
+
+    def dispatch() -> None:
+        nonlocal global_free
+        while global_free > 0:
+            best = -1
+            for pos, queue in enumerate(queues):
+                if queue and free[pos] > 0 and (
+                    best < 0 or queue[0] < queues[best][0]
+                ):
+                    best = pos
+            if best < 0:
+                return
+            _, idx = heapq.heappop(queues[best])
+            duration = durations[idx]
+            wait = now - ready_at[idx]
+            waited[best] += wait
+            if wait > max_wait[best]:
+                max_wait[best] = wait
+            busy[best] += duration
+            ran[best] += 1
+            free[best] -= 1
+            global_free -= 1
+            start[idx] = now
+            finish[idx] = now + duration
+            heapq.heappush(events, (finish[idx], idx))
+
+    def complete(idx: int) -> None:
+        nonlocal global_free
+        free[persona_of[idx]] += 1
+        global_free += 1
+        for nxt in successors[idx]:
+            remaining[nxt] -= 1
+            if remaining[nxt] == 0:
+                ready(nxt)
+
+    dispatch()
+    while events:
+        # Release every step finishing at the same instant before dispatch.
+        now = events[0][0]
+        while events and events[0][0] == now:
+            complete(heapq.heappop(events)[1])
+        dispatch()
+
+    makespan = max(finish, default=0.0)
+    stats = {}
+    for pos, name in enumerate(names):
+        cap = capacity[pos]
+        if cap is None:
+            utilisation = None
+        else:
+            utilisation = busy[pos] / (cap * makespan) if makespan > 0 else 0.0
+        stats[name] = PersonaStats(
+            workers=cap,
+            steps=ran[pos],
+            busy=busy[pos],
+            utilisation=utilisation,
+            queue_delay=waited[pos] / ran[pos] if ran[pos] else 0.0,
+            max_queue_delay=max_wait[pos],
+        )
+    return SimulationReport(
+        makespan=makespan,
+        runtime=sum(d * p for d, p in zip(durations, reach)),
+        cost=sum(c * p for c, p in zip(costs, reach)),
+        personas=stats,
+        start=tuple(start),
+        finish=tuple(finish),
+        reach=tuple(reach),
+    )
+
+
+__all__ = ["DEFAULT_PERSONA", "PersonaStats", "SimulationReport", "simulate"]
@@ -0,0 +1,266 @@
+"""Fair-share admission of workflow runs across projects.
+
+Without admission control every caller awaiting
+:meth:`WorkflowExecutor.run_workflow` starts immediately, so one project
+submitting hundreds of runs crowds out all others. A :class:`RunQueue`
+caps the number of runs in flight, queues the rest per project and hands
+free slots out by deficit round robin: each project earns credit in
+proportion to its weight on every round and spends one credit per admitted
+run, so over time projects receive slots in proportion to their weights no
+matter how many runs each one has queued.
+
+Queues are bounded. When a project's queue is full, new submissions are
+either rejected with :class:`QueueFull` or made to wait for room, which
+pushes back on the submitter instead of growing memory without bound.
+:meth:`RunQueue.metrics` reports queue depths, oldest waits and wait-time
+percentiles suitable for autoscaling decisions.
+
+A queue belongs to the event loop it is first used on.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Mapping, Tuple
+
+from axiomflow.core.histogram import LatencyHistogram
+
+from .budget import DEFAULT_PROJECT
+
+OVERFLOW_ACTIONS = frozenset({"reject", "wait"})
+
+
+class QueueFull(RuntimeError):
+    """Raised when a run is submitted to a full project queue."""
+
+
+@dataclass(frozen=True)
+class ProjectQuota:
+    """Admission settings of one project.
+
+    Attributes:
+        weight: Relative share of run slots under contention.
+        max_concurrent: Maximum runs of the project in flight at once,
+            ``None`` for no limit besides the global one.
+        max_queued: Maximum runs of the project waiting for a slot,
+            ``None`` for unbounded.
+    """
+
+    weight: float = 1.0
+    max_concurrent: int | None = None
+    max_queued: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.weight <= 0:
+            raise ValueError("weight must be positive")
+
+
+@dataclass
+class _ProjectState:
+    quota: ProjectQuota
+    waiters: Deque[Tuple[asyncio.Future[None], float]] = field(default_factory=deque)
+    running: int = 0
+    deficit: float = 0.0
+    admitted: int = 0
+    rejected: int = 0
+    wait: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+class RunQueue:
+    """Admit workflow runs by weighted fair share across projects.
+
+    Args:
+        executor: Executor running admitted workflows.
+        max_concurrent_runs: Maximum number of runs in flight overall.
+        quotas: Settings per project ID.
+        default_quota: Settings of projects missing from ``quotas``.
+        overflow: ``reject`` raises :class:`QueueFull` when a project's
+            queue is full; ``wait`` blocks the submitter until it has room.
+    """
+
+    def __init__(
+        self,
+        executor: Any,
+        *,
+        max_concurrent_runs: int = 8,
+        quotas: Mapping[str, ProjectQuota] | None = None,
+        default_quota: ProjectQuota = ProjectQuota(),
+        overflow: str = "reject",
+    ) -> None:
+        if max_concurrent_runs < 1:
+            raise ValueError("max_concurrent_runs must be at least 1")
+        if overflow not in OVERFLOW_ACTIONS:
+            raise ValueError(f"Unknown overflow action: {overflow}")
+        self.executor = executor
+        self.max_concurrent_runs = max_concurrent_runs
+        self.quotas = dict(quotas or {})
+        self.default_quota = default_quota
+        self.overflow = overflow
+        self.running = 0
+        self._projects: Dict[str, _ProjectState] = {}
+        # Projects with queued runs, in round-robin order.
+        self._active: Deque[str] = deque()
+        self._space: List[asyncio.Future[None]] = []
+
+    def _state(self, project: str) -> _ProjectState:
+        state = self._projects.get(project)
+        if state is None:
+            quota = self.quotas.get(project, self.default_quota)
+            state = self._projects[project] = _ProjectState(quota)
+        return state
+
+    async def submit(
+        self,
+        workflow: Any,
+        step_funcs: Mapping[str, Callable[..., Any]],
+        *,
+        project: str = DEFAULT_PROJECT,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """Run a workflow once the project is granted a slot.
+
+        ``kwargs`` are passed to :meth:`WorkflowExecutor.run_workflow`.
+
+        Raises:
+            QueueFull: If the project's queue is full and ``overflow`` is
+                ``reject``.
+        """
+        await self.acquire(project)
+        try:
+            return await self.executor.run_workflow(
+                workflow, step_funcs, project=project, **kwargs
+            )
+        finally:
+            self.release(project)
+
+    async def acquire(self, project: str = DEFAULT_PROJECT) -> None:
+        """Wait for a run slot for ``project``; pair with :meth:`release`.
+
+        Raises:
+            QueueFull: If the project's queue is full and ``overflow`` is
+                ``reject``.
+        """
+        state = self._state(project)
+        limit = state.quota.max_queued
+        while limit is not None and len(state.waiters) >= limit:
+            if self.overflow == "reject":
+                state.rejected += 1
+                raise QueueFull(f"Run queue of project {project} is full")
+            space = asyncio.get_running_loop().create_future()
+            self._space.append(space)
+            await space
+        waiter = asyncio.get_running_loop().create_future()
+        if not state.waiters:
+            self._active.append(project)
+        state.waiters.append((waiter, time.monotonic()))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just before being cancelled: give the slot back.
+                self.release(project)
+            else:
+                self._withdraw(project, state, waiter)
+            raise
+
+    def release(self, project: str = DEFAULT_PROJECT) -> None:
+        """Return the slot of a finished run of ``project``."""
+        state = self._projects[project]
+        state.running -= 1
+        self.running -= 1
+        self._dispatch()
+
+    def _eligible(self, state: _ProjectState) -> bool:
+        limit = state.quota.max_concurrent
+        return bool(state.waiters) and (limit is None or state.running < limit)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued runs by deficit round robin."""
+        active = self._active
+        projects = self._projects
+        admitted = False
+        while self.running < self.max_concurrent_runs and any(
+            self._eligible(projects[name]) for name in active
+        ):
+            state = projects[active[0]]
+            if not self._eligible(state):
+                active.rotate(-1)
+                continue
+            if state.deficit < 1.0:
+                state.deficit += state.quota.weight
+                if state.deficit < 1.0:
+                    active.rotate(-1)
+                    continue
+            waiter, queued_at = state.waiters.popleft()
+            state.deficit -= 1.0
+            state.running += 1
+            state.admitted += 1
+            state.wait.record(time.monotonic() - queued_at)
+            self.running += 1
+            waiter.set_result(None)
+            admitted = True
+            if not state.waiters:
+                active.popleft()
+                state.deficit = 0.0
+            elif state.deficit < 1.0:
+                active.rotate(-1)
+        if admitted:
+            self._wake_space()
+
+    def _withdraw(
+        self, project: str, state: _ProjectState, waiter: asyncio.Future[None]
+    ) -> None:
+        state.waiters = deque(
+            entry for entry in state.waiters if entry[0] is not waiter
+        )
+        if not state.waiters and project in self._active:
+            self._active.remove(project)
+            state.deficit = 0.0
+        self._wake_space()
+
+    def _wake_space(self) -> None:
+        waiters, self._space = self._space, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def depth(self, project: str | None = None) -> int:
+        """Return the number of queued runs of ``project`` or of all projects."""
+        if project is not None:
+            state = self._projects.get(project)
+            return len(state.waiters) if state is not None else 0
+        return sum(len(state.waiters) for state in self._projects.values())
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue depth and wait-time metrics.
+
+        Wait times are in seconds, measured from submission to admission.
+        ``oldest_wait`` is how long the head of each queue has been waiting.
+        """
+        now = time.monotonic()
+        projects = {}
+        for name, state in self._projects.items():
+            wait = state.wait
+            projects[name] = {
+                "queued": len(state.waiters),
+                "running": state.running,
+                "admitted": state.admitted,
+                "rejected": state.rejected,
+                "oldest_wait": now - state.waiters[0][1] if state.waiters else 0.0,
+                "wait_mean": wait.mean,
+                "wait_p50": wait.quantile(0.5) if len(wait) else 0.0,
+                "wait_p95": wait.quantile(0.95) if len(wait) else 0.0,
+            }
+        return {
+            "running": self.running,
+            "queued": self.depth(),
+            "capacity": self.max_concurrent_runs,
+            "projects": projects,
+        }
+
+
+__all__ = ["OVERFLOW_ACTIONS", "ProjectQuota", "QueueFull", "RunQueue"]
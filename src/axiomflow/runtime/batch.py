@@ -0,0 +1,134 @@
+"""Sharing of input-invariant steps between the runs of a parameter sweep.
+
+A batch runs one workflow once per binding of its workflow ``inputs``.
+Steps that read none of the inputs varying across bindings, directly or
+through an upstream step, produce the same result in every run;
+:func:`invariant_steps` finds them from the plan's input references and
+edges, and :class:`SharedSteps` executes each of them once for the whole
+batch while the runs proceed concurrently. A shared step is started by the
+first run that reaches it; the other runs wait for its result instead of
+taking a slot of their own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Mapping, Sequence, Tuple
+
+from axiomflow.dsl.plan import WORKFLOW_INPUT, ExecutionPlan
+
+from .journal import result_digest
+from .shm import contains_shared
+
+_UNSHARED = object()
+
+
+def varying_inputs(bindings: Sequence[Mapping[str, Any]]) -> FrozenSet[str]:
+    """Return the input names whose value is not the same in every binding.
+
+    Values that cannot be digested are treated as varying.
+    """
+    names = {name for binding in bindings for name in binding}
+    varying = set()
+    for name in names:
+        digests = {
+            result_digest(binding[name]) if name in binding else "<missing>"
+            for binding in bindings
+        }
+        if len(digests) > 1 or None in digests:
+            varying.add(name)
+    return frozenset(varying)
+
+
+def invariant_steps(plan: ExecutionPlan, varying: FrozenSet[str]) -> FrozenSet[int]:
+    """Return the indexes of steps unaffected by the ``varying`` inputs.
+
+    A step is affected when it reads a varying workflow input or follows an
+    affected step along ``edges``. Steps on streaming edges are never
+    shared, since their items flow through channels owned by a single run.
+    """
+    affected = [False] * len(plan.steps)
+    for idx in plan.order:
+        step = plan.steps[idx]
+        if any(
+            ref.step == WORKFLOW_INPUT and ref.key in varying for ref in step.inputs
+        ):
+            affected[idx] = True
+        if affected[idx]:
+            for nxt in plan.successors[idx]:
+                affected[nxt] = True
+    streaming = {idx for idx, group in enumerate(plan.stream_consumers) if group}
+    streaming.update(nxt for group in plan.stream_consumers for nxt in group)
+    return frozenset(
+        idx
+        for idx in range(len(plan.steps))
+        if not affected[idx] and idx not in streaming
+    )
+
+
+class SharedSteps:
+    """Run each invariant step once across the runs of a batch.
+
+    Args:
+        invariant: Indexes of the steps to share.
+        max_concurrency: Cap on the steps executing at once across all runs
+            of the batch, ``None`` for no cap.
+    """
+
+    def __init__(
+        self, invariant: FrozenSet[int], max_concurrency: int | None = None
+    ) -> None:
+        self.invariant = invariant
+        self._results: Dict[int, asyncio.Future[Any]] = {}
+        self._limit = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        )
+
+    async def run(
+        self, idx: int, start: Callable[[], Awaitable[Tuple[Any, bool]]]
+    ) -> Tuple[Any, bool]:
+        """Execute step ``idx`` via ``start`` or reuse the batch's result.
+
+        Returns:
+            ``(result, cached)`` as from ``start``; reused results count as
+            cached.
+        """
+        if idx not in self.invariant:
+            return await self._execute(start)
+        while True:
+            future = self._results.get(idx)
+            if future is None:
+                break
+            # Shield the shared result from the cancellation of this run.
+            shared = await asyncio.shield(future)
+            if shared is _UNSHARED:
+                return await self._execute(start)
+            if shared is not None:
+                return shared[0], True
+            # The run executing the step was cancelled; take over.
+        future = self._results[idx] = asyncio.get_running_loop().create_future()
+        try:
+            outcome = await self._execute(start)
+        except asyncio.CancelledError:
+            del self._results[idx]
+            future.set_result(None)
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Followers re-raise it; do not warn about an unretrieved error.
+            future.exception()
+            raise
+        # Shared-memory handles are freed with the run that created them.
+        future.set_result(_UNSHARED if contains_shared(outcome[0]) else outcome)
+        return outcome
+
+    async def _execute(
+        self, start: Callable[[], Awaitable[Tuple[Any, bool]]]
+    ) -> Tuple[Any, bool]:
+        if self._limit is None:
+            return await start()
+        async with self._limit:
+            return await start()
+
+
+__all__ = ["SharedSteps", "invariant_steps", "varying_inputs"]
@@ -0,0 +1,253 @@
+"""PF-08 budget enforcement for workflow runs.
+
+A :class:`BudgetController` keeps a ledger of actual spend per project and
+of the spend still projected by every active run, computed from the
+``estimated_cost`` of the steps that have not finished yet. Executors check
+the ledger before launching each step, so a run is stopped as soon as its
+projected total would exceed the run or project budget instead of after the
+money has been spent. One controller can be shared by any number of
+concurrent runs and executors; all ledger updates happen under a lock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping
+
+BUDGET_ACTIONS = frozenset({"abort", "pause"})
+
+DEFAULT_PROJECT = "default"
+"""Project charged for runs that do not name one."""
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a run is aborted for a projected budget overrun.
+
+    Attributes:
+        report: Machine-readable overrun report.
+    """
+
+    def __init__(self, report: Mapping[str, Any]) -> None:
+        super().__init__(
+            f"Projected cost {report['projected']:.2f} exceeds "
+            f"{report['scope']} budget {report['budget']:.2f}"
+        )
+        self.report = dict(report)
+
+
+@dataclass
+class BudgetController:
+    """Shared spend ledger with per-run and per-project budgets.
+
+    Args:
+        project_budgets: Budget for each project ID.
+        default_budget: Budget for projects missing from
+            ``project_budgets``; ``None`` means unlimited.
+        run_budget: Budget for any single run; ``None`` means unlimited.
+        action: ``abort`` fails an overrunning run with
+            :class:`BudgetExceeded`; ``pause`` stops launching its steps
+            until the budget is raised or other runs release projected
+            spend.
+        report_dir: Directory receiving a JSON overrun report per run.
+    """
+
+    project_budgets: Dict[str, float] = field(default_factory=dict)
+    default_budget: float | None = None
+    run_budget: float | None = None
+    action: str = "abort"
+    report_dir: Path | str | None = None
+
+    def __post_init__(self) -> None:
+        if self.action not in BUDGET_ACTIONS:
+            raise ValueError(f"Unknown budget action: {self.action}")
+        if self.report_dir is not None:
+            self.report_dir = Path(self.report_dir)
+        self._lock = threading.Lock()
+        self._spent: Dict[str, float] = {}
+        self._pending: Dict[str, float] = {}
+        self._waiters: List[asyncio.Future[None]] = []
+
+    def budget_for(self, project: str) -> float | None:
+        """Return the budget of ``project``, ``None`` if unlimited."""
+        return self.project_budgets.get(project, self.default_budget)
+
+    def set_budget(self, project: str, budget: float | None) -> None:
+        """Change the budget of ``project`` and wake paused runs."""
+        with self._lock:
+            if budget is None:
+                self.project_budgets.pop(project, None)
+            else:
+                self.project_budgets[project] = budget
+        self._notify()
+
+    def spent(self, project: str) -> float:
+        """Return the actual spend recorded for ``project``."""
+        with self._lock:
+            return self._spent.get(project, 0.0)
+
+    def projected(self, project: str) -> float:
+        """Return actual plus projected spend of ``project``."""
+        with self._lock:
+            return self._spent.get(project, 0.0) + self._pending.get(project, 0.0)
+
+    def open_run(
+        self, run_id: str, project: str, estimates: Mapping[str, float]
+    ) -> "RunBudget":
+        """Register a run and add its projected spend to the ledger.
+
+        Args:
+            run_id: Identifier used in overrun reports.
+            project: Project the run is charged to.
+            estimates: Estimated cost of each unfinished step, keyed by step
+                ID in plan order.
+        """
+        account = RunBudget(self, run_id, project, estimates)
+        with self._lock:
+            self._pending[project] = (
+                self._pending.get(project, 0.0) + account.remaining
+            )
+        return account
+
+    def changed(self) -> asyncio.Future[None]:
+        """Return a future resolved the next time the ledger loosens."""
+        waiter = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters.append(waiter)
+        return waiter
+
+    def _notify(self) -> None:
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            loop = waiter.get_loop()
+            if loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    def _write_report(self, report: Mapping[str, Any]) -> None:
+        if self.report_dir is None:
+            return
+        directory = Path(self.report_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+        os.replace(tmp, directory / f"{report['run_id']}-budget.json")
+
+
+def _resolve(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class RunBudget:
+    """Ledger entry of one run, created by :meth:`BudgetController.open_run`.
+
+    Attributes:
+        spent: Actual spend of the run so far.
+        remaining: Estimated cost of the run's unfinished steps.
+    """
+
+    def __init__(
+        self,
+        controller: BudgetController,
+        run_id: str,
+        project: str,
+        estimates: Mapping[str, float],
+    ) -> None:
+        self.controller = controller
+        self.run_id = run_id
+        self.project = project
+        self._ids = list(estimates)
+        self._estimates = list(estimates.values())
+        self._open = [True] * len(self._estimates)
+        self.spent = 0.0
+        self.remaining = sum(self._estimates)
+        self.report: Dict[str, Any] | None = None
+
+    @property
+    def projected(self) -> float:
+        """Projected total cost of the run."""
+        return self.spent + self.remaining
+
+    def settle(self, index: int, cost: float) -> None:
+        """Replace the estimate of step ``index`` with its actual ``cost``."""
+        controller = self.controller
+        estimate = self._estimates[index] if self._open[index] else 0.0
+        self._open[index] = False
+        with controller._lock:
+            self.spent += cost
+            self.remaining -= estimate
+            project = self.project
+            controller._spent[project] = controller._spent.get(project, 0.0) + cost
+            controller._pending[project] = (
+                controller._pending.get(project, 0.0) - estimate
+            )
+        if cost < estimate:
+            controller._notify()
+
+    def check(self) -> Dict[str, Any] | None:
+        """Return an overrun report if a budget is projected to be exceeded."""
+        controller = self.controller
+        with controller._lock:
+            project_spent = controller._spent.get(self.project, 0.0)
+            project_projected = project_spent + controller._pending.get(
+                self.project, 0.0
+            )
+            project_budget = controller.budget_for(self.project)
+        run_budget = controller.run_budget
+        if run_budget is not None and self.projected > run_budget:
+            scope, budget, projected = "run", run_budget, self.projected
+        elif project_budget is not None and project_projected > project_budget:
+            scope, budget, projected = "project", project_budget, project_projected
+        else:
+            return None
+        return {
+            "run_id": self.run_id,
+            "project": self.project,
+            "scope": scope,
+            "action": controller.action,
+            "budget": budget,
+            "projected": projected,
+            "overrun": projected - budget,
+            "run_spent": self.spent,
+            "run_remaining": self.remaining,
+            "project_spent": project_spent,
+            "pending_steps": [
+                sid for sid, open_ in zip(self._ids, self._open) if open_
+            ],
+            "timestamp": time.time(),
+        }
+
+    def overrun(self, report: Mapping[str, Any]) -> None:
+        """Record ``report`` and write it out once per run."""
+        if self.report is None:
+            self.report = dict(report)
+            self.controller._write_report(report)
+
+    def close(self) -> None:
+        """Release the projected spend of steps that will not run."""
+        controller = self.controller
+        with controller._lock:
+            controller._pending[self.project] = (
+                controller._pending.get(self.project, 0.0) - self.remaining
+            )
+            self.remaining = 0.0
+            self._open = [False] * len(self._open)
+        controller._notify()
+
+
+__all__ = [
+    "BUDGET_ACTIONS",
+    "BudgetController",
+    "BudgetExceeded",
+    "DEFAULT_PROJECT",
+    "RunBudget",
+]
@@ -0,0 +1,271 @@
+"""Content-addressed memoization of workflow step results.
+
+Steps opt in through the DSL (``cache: true`` or ``cache: {ttl: 3600}``).
+A step's cache key is the canonical SHA-256 digest of its id, the function
+implementing it, its definition fingerprint and its resolved inputs, so a
+step is reused across runs and across workflows but never answered with
+another step's result. Results live in an in-memory LRU tier backed by an
+optional, size-bounded on-disk tier of JSON files.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+from axiomflow.core.hashing import canonical_digest
+from axiomflow.dsl.plan import PlanStep
+
+_MISS = (False, None)
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters for a :class:`StepCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    uncacheable: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters as a plain dictionary."""
+        return dict(self.__dict__)
+
+
+@dataclass
+class StepCache:
+    """Two-tier LRU cache for step results.
+
+    Args:
+        max_entries: Maximum number of results kept in memory.
+        directory: Directory for the on-disk tier. ``None`` disables it.
+        max_bytes: Size budget of the on-disk tier; least recently used
+            files are evicted once it is exceeded.
+    """
+
+    max_entries: int = 1024
+    directory: Path | str | None = None
+    max_bytes: int = 64 * 1024 * 1024
+    stats: CacheStats = field(default_factory=CacheStats, init=False)
+
+    def __post_init__(self) -> None:
+        self._memory: OrderedDict[str, Tuple[float | None, Any]] = OrderedDict()
+        self._dir = Path(self.directory) if self.directory is not None else None
+        # Sizes of the on-disk files in least recently used order, so writes
+        # never have to list the directory. Guarded by ``_lock`` because disk
+        # work runs in worker threads.
+        self._files: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if self._dir is not None:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            found = [(p.stat(), p.stem) for p in self._dir.glob("*.json")]
+            for stat, key in sorted(found, key=lambda item: item[0].st_mtime_ns):
+                self._files[key] = stat.st_size
+                self._disk_bytes += stat.st_size
+
+    def key(
+        self,
+        step: PlanStep,
+        inputs: Mapping[str, Any],
+        func: Callable[..., Any] | None = None,
+    ) -> str | None:
+        """Return the cache key for ``step`` called with ``inputs``.
+
+        The fingerprint ignores step ids, so the id and the qualified name of
+        ``func`` are part of the key: structurally identical steps must not
+        share results.
+
+        Returns ``None`` when the inputs are not JSON serialisable, in which
+        case the step is executed without caching.
+        """
+        record = {
+            "id": step.id,
+            "func": _qualified_name(func) if func is not None else None,
+            "step": step.fingerprint,
+            "inputs": inputs,
+        }
+        try:
+            return canonical_digest(record)
+        except (TypeError, ValueError):
+            self.stats.uncacheable += 1
+            return None
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Look up ``key``, returning ``(hit, result)``.
+
+        Every hit returns a fresh copy of the cached result, so callers may
+        mutate it without affecting later hits.
+        """
+        now = time.time()
+        hit = self._get_memory(key, now)
+        if hit is _MISS and self._dir is not None:
+            hit = self._remember_disk(key, self._read_disk(key, now))
+        return self._count(hit)
+
+    async def get_async(self, key: str) -> Tuple[bool, Any]:
+        """Like :meth:`get`, but reads the on-disk tier in a worker thread."""
+        now = time.time()
+        hit = self._get_memory(key, now)
+        if hit is _MISS and self._dir is not None:
+            record = await asyncio.to_thread(self._read_disk, key, now)
+            hit = self._remember_disk(key, record)
+        return self._count(hit)
+
+    def set(self, key: str, result: Any, ttl: float | None = None) -> None:
+        """Store a copy of ``result`` under ``key`` for ``ttl`` seconds.
+
+        Results that cannot be encoded as JSON are kept in memory only, and
+        results that cannot be copied are not cached at all.
+        """
+        expires = self._set_memory(key, result, ttl)
+        if expires is not False and self._dir is not None:
+            self._write_disk(key, expires, result)
+
+    async def set_async(self, key: str, result: Any, ttl: float | None = None) -> None:
+        """Like :meth:`set`, but writes the on-disk tier in a worker thread."""
+        expires = self._set_memory(key, result, ttl)
+        if expires is not False and self._dir is not None:
+            await asyncio.to_thread(self._write_disk, key, expires, result)
+
+    def clear(self) -> None:
+        """Remove every cached result from both tiers."""
+        self._memory.clear()
+        if self._dir is not None:
+            with self._lock:
+                self._files.clear()
+                self._disk_bytes = 0
+                for path in self._dir.glob("*.json"):
+                    self._unlink(path)
+
+    def _get_memory(self, key: str, now: float) -> Tuple[bool, Any]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return _MISS
+        expires, result = entry
+        if expires is not None and expires <= now:
+            del self._memory[key]
+            return _MISS
+        self._memory.move_to_end(key)
+        self.stats.memory_hits += 1
+        return True, copy.deepcopy(result)
+
+    def _remember_disk(
+        self, key: str, record: Tuple[float | None, Any] | None
+    ) -> Tuple[bool, Any]:
+        if record is None:
+            return _MISS
+        expires, result = record
+        self._remember(key, expires, copy.deepcopy(result))
+        self.stats.disk_hits += 1
+        return True, result
+
+    def _count(self, hit: Tuple[bool, Any]) -> Tuple[bool, Any]:
+        if hit[0]:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+        return hit
+
+    def _set_memory(
+        self, key: str, result: Any, ttl: float | None
+    ) -> float | None | bool:
+        """Remember a copy of ``result``; return its expiry or ``False``."""
+        try:
+            stored = copy.deepcopy(result)
+        except (TypeError, copy.Error):
+            self.stats.uncacheable += 1
+            return False
+        expires = time.time() + ttl if ttl is not None else None
+        self._remember(key, expires, stored)
+        return expires
+
+    def _remember(self, key: str, expires: float | None, result: Any) -> None:
+        self._memory[key] = (expires, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _read_disk(self, key: str, now: float) -> Tuple[float | None, Any] | None:
+        """Return ``(expires, result)`` from the disk tier, or ``None``."""
+        path = self._path(key)
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        expires = record.get("expires")
+        if expires is not None and expires <= now:
+            self._forget(key)
+            return None
+        try:
+            os.utime(path)
+        except OSError:  # pragma: no cover - concurrent removal
+            pass
+        with self._lock:
+            if key in self._files:
+                self._files.move_to_end(key)
+        return expires, record["result"]
+
+    def _write_disk(self, key: str, expires: float | None, result: Any) -> None:
+        """Write ``result`` to disk and evict least recently used files."""
+        try:
+            payload = json.dumps({"expires": expires, "result": result})
+        except (TypeError, ValueError):
+            return
+        with tempfile.NamedTemporaryFile(
+            "w", delete=False, dir=self._dir, suffix=".tmp", encoding="utf-8"
+        ) as tf:
+            tf.write(payload)
+            tmp_name = tf.name
+        size = os.path.getsize(tmp_name)
+        with self._lock:
+            os.replace(tmp_name, self._path(key))
+            self._disk_bytes += size - self._files.pop(key, 0)
+            self._files[key] = size
+            while self._disk_bytes > self.max_bytes and self._files:
+                victim, victim_size = self._files.popitem(last=False)
+                self._disk_bytes -= victim_size
+                self._unlink(self._path(victim))
+                self.stats.evictions += 1
+
+    def _forget(self, key: str) -> None:
+        """Drop ``key`` from the disk tier."""
+        with self._lock:
+            self._disk_bytes -= self._files.pop(key, 0)
+            self._unlink(self._path(key))
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}.json"  # type: ignore[operator]
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:  # pragma: no cover - concurrent removal
+            pass
+
+
+def _qualified_name(func: Callable[..., Any]) -> str:
+    """Return ``module.qualname`` of ``func``, looking through partials."""
+    while isinstance(func, functools.partial):
+        func = func.func
+    module = getattr(func, "__module__", None) or type(func).__module__
+    name = getattr(func, "__qualname__", None) or type(func).__qualname__
+    return f"{module}.{name}"
+
+
+__all__ = ["CacheStats", "StepCache"]
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import time
 from dataclasses import dataclass
@@ -13,6 +12,10 @@ from typing import Any, Awaitable, Callable, Mapping
 
 from cryptography.fernet import Fernet
 
+from axiomflow.core.hashing import canonical_digest
+
+from .tracing import span
+
 
 @dataclass(frozen=True)
 class Context:
@@ -24,8 +27,7 @@ class Context:
     @staticmethod
     def create(data: Mapping[str, Any]) -> "Context":
         """Create a context from a mapping, computing its integrity hash."""
-        serialised = json.dumps(dict(data), sort_keys=True).encode("utf-8")
-        digest = hashlib.sha256(serialised).hexdigest()
+        digest = canonical_digest(data)
         return Context(data=MappingProxyType(dict(data)), hash=digest)
 
 
@@ -83,6 +85,16 @@ class ContextManager:
             self._audit("rejected", recipient)
             raise ValueError("invalid recipient")
 
+        with span("handoff_context", "handoff", recipient=recipient):
+            return await self._handoff(context, recipient, transmit, timeout)
+
+    async def _handoff(
+        self,
+        context: Context,
+        recipient: str,
+        transmit: Callable[[bytes], Awaitable[bytes]] | None,
+        timeout: float,
+    ) -> Context:
         async with self._lock:
             self._audit("handoff_start", recipient)
             payload = self.serialize(context)
@@ -122,9 +134,7 @@ class ContextManager:
 
     def _hash(self, data: Mapping[str, Any]) -> str:
         """Generate SHA-256 hash for provided mapping."""
-        return hashlib.sha256(
-            json.dumps(dict(data), sort_keys=True).encode("utf-8")
-        ).hexdigest()
+        return canonical_digest(data)
 
 
 async def handoff_context(
@@ -0,0 +1,229 @@
+"""Runtime and cost estimates learned from executed steps.
+
+The ``estimated_runtime`` and ``estimated_cost`` of a step are written by
+hand and drift from reality as prompts, models and repositories change. An
+:class:`EstimateStore` keeps streaming statistics of what steps actually
+took, per workflow, step and persona: exponentially weighted moving
+averages of runtime and cost, which follow recent behaviour, and a
+:class:`~axiomflow.core.histogram.LatencyHistogram` sketch of runtimes for
+quantiles. Recording a sample is O(1), and the state kept for a step grows
+with the logarithm of its runtime range rather than its number of runs.
+
+:class:`WorkflowExecutor` records every executed step into the store given
+as its ``estimates`` and orders ready steps by the learned runtimes;
+:class:`WorkflowParser` given a store uses the learned values in place of
+the static estimates of steps with enough history.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Tuple
+
+from axiomflow.core.histogram import LatencyHistogram
+from axiomflow.dsl.plan import ExecutionPlan
+
+
+@dataclass
+class StepEstimate:
+    """Learned statistics of one step.
+
+    Attributes:
+        runs: Number of recorded executions.
+        runtime: Moving average of the runtime in seconds.
+        cost: Moving average of the cost.
+        total_cost: Sum of all recorded costs.
+        runtimes: Sketch of the runtime distribution.
+    """
+
+    runs: int = 0
+    runtime: float = 0.0
+    cost: float = 0.0
+    total_cost: float = 0.0
+    runtimes: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def update(self, runtime: float, cost: float, alpha: float) -> None:
+        """Fold one execution into the statistics."""
+        if self.runs:
+            self.runtime += alpha * (runtime - self.runtime)
+            self.cost += alpha * (cost - self.cost)
+        else:
+            self.runtime = runtime
+            self.cost = cost
+        self.runs += 1
+        self.total_cost += cost
+        self.runtimes.record(runtime)
+
+
+class EstimateStore:
+    """Streaming runtime and cost statistics per workflow, step and persona.
+
+    Args:
+        alpha: Weight of the newest execution in the moving averages.
+        quantile: Runtime quantile to report as the learned runtime instead
+            of the moving average, e.g. ``0.9`` to plan conservatively.
+        min_runs: Executions of a step needed before its learned values
+            replace the static estimates.
+        path: JSON file the store is loaded from, when it exists, and
+            written to by :meth:`save`.
+
+    Raises:
+        ValueError: If a setting is out of range.
+    """
+
+    def __init__(
+        self,
+        *,
+        alpha: float = 0.2,
+        quantile: float | None = None,
+        min_runs: int = 3,
+        path: Path | str | None = None,
+    ) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        if quantile is not None and not 0.0 <= quantile <= 1.0:
+            raise ValueError("quantile must be between 0 and 1")
+        if min_runs < 1:
+            raise ValueError("min_runs must be at least 1")
+        self.alpha = alpha
+        self.quantile = quantile
+        self.min_runs = min_runs
+        self.path = Path(path) if path is not None else None
+        self._steps: Dict[Tuple[str, str, str], StepEstimate] = {}
+        if self.path is not None and self.path.exists():
+            self._load(self.path)
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def record(
+        self,
+        workflow: str,
+        step: str,
+        persona: str | None,
+        runtime: float,
+        cost: float = 0.0,
+    ) -> None:
+        """Record one execution of ``step``."""
+        key = (workflow, step, persona or "")
+        stats = self._steps.get(key)
+        if stats is None:
+            stats = self._steps[key] = StepEstimate()
+        stats.update(runtime, cost, self.alpha)
+
+    def get(
+        self, workflow: str, step: str, persona: str | None = None
+    ) -> StepEstimate | None:
+        """Return the statistics of ``step``, if it was ever recorded."""
+        return self._steps.get((workflow, step, persona or ""))
+
+    def runtime(
+        self, workflow: str, step: str, persona: str | None = None
+    ) -> float | None:
+        """Return the learned runtime of ``step``; ``None`` without enough runs."""
+        stats = self._trusted(workflow, step, persona)
+        if stats is None:
+            return None
+        if self.quantile is not None:
+            return stats.runtimes.quantile(self.quantile)
+        return stats.runtime
+
+    def cost(
+        self, workflow: str, step: str, persona: str | None = None
+    ) -> float | None:
+        """Return the learned cost of ``step``; ``None`` without enough runs."""
+        stats = self._trusted(workflow, step, persona)
+        return stats.cost if stats is not None else None
+
+    def _trusted(
+        self, workflow: str, step: str, persona: str | None
+    ) -> StepEstimate | None:
+        stats = self._steps.get((workflow, step, persona or ""))
+        if stats is None or stats.runs < self.min_runs:
+            return None
+        return stats
+
+    def runtimes(self, plan: ExecutionPlan) -> List[float]:
+        """Return the runtime of each step of ``plan``, learned or static."""
+        values = []
+        for step in plan.steps:
+            learned = self.runtime(plan.name, step.id, step.persona)
+            values.append(step.estimated_runtime if learned is None else learned)
+        return values
+
+    def costs(self, plan: ExecutionPlan) -> List[float]:
+        """Return the cost of each step of ``plan``, learned or static."""
+        values = []
+        for step in plan.steps:
+            learned = self.cost(plan.name, step.id, step.persona)
+            values.append(step.estimated_cost if learned is None else learned)
+        return values
+
+    def apply(self, workflow: Dict[str, Any]) -> int:
+        """Overwrite the static estimates of a parsed workflow's steps.
+
+        Only steps with at least ``min_runs`` recorded executions are
+        changed.
+
+        Returns:
+            The number of steps updated.
+        """
+        name = str(workflow.get("name", ""))
+        updated = 0
+        for step in workflow.get("steps", []):
+            runtime = self.runtime(name, step["id"], step.get("persona"))
+            if runtime is None:
+                continue
+            step["estimated_runtime"] = runtime
+            step["estimated_cost"] = self.cost(name, step["id"], step.get("persona"))
+            updated += 1
+        return updated
+
+    def save(self, path: Path | str | None = None) -> Path:
+        """Atomically write the store to ``path`` or its own ``path``.
+
+        Raises:
+            ValueError: If no path is given or configured.
+        """
+        target = Path(path) if path is not None else self.path
+        if target is None:
+            raise ValueError("No path to save the estimate store to")
+        entries = [
+            {
+                "workflow": workflow,
+                "step": step,
+                "persona": persona,
+                "runs": stats.runs,
+                "runtime": stats.runtime,
+                "cost": stats.cost,
+                "total_cost": stats.total_cost,
+                "runtimes": stats.runtimes.to_dict(),
+            }
+            for (workflow, step, persona), stats in self._steps.items()
+        ]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"steps": entries}, fh, separators=(",", ":"))
+        os.replace(tmp, target)
+        return target
+
+    def _load(self, path: Path) -> None:
+        with open(path, "r", encoding="utf-8") as fh:
+            data: Mapping[str, Any] = json.load(fh)
+        for entry in data.get("steps", []):
+            key = (entry["workflow"], entry["step"], entry["persona"])
+            self._steps[key] = StepEstimate(
+                runs=int(entry["runs"]),
+                runtime=float(entry["runtime"]),
+                cost=float(entry["cost"]),
+                total_cost=float(entry["total_cost"]),
+                runtimes=LatencyHistogram.from_dict(entry["runtimes"]),
+            )
+
+
+__all__ = ["EstimateStore", "StepEstimate"]
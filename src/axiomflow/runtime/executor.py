@@ -2,16 +2,294 @@
 
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, List
+import asyncio
+import functools
+import heapq
+import inspect
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+)
 
-from .recovery import RecoveryManager, RetryPolicy
+from axiomflow.core.config import Config
+from axiomflow.core.hashing import canonical_digest
+from axiomflow.dsl.plan import WORKFLOW_INPUT, ExecutionPlan, ForeachSpec, PlanStep
+from axiomflow.dsl.simulator import simulate
+
+from .batch import SharedSteps, invariant_steps, varying_inputs
+from .budget import DEFAULT_PROJECT, BudgetController, BudgetExceeded, RunBudget
+from .cache import StepCache
+from .estimates import EstimateStore
+from .foreach import map_chunked
+from .hedging import HedgingPolicy
+from .journal import JournalState, RunJournal, result_digest
+from .pools import StepPools
+from .recovery import RecoveryManager, RetryPolicy, _attempt, _attempt_limit
+from .results import ResultStore
+from .scheduler import ResourceScheduler
+from .shm import contains_shared, free_shared
+from .streams import StreamChannel
+from .taskqueue import RemoteStepError, TaskOutcome, TaskQueue
+from .tracing import Tracer, current_tracer, span
+
+logger = logging.getLogger(__name__)
+
+
+def _accepted_params(func: Callable[..., Any]) -> FrozenSet[str] | None:
+    """Return keyword parameter names ``func`` accepts.
+
+    ``None`` means the callable takes ``**kwargs`` (or cannot be inspected)
+    and every declared input should be passed.
+    """
+    try:
+        return _signature_params(func)
+    except TypeError:  # unhashable callable
+        return _signature_params.__wrapped__(func)
+
+
+def _step_params(step: PlanStep, func: Callable[..., Any]) -> FrozenSet[str] | None:
+    """Return the inputs of ``step`` to resolve for ``func``.
+
+    A ``foreach`` step always receives its list input, which is split into
+    items before ``func`` is called.
+    """
+    accepted = _accepted_params(func)
+    if accepted is None or step.foreach is None:
+        return accepted
+    return accepted | {step.foreach.input}
+
+
+@lru_cache(maxsize=1024)
+def _signature_params(func: Callable[..., Any]) -> FrozenSet[str] | None:
+    try:
+        params = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    names = set()
+    for param in params:
+        if param.kind is param.VAR_KEYWORD:
+            return None
+        if param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY):
+            names.add(param.name)
+    return frozenset(names)
+
+
+def _has_streams(kwargs: Mapping[str, Any]) -> bool:
+    """Return whether any argument is a stream, which cannot leave the process."""
+    return any(hasattr(value, "__aiter__") for value in kwargs.values())
+
+
+async def _traced_step(step: PlanStep, coro: Awaitable[Any]) -> Any:
+    """Await ``coro`` inside a span on the lane of ``step``."""
+    with span(step.id, "step", lane=step.id, step=step.id):
+        return await coro
+
+
+def _run_fingerprints(
+    plan: ExecutionPlan, inputs: Mapping[str, Any]
+) -> Dict[str, str | None]:
+    """Fingerprint each step's definition and the workflow inputs it reads.
+
+    Upstream step outputs are not included: a step downstream of a changed
+    step is dirty through the edge, whatever its own fingerprint. Steps
+    reading an input that cannot be digested get ``None`` and never match.
+    """
+    digests: Dict[str, str | None] = {}
+    prints: Dict[str, str | None] = {}
+    for step in plan.steps:
+        keys = sorted({ref.key for ref in step.inputs if ref.step == WORKFLOW_INPUT})
+        if not keys:
+            prints[step.id] = step.fingerprint
+            continue
+        values = {}
+        for key in keys:
+            if key not in digests:
+                digests[key] = result_digest(inputs.get(key))
+            values[key] = digests[key]
+        if None in values.values():
+            prints[step.id] = None
+        else:
+            prints[step.id] = canonical_digest(
+                {"step": step.fingerprint, "inputs": values}
+            )
+    return prints
+
+
+def _hedge_key(workflow: str, step: PlanStep) -> Tuple[str, str] | None:
+    """Return the latency history key of ``step``; only idempotent steps hedge.
+
+    Keys include the workflow, so that same-named steps of different
+    workflows sharing a :class:`HedgingPolicy` keep separate histories.
+    """
+    return (workflow, step.id) if step.idempotent else None
+
+
+@dataclass
+class _Run:
+    """Mutable state of a single workflow run."""
+
+    plan: ExecutionPlan
+    funcs: List[Callable[..., Any]]
+    store: ResultStore
+    run_id: str | None = None
+    journal: RunJournal | None = None
+    runtime: float = 0.0
+    cost: float = 0.0
+    saved_runtime: float = 0.0
+    saved_cost: float = 0.0
+    completed: Dict[int, Any] = field(default_factory=dict)
+    queue_wait: Dict[str, float] = field(default_factory=dict)
+    deadline: float | None = None
+    project: str = DEFAULT_PROJECT
+    budget: RunBudget | None = None
+    reused: List[str] = field(default_factory=list)
+    pruned: List[str] = field(default_factory=list)
+    inherited: bool = False
+    batch: SharedSteps | None = None
+    compensations: Mapping[str, Callable[[Any], Any]] = field(default_factory=dict)
+    compensable: Dict[int, Any] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the public result of the run."""
+        return {
+            "run_id": self.run_id,
+            "runtime": self.runtime,
+            "cost": self.cost,
+            "saved": {"runtime": self.saved_runtime, "cost": self.saved_cost},
+            "outputs": self.store.sink_outputs(),
+            "queue_wait": dict(self.queue_wait),
+            "reused": list(self.reused),
+            "pruned": list(self.pruned),
+        }
+
+
+def _unchanged(
+    plan: ExecutionPlan, state: JournalState, fingerprints: Mapping[str, Any]
+) -> Dict[int, Any]:
+    """Return recorded results of steps whose fingerprint still matches."""
+    completed = {}
+    for step in plan.steps:
+        recorded = state.fingerprints.get(step.id)
+        if (
+            step.id in state.completed
+            and recorded is not None
+            and recorded == fingerprints[step.id]
+        ):
+            completed[step.index] = state.completed[step.id]
+    return completed
 
 
 class WorkflowExecutor:
-    """Execute workflow steps with automatic recovery."""
+    """Execute workflow steps with automatic recovery.
 
-    def __init__(self, recovery_manager: RecoveryManager | None = None) -> None:
+    Args:
+        recovery_manager: Manager used to retry and recover failing steps.
+        max_concurrency: Maximum number of steps running at the same time
+            within a workflow. ``1`` runs steps serially in topological
+            order; ``None`` removes the cap entirely.
+        cache: Optional result cache for steps that opt in with ``cache``
+            in the DSL.
+        journal_dir: Directory for durable run journals. When set, every
+            run is journaled and can be continued with :meth:`resume`.
+        scheduler: Optional node budget; steps are admitted only while the
+            sum of the ``estimated_cpu``/``estimated_memory`` of running
+            steps fits it. Share one scheduler between executors to bound
+            the whole process.
+        pools: Thread and process pools used for steps that do not run
+            inline on the event loop.
+        stream_buffer: Capacity of each streaming edge; a producer that is
+            this many items ahead of a consumer waits for it.
+        workflow_timeout: Default time limit in seconds for a whole run.
+            When it expires, in-flight steps are cancelled (running their
+            cleanup) and the run fails with :class:`TimeoutError`.
+        budget: Optional spend ledger (PF-08). Runs are charged to their
+            ``project`` and stopped before launching a step once their
+            projected cost exceeds the run or project budget.
+        hedging: Optional straggler policy. Attempts of steps marked
+            ``idempotent`` that run longer than a percentile of their past
+            runtimes get a duplicate attempt; the first to finish wins.
+        task_queue: When set, steps are enqueued as tasks and run by
+            :class:`~axiomflow.runtime.taskqueue.QueueWorker` processes
+            instead of in this process. Streaming steps and steps consuming
+            streams still run here. Step arguments and results must be
+            JSON-serialisable.
+        trace_dir: When set, every run records timed spans for queueing,
+            steps, attempts, backoff sleeps and cleanup, written as a Chrome
+            trace (``<run_id>.trace.json``) that opens in Perfetto.
+        estimates: Store the runtime and cost of every executed step are
+            recorded in. Its learned runtimes, rather than the static
+            ``estimated_runtime``, decide which ready steps start first, and
+            its learned costs feed the budget's spend projections.
+        default_retry: Retry policy of plan steps without a ``retry`` block.
+            ``None`` leaves them to the recovery manager's default policy of
+            three attempts. Pass
+            :data:`~axiomflow.runtime.recovery.SINGLE_ATTEMPT` to run them
+            once, which also lets them skip the recovery manager.
+    """
+
+    def __init__(
+        self,
+        recovery_manager: RecoveryManager | None = None,
+        *,
+        max_concurrency: int | None = 1,
+        cache: StepCache | None = None,
+        journal_dir: Path | str | None = None,
+        scheduler: ResourceScheduler | None = None,
+        pools: StepPools | None = None,
+        stream_buffer: int = 64,
+        workflow_timeout: float | None = None,
+        budget: BudgetController | None = None,
+        hedging: HedgingPolicy | None = None,
+        task_queue: TaskQueue | None = None,
+        trace_dir: Path | str | None = None,
+        estimates: EstimateStore | None = None,
+        default_retry: RetryPolicy | None = None,
+    ) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if stream_buffer < 1:
+            raise ValueError("stream_buffer must be at least 1")
         self.recovery_manager = recovery_manager or RecoveryManager()
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.journal_dir = Path(journal_dir) if journal_dir is not None else None
+        self.scheduler = scheduler
+        self.pools = pools or StepPools()
+        self.stream_buffer = stream_buffer
+        self.workflow_timeout = workflow_timeout
+        self.budget = budget
+        self.hedging = hedging
+        self.task_queue = task_queue
+        self.trace_dir = Path(trace_dir) if trace_dir is not None else None
+        self.estimates = estimates
+        self.default_retry = default_retry
+
+    @classmethod
+    def from_config(cls, config: Config, **kwargs: Any) -> "WorkflowExecutor":
+        """Create an executor from the orchestrator configuration.
+
+        Reads ``workflow_timeout`` from the ``orchestrator`` section of
+        ``config`` (or a top-level override); ``kwargs`` are passed on.
+        """
+        section = config.get("orchestrator") or {}
+        timeout = config.get("workflow_timeout", section.get("workflow_timeout"))
+        if timeout is not None:
+            kwargs.setdefault("workflow_timeout", float(timeout))
+        return cls(**kwargs)
 
     async def run_step(
         self,
@@ -20,74 +298,1036 @@ class WorkflowExecutor:
         retry_policy: RetryPolicy | None = None,
         compensation: Callable[[Exception], Any] | None = None,
         cleanup: Callable[[], Any] | None = None,
+        execution: str = "auto",
+        timeout: float | None = None,
+        deadline: float | None = None,
+        hedge_key: Hashable | None = None,
         **kwargs: Any,
     ) -> Any:
-        """Run a workflow step using the recovery manager."""
+        """Run a workflow step using the recovery manager.
+
+        ``execution`` selects where ``func`` runs: ``inline`` on the event
+        loop, in the ``thread`` pool, in the ``process`` pool, or ``auto``
+        (coroutine functions inline, everything else in the thread pool).
+        ``timeout`` limits each attempt and ``deadline`` (an absolute
+        :func:`time.monotonic` time) all of them; see
+        :meth:`RecoveryManager.execute`. Cancellation is cooperative: the
+        step stops waiting at once, but work already running in a thread or
+        process finishes in the background.
+
+        With a ``hedge_key`` and a :class:`HedgingPolicy` on the executor,
+        each attempt is hedged using the latency history recorded under that
+        key. Only pass one for idempotent steps: the duplicate attempt may
+        run to completion alongside the original.
+
+        A single-attempt call with no compensation, cleanup, hedging,
+        escalation hook or active tracer has nothing to recover and skips
+        the recovery manager; coroutine functions without a time limit are
+        then simply awaited.
+        """
+        if (
+            retry_policy is not None
+            and retry_policy.max_attempts == 1
+            and compensation is None
+            and cleanup is None
+            and (hedge_key is None or self.hedging is None)
+            and self.recovery_manager.escalation_hook is None
+            and current_tracer() is None
+        ):
+            limit = _attempt_limit(deadline, timeout)
+            if (
+                limit is None
+                and execution != "thread"
+                and execution != "process"
+                and inspect.iscoroutinefunction(func)
+            ):
+                return await func(*args, **kwargs)
+            call = self.pools.bind(func, execution)
+            return await _attempt(call, limit, *args, **kwargs)
+        call = self.pools.bind(func, execution)
+        if hedge_key is not None and self.hedging is not None:
+            call = functools.partial(self.hedging.run, hedge_key, call)
         return await self.recovery_manager.execute(
-            func,
+            call,
             *args,
             retry_policy=retry_policy,
             compensation=compensation,
             cleanup=cleanup,
+            timeout=timeout,
+            deadline=deadline,
             **kwargs,
         )
 
     async def run_workflow(
         self,
-        workflow: Dict[str, Any],
+        workflow: Dict[str, Any] | ExecutionPlan,
         step_funcs: Dict[str, Callable[..., Any]],
         dry_run: bool = False,
-    ) -> Dict[str, float]:
+        *,
+        inputs: Mapping[str, Any] | None = None,
+        run_id: str | None = None,
+        timeout: float | None = None,
+        project: str = DEFAULT_PROJECT,
+        base_run: str | None = None,
+        compensations: Mapping[str, Callable[[Any], Any]] | None = None,
+    ) -> Dict[str, Any]:
         """Execute all workflow steps respecting dependencies.
 
+        Each step is launched as soon as all of its incoming ``edges`` are
+        satisfied, up to the concurrency cap; when more steps are ready than
+        there are free slots, those on the longest remaining path (by
+        ``estimated_runtime``) go first. When a step fails, every in-flight
+        sibling is cancelled and the original error is re-raised.
+
+        Declared step ``inputs`` are resolved from upstream step outputs,
+        workflow ``inputs`` or literals and passed to the step function as
+        keyword arguments (only those the function accepts). A step's
+        outputs are the keys of its returned mapping matching its declared
+        ``outputs``.
+
+        Steps may be async generators. Their yielded items are collected
+        into lists per declared output, and successors joined to them by an
+        edge marked ``stream: true`` start together with them and receive
+        the matching inputs as async iterators fed through bounded channels.
+        Such pipelined consumers do not take a concurrency slot or scheduler
+        reservation of their own, and generator steps are not retried,
+        since items already delivered cannot be recalled.
+
+        ``foreach`` steps call their function once per item of a list
+        input, a chunk of items at a time with bounded concurrency, each
+        item retried on its own. Failed items leave ``None`` in the ordered
+        results and are reported under the step's ``errors`` output.
+
+        An edge with a ``condition`` is only taken if the condition
+        holds for its source step's result. A step is pruned, without being
+        called, when an edge from a step whose outputs it reads is not
+        taken or when none of its incoming edges is; pruning carries on
+        downstream as far as it cuts steps off. Pruned sink steps report
+        empty ``outputs``.
+
+        Steps without a ``retry`` block use the executor's ``default_retry``.
+        A step's ``timeout`` in the DSL limits each of its attempts; attempts
+        that time out are retried like any other failure, but never past the
+        run's deadline (see ``timeout`` below).
+
+        Steps marked ``cache`` in the DSL are looked up in the executor's
+        :class:`StepCache` first; hits are not executed and their recorded
+        ``runtime``/``cost`` are reported under ``saved`` instead.
+
+        With a ``base_run``, only the dirty part of the workflow runs: steps
+        whose definition or workflow inputs changed since that run, steps
+        it did not finish, and everything downstream of them along
+        ``edges``. Every other step reuses its result from the base run's
+        journal. The new run journals reused results as well, so it can be
+        the base of the next edit.
+
+        ``compensations`` make the run a saga: when it fails, times out or
+        is cancelled, every step that completed in it and has a
+        compensation handler is undone by calling the handler with the
+        step's result. A step is compensated only after all compensated
+        steps downstream of it, and independent branches are compensated
+        concurrently, so rollback takes as long as the deepest chain of
+        handlers. Failed handlers are logged and journaled without stopping
+        the rollback; the run still raises its original error. Cache hits
+        and reused steps did not run and are not compensated.
+
         Args:
-            workflow: Parsed workflow dictionary.
+            workflow: Parsed workflow dictionary or a compiled
+                :class:`ExecutionPlan`. Dictionaries are compiled on every
+                call; pass a plan to reuse it across runs.
             step_funcs: Mapping of step IDs to callables.
-            dry_run: If ``True``, walk the graph without executing steps.
+            dry_run: If ``True``, do not execute steps; the summary instead
+                carries a ``simulation`` of the run on this executor's
+                concurrency cap (see :func:`~axiomflow.dsl.simulator.simulate`).
+            inputs: Values for the workflow-level inputs.
+            run_id: Identifier of the run's journal, trace and budget
+                reports. Generated when any of them is enabled and none is
+                given.
+            timeout: Time limit for this run, overriding the executor's
+                ``workflow_timeout``.
+            project: Project the run's spend is charged to.
+            base_run: Identifier of an earlier journaled run of the
+                workflow to reuse unchanged results from.
+            compensations: Handlers undoing completed steps, keyed by step
+                ID. Coroutine functions run on the event loop, other
+                callables in the thread pool.
 
         Returns:
-            Dictionary with actual ``runtime`` and ``cost`` totals.
+            Dictionary with the ``run_id``, actual ``runtime`` and ``cost``
+            totals, the ``saved`` totals of cache hits, the ``outputs`` of
+            the sink steps, the ``queue_wait`` (seconds between becoming
+            ready and starting) of each executed step, keyed by step ID,
+            and the IDs of the ``reused`` steps that did not run and of the
+            ``pruned`` steps.
+
+        Raises:
+            ValueError: If ``compensations`` names a step not in the workflow.
+            RuntimeError: If ``base_run`` is given without a ``journal_dir``.
+            FileNotFoundError: If no journal exists for ``base_run``.
+            TimeoutError: If the run exceeds its time limit or a step its
+                ``timeout`` on the last attempt.
+            BudgetExceeded: If the budget controller aborts the run.
         """
-        order = self._topological_sort(workflow)
-        total_runtime = 0.0
-        total_cost = 0.0
-        for step in order:
-            sid = step["id"]
-            func = step_funcs.get(sid)
-            if dry_run:
-                continue
-            if func is None:
-                raise ValueError(f"Missing function for step {sid}")
-            result = await self.run_step(func)
-            if isinstance(result, dict):
-                total_runtime += float(result.get("runtime", 0.0))
-                total_cost += float(result.get("cost", 0.0))
-        return {"runtime": total_runtime, "cost": total_cost}
+        plan = self._as_plan(workflow)
+        for sid in compensations or {}:
+            if sid not in plan.index:
+                raise ValueError(f"Compensation for unknown step {sid}")
+        if dry_run:
+            summary = _Run(plan=plan, funcs=[], store=ResultStore(plan, {})).summary()
+            summary["simulation"] = simulate(
+                plan, default_workers=None, max_concurrency=self.max_concurrency
+            ).as_dict()
+            return summary
+        run = self._prepare(plan, step_funcs, inputs or {})
+        run.compensations = compensations or {}
+        self._begin(run, run_id, timeout, project, base_run)
+        return await self._execute(run)
 
-    def _topological_sort(self, workflow: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Return workflow steps in dependency order.
+    async def run_batch(
+        self,
+        workflow: Dict[str, Any] | ExecutionPlan,
+        step_funcs: Dict[str, Callable[..., Any]],
+        bindings: Sequence[Mapping[str, Any]],
+        *,
+        inputs: Mapping[str, Any] | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        project: str = DEFAULT_PROJECT,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Run a workflow once per binding of its inputs, sharing common steps.
+
+        Each run receives ``inputs`` updated with its binding. Steps that
+        read none of the inputs whose value differs between bindings,
+        directly or through an upstream step, execute once for the whole
+        batch and their result is reused by every run, which reports it
+        under ``saved`` like a cache hit. Only the subgraph depending on the
+        varying inputs executes per binding. Runs proceed concurrently,
+        each under the executor's concurrency cap, and ``max_concurrency``
+        additionally bounds the steps executing at once across the batch.
 
         Args:
-            workflow: Workflow dictionary.
+            workflow: Parsed workflow dictionary or a compiled
+                :class:`ExecutionPlan`.
+            step_funcs: Mapping of step IDs to callables.
+            bindings: Workflow input values of each run.
+            inputs: Input values common to all runs.
+            max_concurrency: Cap on steps executing at once across the
+                batch; defaults to the executor's ``max_concurrency``.
+            timeout: Time limit of each run, overriding the executor's
+                ``workflow_timeout``.
+            project: Project the runs' spend is charged to.
+            return_exceptions: Return the exception of a failed run in its
+                place instead of cancelling the rest of the batch.
 
         Returns:
-            List of step dictionaries sorted topologically.
+            The summary of each run, in the order of ``bindings``, as
+            returned by :meth:`run_workflow`.
+
+        Raises:
+            ValueError: If a binding lacks a workflow input or a step
+                function is missing.
         """
-        steps = {s["id"]: s for s in workflow.get("steps", [])}
-        in_degree = {sid: 0 for sid in steps}
-        for edge in workflow.get("edges", []):
-            in_degree[edge["to"]] += 1
-        queue = [sid for sid, deg in in_degree.items() if deg == 0]
-        order: List[Dict[str, Any]] = []
-        while queue:
-            sid = queue.pop(0)
-            order.append(steps[sid])
-            for edge in workflow.get("edges", []):
-                if edge["from"] == sid:
-                    to = edge["to"]
-                    in_degree[to] -= 1
-                    if in_degree[to] == 0:
-                        queue.append(to)
-        if len(order) != len(steps):
-            raise ValueError("Circular dependency detected")
-        return order
+        plan = self._as_plan(workflow)
+        common = dict(inputs or {})
+        merged = [{**common, **binding} for binding in bindings]
+        runs = [self._prepare(plan, step_funcs, values) for values in merged]
+        shared = SharedSteps(
+            invariant_steps(plan, varying_inputs(merged)),
+            self.max_concurrency if max_concurrency is None else max_concurrency,
+        )
+        for run in runs:
+            run.batch = shared
+            self._begin(run, None, timeout, project)
+        if return_exceptions:
+            return await asyncio.gather(
+                *(self._execute(run) for run in runs), return_exceptions=True
+            )
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(self._execute(run)) for run in runs]
+        except BaseExceptionGroup as exc:
+            # Surface the first failure as run_workflow would.
+            raise exc.exceptions[0] from None
+        return [task.result() for task in tasks]
+
+    def _begin(
+        self,
+        run: _Run,
+        run_id: str | None,
+        timeout: float | None,
+        project: str,
+        base_run: str | None = None,
+    ) -> None:
+        """Set the limits, identity and journal of a prepared run."""
+        plan = run.plan
+        run.deadline = self._deadline(timeout)
+        run.project = project
+        run.run_id = run_id
+        fingerprints = _run_fingerprints(plan, run.store.inputs)
+        if base_run is not None:
+            base = JournalState.load(self._journal_path(base_run))
+            run.completed = _unchanged(plan, base, fingerprints)
+            run.inherited = True
+        if run_id is None and (
+            self.journal_dir is not None
+            or self.budget is not None
+            or self.trace_dir is not None
+        ):
+            run.run_id = uuid.uuid4().hex
+        if self.journal_dir is not None:
+            run.journal = RunJournal(self.journal_dir / f"{run.run_id}.jsonl")
+            serialisable = result_digest(run.store.inputs) is not None
+            run.journal.append(
+                "run_start",
+                workflow=plan.name,
+                version=plan.version,
+                project=project,
+                inputs=run.store.inputs if serialisable else None,
+                fingerprints=fingerprints,
+                base_run=base_run,
+            )
+
+    async def resume(
+        self,
+        run_id: str,
+        workflow: Dict[str, Any] | ExecutionPlan,
+        step_funcs: Dict[str, Callable[..., Any]],
+        *,
+        inputs: Mapping[str, Any] | None = None,
+        timeout: float | None = None,
+        project: str = DEFAULT_PROJECT,
+    ) -> Dict[str, Any]:
+        """Continue a journaled run, executing only unfinished steps.
+
+        Steps recorded as finished are not executed again as long as their
+        definition is unchanged and every upstream step also finished;
+        their recorded results feed the remaining frontier of the DAG.
+        Totals in the returned summary only cover the work done now.
+
+        The resume journals the current step fingerprints together with the
+        results it reuses, so a later resume compares against this one
+        rather than the original run.
+
+        Args:
+            run_id: Identifier returned by the interrupted :meth:`run_workflow`.
+            workflow: The same workflow (dictionary or plan) that was run.
+            step_funcs: Mapping of step IDs to callables.
+            inputs: Workflow inputs; defaults to those recorded in the journal.
+            timeout: Time limit for the resumed part of the run, overriding
+                the executor's ``workflow_timeout``.
+            project: Project the resumed work is charged to.
+
+        Raises:
+            RuntimeError: If journaling is not enabled.
+            FileNotFoundError: If no journal exists for ``run_id``.
+        """
+        path = self._journal_path(run_id)
+        state = JournalState.load(path)
+        plan = self._as_plan(workflow)
+        run = self._prepare(plan, step_funcs, inputs or state.inputs)
+        run.run_id = run_id
+        run.deadline = self._deadline(timeout)
+        run.project = project
+        fingerprints = _run_fingerprints(plan, run.store.inputs)
+        run.completed = _unchanged(plan, state, fingerprints)
+        run.inherited = True
+        run.journal = RunJournal(path)
+        serialisable = result_digest(run.store.inputs) is not None
+        run.journal.append(
+            "run_resume",
+            completed=len(run.completed),
+            inputs=run.store.inputs if serialisable else None,
+            fingerprints=fingerprints,
+        )
+        return await self._execute(run)
+
+    def _journal_path(self, run_id: str) -> Path:
+        """Return the existing journal of ``run_id``.
+
+        Raises:
+            RuntimeError: If journaling is not enabled.
+            FileNotFoundError: If the journal does not exist.
+        """
+        if self.journal_dir is None:
+            raise RuntimeError("Reusing a run requires a journal_dir")
+        path = self.journal_dir / f"{run_id}.jsonl"
+        if not path.exists():
+            raise FileNotFoundError(path)
+        return path
+
+    def _deadline(self, timeout: float | None) -> float | None:
+        """Return the absolute deadline of a run starting now."""
+        if timeout is None:
+            timeout = self.workflow_timeout
+        return None if timeout is None else time.monotonic() + timeout
+
+    @staticmethod
+    def _as_plan(workflow: Dict[str, Any] | ExecutionPlan) -> ExecutionPlan:
+        if isinstance(workflow, ExecutionPlan):
+            return workflow
+        return ExecutionPlan.from_workflow(workflow)
+
+    def _prepare(
+        self,
+        plan: ExecutionPlan,
+        step_funcs: Dict[str, Callable[..., Any]],
+        inputs: Mapping[str, Any],
+    ) -> _Run:
+        """Bind step functions and inputs to ``plan`` for a new run."""
+        try:
+            funcs = [step_funcs[step.id] for step in plan.steps]
+        except KeyError as exc:
+            raise ValueError(f"Missing function for step {exc.args[0]}") from None
+        for step in plan.steps:
+            for ref in step.inputs:
+                if ref.step == WORKFLOW_INPUT and ref.key not in inputs:
+                    raise ValueError(f"Missing workflow input {ref.key}")
+        if self.scheduler is not None:
+            for step in plan.steps:
+                if not self.scheduler.fits_node(
+                    step.estimated_cpu, step.estimated_memory
+                ):
+                    raise ValueError(f"Step {step.id} exceeds the node budget")
+        for step in plan.steps:
+            if not plan.stream_consumers[step.index]:
+                continue
+            if not inspect.isasyncgenfunction(funcs[step.index]):
+                raise ValueError(f"Step {step.id} must be an async generator")
+            for consumer in plan.stream_consumers[step.index]:
+                func = funcs[consumer]
+                if not (
+                    inspect.iscoroutinefunction(func)
+                    or inspect.isasyncgenfunction(func)
+                ):
+                    raise ValueError(
+                        f"Step {plan.steps[consumer].id} must be async to stream"
+                    )
+        return _Run(plan=plan, funcs=funcs, store=ResultStore(plan, inputs))
+
+    async def _execute(self, run: _Run) -> Dict[str, Any]:
+        """Run ``run``, tracing it when a ``trace_dir`` is configured."""
+        if self.trace_dir is None:
+            return await self._schedule(run)
+        tracer = Tracer(f"{run.plan.name} {run.run_id}")
+        try:
+            with tracer.activate(), span(
+                "run", "run", lane="run", workflow=run.plan.name, run_id=run.run_id
+            ):
+                return await self._schedule(run)
+        finally:
+            tracer.export(self.trace_dir / f"{run.run_id}.trace.json")
+
+    async def _schedule(self, run: _Run) -> Dict[str, Any]:
+        """Run the steps of ``run.plan`` as their predecessors complete."""
+        cap = self.max_concurrency
+        plan = run.plan
+        steps = plan.steps
+        successors = plan.successors
+        store = run.store
+        journal = run.journal
+        remaining = list(plan.predecessor_counts)
+        streamed = plan.stream_consumers
+        conditions = plan.conditions
+        # Untaken incoming edges of each step, and whether one of them feeds
+        # the step's inputs.
+        dead = [0] * len(steps)
+        cut = [False] * len(steps)
+        pruned: set[int] = set()
+        account = None
+
+        def follow(idx: int, result: Any, launched: bool = True) -> List[int]:
+            """Resolve the edges out of a finished step; return the new ready.
+
+            A step is pruned once its edges are resolved if an edge from a
+            step whose outputs it reads was not taken, or none of them was.
+            Pruning spreads downstream in the same pass, without running
+            anything for the pruned steps.
+            """
+            unlocked = []
+            stack = [(idx, result, launched)]
+            while stack:
+                src, value, started = stack.pop()
+                gone = src in pruned
+                for nxt in successors[src]:
+                    if started and nxt in streamed[src]:
+                        continue  # resolved when the producer started
+                    condition = conditions.get((src, nxt)) if conditions else None
+                    if gone or (
+                        condition is not None and not condition.holds(value)
+                    ):
+                        dead[nxt] += 1
+                        if src in steps[nxt].producers:
+                            cut[nxt] = True
+                    remaining[nxt] -= 1
+                    if remaining[nxt]:
+                        continue
+                    if cut[nxt] or dead[nxt] == plan.predecessor_counts[nxt]:
+                        pruned.add(nxt)
+                        store.release(steps[nxt])
+                        run.pruned.append(steps[nxt].id)
+                        if account is not None:
+                            account.settle(nxt, 0.0)
+                        if journal is not None:
+                            journal.append("step_pruned", step=steps[nxt].id)
+                        stack.append((nxt, None, False))
+                    else:
+                        unlocked.append(nxt)
+            return unlocked
+
+        skipped = set()
+        for idx in plan.order:
+            if idx in run.completed and remaining[idx] == 0 and idx not in pruned:
+                result = run.completed[idx]
+                store.release(steps[idx])
+                store.put(steps[idx], result)
+                skipped.add(idx)
+                run.reused.append(steps[idx].id)
+                if run.inherited and journal is not None:
+                    journal.append(
+                        "step_finish",
+                        step=steps[idx].id,
+                        digest=result_digest(result),
+                        result=result,
+                    )
+                follow(idx, result, launched=False)
+        # Ready steps are ordered by upward rank so that, when there are more
+        # ready steps than free slots, the longest remaining chain starts first.
+        estimates = self.estimates
+        if estimates is None:
+            rank = plan.upward_rank
+            costs = [step.estimated_cost for step in steps]
+        else:
+            rank = plan.upward_ranks(estimates.runtimes(plan))
+            costs = estimates.costs(plan)
+        ready: List[Tuple[float, int]] = [
+            (-rank[i], i)
+            for i, deg in enumerate(remaining)
+            if deg == 0 and i not in skipped and i not in pruned
+        ]
+        heapq.heapify(ready)
+        ready_at = [time.monotonic()] * len(steps)
+        started = [0.0] * len(steps)
+        scheduler = self.scheduler
+        pipelined_steps = {nxt for group in streamed for nxt in group}
+        running: Dict[asyncio.Task[Any], int] = {}
+        # Streaming consumers ride on their producer's slot and reservation.
+        pipelined: List[int] = []
+        unreserved: set[int] = set()
+        status = "failed"
+        if self.budget is not None:
+            account = run.budget = self.budget.open_run(
+                run.run_id or "",
+                run.project,
+                {
+                    step.id: (
+                        0.0
+                        if step.index in skipped or step.index in pruned
+                        else costs[step.index]
+                    )
+                    for step in steps
+                },
+            )
+            for idx in skipped | pruned:
+                account.settle(idx, 0.0)
+
+        def release(idx: int) -> None:
+            if idx in unreserved:
+                unreserved.discard(idx)
+            else:
+                self._release(steps[idx])
+
+        tracer = current_tracer()
+
+        def launch(idx: int) -> None:
+            step = steps[idx]
+            now = time.monotonic()
+            run.queue_wait[step.id] = now - ready_at[idx]
+            started[idx] = now
+            if tracer is not None:
+                tracer.complete("queued", ready_at[idx], now, cat="queue", lane=step.id)
+            try:
+                kwargs = store.resolve(step, _step_params(step, run.funcs[idx]))
+            except Exception:
+                release(idx)
+                raise
+            channels = None
+            if streamed[idx]:
+                channels = store.open_streams(step, self.stream_buffer)
+            # Items only need to be kept for the journal, the workflow
+            # outputs or consumers that are not streaming.
+            collect = (
+                journal is not None
+                or not successors[idx]
+                or plan.consumer_counts[idx] > len(streamed[idx])
+            )
+            if journal is not None:
+                journal.append("step_start", step=step.id)
+            if run.batch is not None:
+                coro = run.batch.run(
+                    idx,
+                    functools.partial(
+                        self._run_plan_step,
+                        step,
+                        run.funcs[idx],
+                        kwargs,
+                        channels,
+                        collect,
+                        run.deadline,
+                        plan.name,
+                    ),
+                )
+            else:
+                coro = self._run_plan_step(
+                    step,
+                    run.funcs[idx],
+                    kwargs,
+                    channels,
+                    collect,
+                    run.deadline,
+                    plan.name,
+                )
+            if tracer is not None:
+                coro = _traced_step(step, coro)
+            task = asyncio.create_task(coro)
+            running[task] = idx
+            for nxt in streamed[idx]:
+                remaining[nxt] -= 1
+                if remaining[nxt] == 0:
+                    pipelined.append(nxt)
+
+        try:
+            while ready or running:
+                paused = False
+                while ready and (cap is None or len(running) < cap):
+                    if account is not None:
+                        report = account.check()
+                        if report is not None:
+                            account.overrun(report)
+                            if self.budget.action == "abort":
+                                status = "over_budget"
+                                raise BudgetExceeded(report)
+                            paused = True
+                            break
+                    idx = self._pop_admissible(ready, steps)
+                    if idx is None:
+                        break
+                    launch(idx)
+                    while pipelined:
+                        nxt = pipelined.pop()
+                        unreserved.add(nxt)
+                        launch(nxt)
+                waiters: set[asyncio.Future[Any]] = set(running)
+                capacity = None
+                if paused:
+                    # Wait for the budget to be raised or projected spend of
+                    # other runs to be released.
+                    capacity = self.budget.changed()
+                    waiters.add(capacity)
+                elif ready and scheduler is not None:
+                    # Blocked on capacity held by other runs or by our own
+                    # steps; wake up as soon as any of it is released.
+                    capacity = scheduler.changed()
+                    waiters.add(capacity)
+                wait = None
+                if run.deadline is not None:
+                    wait = max(0.0, run.deadline - time.monotonic())
+                done, _ = await asyncio.wait(
+                    waiters, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+                )
+                if capacity is not None:
+                    capacity.cancel()
+                if not done:
+                    status = "timeout"
+                    raise TimeoutError(f"Workflow {plan.name} exceeded its deadline")
+                for task in done:
+                    if task not in running:
+                        continue
+                    idx = running.pop(task)
+                    release(idx)
+                    result, cached = task.result()
+                    store.release(steps[idx])
+                    self._record(run, steps[idx], result, cached)
+                    now = time.monotonic()
+                    if estimates is not None and not cached:
+                        self._learn(plan, steps[idx], result, now - started[idx])
+                    for nxt in follow(idx, result):
+                        ready_at[nxt] = now
+                        if nxt in pipelined_steps:
+                            pipelined.append(nxt)
+                        else:
+                            heapq.heappush(ready, (-rank[nxt], nxt))
+                while pipelined:
+                    nxt = pipelined.pop()
+                    unreserved.add(nxt)
+                    launch(nxt)
+                if journal is not None:
+                    await journal.maybe_commit_async()
+            status = "ok"
+            return run.summary()
+        finally:
+            for idx in running.values():
+                release(idx)
+            await self._cancel_all(running)
+            if status != "ok" and run.compensable:
+                await self._compensate(run)
+            store.close()
+            if account is not None:
+                account.close()
+            if journal is not None:
+                journal.append("run_finish", status=status)
+                await journal.close_async()
+
+    def _pop_admissible(
+        self, ready: List[Tuple[float, int]], steps: Tuple[PlanStep, ...]
+    ) -> int | None:
+        """Pop the highest-priority ready step that fits the node budget.
+
+        Steps that do not fit are skipped in favour of smaller ones
+        (backfilling) and stay queued. Returns ``None`` when nothing fits.
+        """
+        scheduler = self.scheduler
+        if scheduler is None:
+            return heapq.heappop(ready)[1]
+        skipped = []
+        admitted = None
+        while ready:
+            item = heapq.heappop(ready)
+            step = steps[item[1]]
+            if scheduler.try_acquire(step.estimated_cpu, step.estimated_memory):
+                admitted = item[1]
+                break
+            skipped.append(item)
+        for item in skipped:
+            heapq.heappush(ready, item)
+        return admitted
+
+    def _release(self, step: PlanStep) -> None:
+        if self.scheduler is not None:
+            self.scheduler.release(step.estimated_cpu, step.estimated_memory)
+
+    def _learn(
+        self, plan: ExecutionPlan, step: PlanStep, result: Any, elapsed: float
+    ) -> None:
+        """Feed an executed step's runtime and cost to the estimate store.
+
+        The ``runtime`` and ``cost`` the step reports take precedence; steps
+        not reporting a runtime are credited with their wall-clock time.
+        """
+        runtime = cost = None
+        if isinstance(result, dict):
+            runtime = result.get("runtime")
+            cost = result.get("cost")
+        self.estimates.record(
+            plan.name,
+            step.id,
+            step.persona,
+            float(runtime) if runtime is not None else elapsed,
+            float(cost) if cost is not None else 0.0,
+        )
+
+    @staticmethod
+    def _record(run: _Run, step: PlanStep, result: Any, cached: bool) -> None:
+        """Store a finished step's outputs, totals and journal entry."""
+        run.store.put(step, result)
+        if not cached and step.id in run.compensations:
+            run.compensable[step.index] = result
+        if isinstance(result, dict):
+            runtime = float(result.get("runtime", 0.0))
+            cost = float(result.get("cost", 0.0))
+            if cached:
+                run.saved_runtime += runtime
+                run.saved_cost += cost
+            else:
+                run.runtime += runtime
+                run.cost += cost
+        if run.budget is not None:
+            spent = 0.0
+            if isinstance(result, dict) and not cached:
+                spent = float(result.get("cost", 0.0))
+            run.budget.settle(step.index, spent)
+        if run.journal is not None:
+            digest = None if contains_shared(result) else result_digest(result)
+            if digest is None:
+                run.journal.append("step_finish", step=step.id, digest=None)
+            else:
+                run.journal.append(
+                    "step_finish", step=step.id, digest=digest, result=result
+                )
+
+    async def _compensate(self, run: _Run) -> None:
+        """Undo the compensable steps of a failed run, downstream first."""
+        plan = run.plan
+        steps = plan.steps
+        done = run.compensable
+        # Nearest compensable steps downstream of each step.
+        after: List[FrozenSet[int]] = [frozenset()] * len(steps)
+        for idx in reversed(plan.order):
+            nearest: set[int] = set()
+            for nxt in plan.successors[idx]:
+                if nxt in done:
+                    nearest.add(nxt)
+                else:
+                    nearest.update(after[nxt])
+            after[idx] = frozenset(nearest)
+        tasks: Dict[int, asyncio.Task[None]] = {}
+
+        async def undo(idx: int) -> None:
+            downstream = [tasks[nxt] for nxt in after[idx]]
+            if downstream:
+                await asyncio.wait(downstream)
+            step = steps[idx]
+            handler = run.compensations[step.id]
+            try:
+                with span("compensate", "saga", lane=step.id):
+                    await self.pools.call(handler, "auto", done[idx])
+            except Exception as exc:
+                logger.warning("Compensation of step %s failed: %r", step.id, exc)
+                if run.journal is not None:
+                    run.journal.append(
+                        "compensation_failed", step=step.id, error=repr(exc)
+                    )
+                return
+            if run.journal is not None:
+                run.journal.append("step_compensated", step=step.id)
+
+        # Downstream tasks are created first, so every task can wait on them.
+        for idx in reversed(plan.order):
+            if idx in done:
+                tasks[idx] = asyncio.create_task(undo(idx))
+        await asyncio.wait(tasks.values())
+
+    def _retry_policy(self, step: PlanStep) -> RetryPolicy | None:
+        """Return the retry policy ``step`` runs under."""
+        if step.retry_policy is not None:
+            return step.retry_policy
+        return self.default_retry
+
+    async def _run_plan_step(
+        self,
+        step: PlanStep,
+        func: Callable[..., Any],
+        kwargs: Dict[str, Any],
+        channels: Dict[str, List[StreamChannel]] | None = None,
+        collect: bool = True,
+        deadline: float | None = None,
+        workflow: str = "",
+    ) -> Tuple[Any, bool]:
+        """Run one plan step, consulting the cache when it opts in.
+
+        Returns:
+            ``(result, cached)`` where ``cached`` is ``True`` for cache hits.
+        """
+        if inspect.isasyncgenfunction(func):
+            async with asyncio.timeout_at(_attempt_limit(deadline, step.timeout)):
+                result = await self._run_stream_step(
+                    step, func, kwargs, channels or {}, collect
+                )
+            return result, False
+        key = None
+        if step.cache and self.cache is not None:
+            key = self.cache.key(step, kwargs, func)
+            if key is not None:
+                hit, result = await self.cache.get_async(key)
+                if hit:
+                    tracer = current_tracer()
+                    if tracer is not None:
+                        tracer.instant("cache_hit", cat="cache", step=step.id)
+                    return result, True
+        if step.foreach is not None:
+            result = await self._run_foreach_step(
+                step, step.foreach, func, kwargs, deadline, workflow
+            )
+        elif self.task_queue is not None and not _has_streams(kwargs):
+            result = await self._run_remote(step, kwargs, workflow)
+        else:
+            result = await self.run_step(
+                func,
+                execution=step.execution,
+                retry_policy=self._retry_policy(step),
+                timeout=step.timeout,
+                deadline=deadline,
+                hedge_key=_hedge_key(workflow, step),
+                **kwargs,
+            )
+        if (
+            key is not None
+            and not contains_shared(result)
+            and not (step.foreach is not None and result.get("errors"))
+        ):
+            await self.cache.set_async(key, result, ttl=step.cache_ttl)
+        return result, False
+
+    async def _run_foreach_step(
+        self,
+        step: PlanStep,
+        spec: ForeachSpec,
+        func: Callable[..., Any],
+        kwargs: Dict[str, Any],
+        deadline: float | None = None,
+        workflow: str = "",
+    ) -> Dict[str, Any]:
+        """Map ``func`` over the items of a ``foreach`` step.
+
+        Each item is run through :meth:`run_step`, so it is retried on its
+        own according to the step's ``retry`` settings and its ``timeout``
+        applies to each item. The ordered item
+        results are bound to the step's first declared output (``None`` for
+        failed items) and the failures to an ``errors`` output mapping item
+        indexes to messages. ``runtime`` and ``cost`` reported by the items
+        are summed.
+
+        Raises:
+            ForeachError: If more items fail than ``max_failures`` allows.
+            ValueError: If the list input is not a list.
+        """
+        items = kwargs.pop(spec.input)
+        if not isinstance(items, (list, tuple)):
+            raise ValueError(f"foreach input {spec.input} of {step.id} is not a list")
+        accepted = _accepted_params(func)
+        bind = accepted is None or spec.item in accepted
+        policy = self._retry_policy(step)
+        hedge_key = _hedge_key(workflow, step)
+        remote = self.task_queue is not None and not _has_streams(kwargs)
+        # Item results of a step that fails are discarded; free their
+        # shared-memory outputs.
+        finished: List[Any] = []
+
+        async def call(item: Any) -> Any:
+            item_kwargs = {**kwargs, spec.item: item} if bind else kwargs
+            if remote:
+                return await self._run_remote(step, item_kwargs, workflow)
+            result = await self.run_step(
+                func,
+                execution=step.execution,
+                retry_policy=policy,
+                timeout=step.timeout,
+                deadline=deadline,
+                hedge_key=hedge_key,
+                **item_kwargs,
+            )
+            if step.execution == "process":
+                finished.append(result)
+            return result
+
+        try:
+            results, errors = await map_chunked(
+                call,
+                items,
+                concurrency=spec.concurrency,
+                chunk_size=spec.chunk_size,
+                max_failures=spec.max_failures,
+            )
+        except BaseException:
+            free_shared(finished)
+            raise
+        outputs = [name for name in step.outputs if name != "errors"]
+        result: Dict[str, Any] = {
+            "errors": {index: str(exc) for index, exc in sorted(errors.items())}
+        }
+        if outputs:
+            result[outputs[0]] = results
+        totals = [item for item in results if isinstance(item, dict)]
+        if any("runtime" in item or "cost" in item for item in totals):
+            result["runtime"] = sum(float(i.get("runtime", 0.0)) for i in totals)
+            result["cost"] = sum(float(i.get("cost", 0.0)) for i in totals)
+        return result
+
+    async def _run_remote(
+        self, step: PlanStep, kwargs: Dict[str, Any], workflow: str = ""
+    ) -> Any:
+        """Enqueue one call of ``step`` and wait for a worker to settle it.
+
+        The step's retry policy and attempt timeout travel with the task and
+        are applied by the worker. Cancelling the wait discards the task,
+        which revokes the worker's lease and stops it at its next heartbeat.
+
+        Raises:
+            RemoteStepError: If the step failed on the worker.
+        """
+        queue = self.task_queue
+        assert queue is not None
+        task_id = uuid.uuid4().hex
+        payload = {
+            "workflow": workflow,
+            "step": step.id,
+            "kwargs": kwargs,
+            "retry": dict(step.retry) if step.retry else None,
+            "timeout": step.timeout,
+            "execution": step.execution,
+            "idempotent": step.idempotent,
+        }
+        await asyncio.to_thread(queue.put, task_id, payload)
+        try:
+            with span("remote", "remote", task_id=task_id):
+                outcome = await self._await_outcome(queue, task_id)
+        finally:
+            # The discard runs to completion in its thread even if this wait
+            # is cancelled again.
+            await asyncio.to_thread(queue.discard, task_id)
+        if not outcome.ok:
+            raise RemoteStepError(f"Step {step.id} failed remotely: {outcome.value}")
+        return outcome.value
+
+    @staticmethod
+    async def _await_outcome(queue: TaskQueue, task_id: str) -> TaskOutcome:
+        """Poll ``queue`` with growing intervals until ``task_id`` settles."""
+        delay = min(0.005, queue.poll_interval)
+        while True:
+            outcome = await asyncio.to_thread(queue.outcome, task_id)
+            if outcome is not None:
+                return outcome
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, queue.poll_interval)
+
+    @staticmethod
+    async def _run_stream_step(
+        step: PlanStep,
+        func: Callable[..., Any],
+        kwargs: Dict[str, Any],
+        channels: Dict[str, List[StreamChannel]],
+        collect: bool,
+    ) -> Dict[str, List[Any]]:
+        """Drive an async generator step, fanning items out to ``channels``.
+
+        Items are mappings contributing their declared output keys, or plain
+        values bound to a single declared output. With ``collect`` they are
+        also gathered into per-output lists returned as the step's result.
+        """
+        collected: Dict[str, List[Any]] = {key: [] for key in step.outputs}
+        single = step.outputs[0] if len(step.outputs) == 1 else None
+        all_channels = [ch for group in channels.values() for ch in group]
+        try:
+            async for item in func(**kwargs):
+                if isinstance(item, Mapping):
+                    values = [(k, item[k]) for k in step.outputs if k in item]
+                elif single is not None:
+                    values = [(single, item)]
+                else:
+                    values = []
+                for key, value in values:
+                    if collect:
+                        collected[key].append(value)
+                    for channel in channels.get(key, ()):
+                        await channel.send(value)
+        except BaseException as exc:
+            for channel in all_channels:
+                channel.fail(exc)
+            raise
+        for channel in all_channels:
+            channel.finish()
+        return collected if collect else {}
+
+    @staticmethod
+    async def _cancel_all(running: Dict[asyncio.Task[Any], int]) -> None:
+        """Cancel in-flight step tasks and wait for them to unwind."""
+        if not running:
+            return
+        for task in running:
+            task.cancel()
+        outcomes = await asyncio.gather(*running, return_exceptions=True)
+        running.clear()
+        # Steps that finished alongside a failure are discarded with the run.
+        for outcome in outcomes:
+            if not isinstance(outcome, BaseException):
+                free_shared(outcome[0])
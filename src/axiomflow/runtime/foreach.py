@@ -0,0 +1,87 @@
+"""Chunked concurrent map used by ``foreach`` workflow steps.
+
+A ``foreach`` step runs its body once per item of a list input instead of
+requiring one generated step per item. Items are split into chunks that a
+fixed number of workers pull from, so hundreds of items cost a handful of
+tasks rather than one task (and one executor-loop iteration) each.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+
+class ForeachError(RuntimeError):
+    """Raised when a ``foreach`` step exceeds its failure budget.
+
+    Attributes:
+        results: Per-item results gathered so far; failed or unfinished
+            items are ``None``.
+        errors: Exceptions of the failed items keyed by item index.
+    """
+
+    def __init__(self, results: List[Any], errors: Dict[int, BaseException]) -> None:
+        super().__init__(f"{len(errors)} foreach item(s) failed")
+        self.results = results
+        self.errors = errors
+
+
+async def map_chunked(
+    func: Callable[[Any], Awaitable[Any]],
+    items: Sequence[Any],
+    *,
+    concurrency: int = 8,
+    chunk_size: int = 1,
+    max_failures: int | None = None,
+) -> Tuple[List[Any], Dict[int, BaseException]]:
+    """Apply ``func`` to every item, keeping results in item order.
+
+    Up to ``concurrency`` workers each take ``chunk_size`` consecutive items
+    at a time and process them one after another. A failing item does not
+    stop the others; its slot in the results stays ``None``.
+
+    Args:
+        func: Coroutine function called with one item.
+        items: Items to process.
+        concurrency: Maximum number of items in flight.
+        chunk_size: Number of consecutive items a worker claims at once.
+        max_failures: Number of failed items tolerated before the map is
+            aborted, or ``None`` to always run every item.
+
+    Returns:
+        ``(results, errors)`` with ``errors`` keyed by item index.
+
+    Raises:
+        ForeachError: If more than ``max_failures`` items fail.
+    """
+    total = len(items)
+    results: List[Any] = [None] * total
+    errors: Dict[int, BaseException] = {}
+    cursor = 0
+
+    async def worker() -> None:
+        nonlocal cursor
+        while cursor < total:
+            start = cursor
+            cursor = min(cursor + chunk_size, total)
+            for i in range(start, cursor):
+                try:
+                    results[i] = await func(items[i])
+                except Exception as exc:
+                    errors[i] = exc
+                    if max_failures is not None and len(errors) > max_failures:
+                        raise ForeachError(results, errors) from exc
+
+    chunks = -(-total // chunk_size)
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, chunks))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    return results, errors
+
+
+__all__ = ["ForeachError", "map_chunked"]
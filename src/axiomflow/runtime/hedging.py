@@ -0,0 +1,179 @@
+"""Hedged execution of straggler steps.
+
+A :class:`HedgingPolicy` keeps a latency histogram per step. Once an
+attempt of an idempotent step has been running longer than a chosen
+percentile of that step's past runtimes, a duplicate attempt is started
+and whichever finishes first provides the result; the other one is
+cancelled. This trims the tail latency caused by the occasional slow agent
+call at the price of a little duplicated work, so it must only be used for
+steps whose side effects are safe to repeat.
+
+The histogram tracks the runtime of first attempts. When a first attempt is
+abandoned, because its duplicate won or the call was cancelled, the time it
+had been running is recorded instead: a censored sample, a lower bound of
+its runtime. Recording only the winners' latencies would drop exactly the
+slow tail and pull the threshold down over time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from axiomflow.core.histogram import LatencyHistogram
+
+from .shm import free_shared
+
+
+@dataclass
+class HedgeStats:
+    """Counters for the hedged calls of one step.
+
+    Attributes:
+        calls: Number of calls made through the policy.
+        fired: Number of calls for which a duplicate attempt was started.
+        won: Number of calls whose result came from the duplicate.
+        censored: Number of calls whose first attempt was abandoned before
+            it finished.
+        latency: Histogram of first-attempt runtimes in seconds, censored
+            at the time of abandonment.
+    """
+
+    calls: int = 0
+    fired: int = 0
+    won: int = 0
+    censored: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+@dataclass
+class HedgingPolicy:
+    """Launch a duplicate attempt once a step runs unusually long.
+
+    Args:
+        percentile: Fraction of past runtimes an attempt must exceed before
+            it is hedged, e.g. ``0.95`` for the 95th percentile.
+        min_samples: Number of recorded runtimes a step needs before it is
+            hedged at all.
+        min_delay: Lower bound in seconds for the hedging threshold, so very
+            fast steps are never duplicated.
+    """
+
+    percentile: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 0.0
+    _stats: Dict[Hashable, HedgeStats] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.percentile < 1.0:
+            raise ValueError("percentile must be between 0 and 1")
+        if self.min_samples < 1:
+            raise ValueError("min_samples must be at least 1")
+
+    def stats(self, key: Hashable) -> HedgeStats:
+        """Return the counters of ``key``, creating them on first use."""
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = HedgeStats()
+        return stats
+
+    def threshold(self, key: Hashable) -> float | None:
+        """Return the runtime after which ``key`` is hedged, if known yet."""
+        stats = self._stats.get(key)
+        if stats is None or len(stats.latency) < self.min_samples:
+            return None
+        return max(stats.latency.quantile(self.percentile), self.min_delay)
+
+    async def run(
+        self,
+        key: Hashable,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Await ``func(*args, **kwargs)``, hedging it if it straggles.
+
+        If the first attempt to finish failed while the other is still
+        running, the other one is awaited instead; the call only fails when
+        every attempt did.
+
+        Args:
+            key: Step whose history drives the threshold and gets the stats,
+                e.g. ``(workflow, step)``.
+            func: Coroutine function run once or twice.
+            *args: Positional arguments for ``func``.
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            The result of the first successful attempt.
+        """
+        stats = self.stats(key)
+        stats.calls += 1
+        delay = self.threshold(key)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(func(*args, **kwargs))
+        if delay is None:
+            result = await primary
+            stats.latency.record(time.perf_counter() - started)
+            return result
+        attempts = [primary]
+        winner = None
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                stats.fired += 1
+                attempts.append(asyncio.ensure_future(func(*args, **kwargs)))
+            pending = set(attempts)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in attempts:
+                    if attempt not in done:
+                        continue
+                    exc = attempt.exception()
+                    if exc is not None:
+                        error = error or exc
+                        continue
+                    if attempt is primary:
+                        stats.latency.record(time.perf_counter() - started)
+                    else:
+                        stats.won += 1
+                    winner = attempt
+                    return attempt.result()
+            assert error is not None
+            raise error
+        finally:
+            if not primary.done():
+                stats.censored += 1
+                stats.latency.record(time.perf_counter() - started)
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+            # A loser finishing alongside the winner may hold shared memory.
+            for attempt in attempts:
+                if attempt is not winner and not attempt.cancelled():
+                    if attempt.exception() is None:
+                        free_shared(attempt.result())
+
+    def report(self) -> Dict[Hashable, Dict[str, Any]]:
+        """Return per-step hedging counters and latency percentiles."""
+        report = {}
+        for key, stats in self._stats.items():
+            latency = stats.latency
+            report[key] = {
+                "calls": stats.calls,
+                "fired": stats.fired,
+                "won": stats.won,
+                "censored": stats.censored,
+                "threshold": self.threshold(key),
+                "p50": latency.quantile(0.5) if len(latency) else None,
+                "p99": latency.quantile(0.99) if len(latency) else None,
+            }
+        return report
+
+
+__all__ = ["HedgeStats", "HedgingPolicy"]
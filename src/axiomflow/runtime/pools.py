@@ -0,0 +1,220 @@
+"""Thread and process pools that keep blocking steps off the event loop.
+
+Step functions run in one of three execution modes:
+
+``inline``
+    Called directly on the event loop. Right for coroutine functions.
+``thread``
+    Called in a bounded thread pool. Right for blocking I/O.
+``process``
+    Called in a pool of warm worker processes. Right for CPU-bound work;
+    the function, its arguments and its result must be picklable. Large
+    buffer outputs come back as :class:`~axiomflow.runtime.shm.SharedBuffer`
+    handles instead of being pickled.
+
+The default ``auto`` mode runs coroutine functions inline and everything
+else in the thread pool, so a blocking synchronous step can no longer
+freeze every other workflow sharing the loop. :class:`LoopLagMonitor`
+measures how late the loop wakes up to prove it stays responsive.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker
+from pathlib import Path
+from typing import Any, Callable, Deque
+
+from .recovery import _maybe_await
+from .shm import free_shared, run_exporting
+
+EXECUTION_MODES = frozenset({"auto", "inline", "thread", "process"})
+
+
+def _noop() -> None:
+    """Trivial task used to spawn process workers ahead of time."""
+
+
+def _free_orphaned(future: Future[Any]) -> None:
+    """Free the shared outputs of a process call nobody waits for any more."""
+    if not future.cancelled() and future.exception() is None:
+        free_shared(future.result())
+
+
+class StepPools:
+    """Lazily created thread and process pools for step execution.
+
+    Args:
+        max_threads: Size of the thread pool.
+        max_processes: Size of the process pool.
+        mp_context: Optional :mod:`multiprocessing` context for the process
+            pool.
+        share_threshold: Process-step outputs that are bytes-like or NumPy
+            buffers of at least this many bytes are placed in shared memory.
+            ``None`` always pickles them.
+        spill_dir: When set, shared outputs are written to memory-mapped
+            files in this directory instead of shared-memory segments.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int | None = None,
+        max_processes: int | None = None,
+        mp_context: Any = None,
+        share_threshold: int | None = 1 << 20,
+        spill_dir: Path | str | None = None,
+    ) -> None:
+        self.max_threads = max_threads or min(32, (os.cpu_count() or 1) + 4)
+        self.max_processes = max_processes or (os.cpu_count() or 1)
+        self.mp_context = mp_context
+        self.share_threshold = share_threshold
+        self.spill_dir = str(spill_dir) if spill_dir is not None else None
+        if self.spill_dir is not None:
+            Path(self.spill_dir).mkdir(parents=True, exist_ok=True)
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.max_threads, thread_name_prefix="axiomflow-step"
+            )
+        return self._threads
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            if self.share_threshold is not None and self.spill_dir is None:
+                # Workers must share this process's resource tracker, which
+                # sees the segments they create freed here.
+                resource_tracker.ensure_running()
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.max_processes, mp_context=self.mp_context
+            )
+        return self._processes
+
+    async def warm(self) -> None:
+        """Start every process worker so the first steps pay no spawn cost."""
+        loop = asyncio.get_running_loop()
+        pool = self.process_pool
+        await asyncio.gather(
+            *(loop.run_in_executor(pool, _noop) for _ in range(self.max_processes))
+        )
+
+    async def call(
+        self, func: Callable[..., Any], mode: str, *args: Any, **kwargs: Any
+    ) -> Any:
+        """Invoke ``func`` according to ``mode`` and return its result."""
+        if mode == "inline" or (
+            mode == "auto" and inspect.iscoroutinefunction(func)
+        ):
+            return await _maybe_await(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        if mode == "process":
+            if self.share_threshold is None:
+                call = functools.partial(func, *args, **kwargs)
+            else:
+                call = functools.partial(
+                    run_exporting,
+                    func,
+                    self.share_threshold,
+                    self.spill_dir,
+                    args,
+                    kwargs,
+                )
+            future = self.process_pool.submit(call)
+            try:
+                result = await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # A worker that already started finishes in the background.
+                future.add_done_callback(_free_orphaned)
+                raise
+        else:
+            # Copy the context so correlation IDs survive the thread hop.
+            ctx = contextvars.copy_context()
+            result = await loop.run_in_executor(
+                self.thread_pool, functools.partial(ctx.run, func, *args, **kwargs)
+            )
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    def bind(self, func: Callable[..., Any], mode: str) -> Callable[..., Any]:
+        """Return a coroutine function calling ``func`` in ``mode``."""
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {mode}")
+        return functools.partial(self.call, func, mode)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down both pools."""
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
+            self._processes = None
+
+
+class LoopLagMonitor:
+    """Measure event-loop responsiveness.
+
+    A background task repeatedly sleeps for ``interval`` seconds and records
+    how much later than requested it actually woke up. Sustained lag means
+    something is blocking the loop.
+
+    Example:
+        >>> async with LoopLagMonitor() as monitor:  # doctest: +SKIP
+        ...     await executor.run_workflow(workflow, step_funcs)
+        >>> monitor.max_lag  # doctest: +SKIP
+    """
+
+    def __init__(self, interval: float = 0.01, history: int = 1024) -> None:
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=history)
+        self.max_lag = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def mean_lag(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+
+__all__ = ["EXECUTION_MODES", "LoopLagMonitor", "StepPools"]
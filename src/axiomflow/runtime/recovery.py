@@ -4,26 +4,12 @@ from __future__ import annotations
 
 import asyncio
 import inspect
-from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, List
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List
 
+from axiomflow.core.retry import SINGLE_ATTEMPT, RetryPolicy
 
-@dataclass
-class RetryPolicy:
-    """Configuration for retry behaviour."""
-
-    max_attempts: int = 3
-    strategy: str = "exponential"
-    base_delay: float = 0.1
-    max_delay: float = 1.0
-
-    def backoff(self, attempt: int) -> float:
-        """Compute delay before the next attempt."""
-        if self.strategy == "linear":
-            delay = self.base_delay * attempt
-        else:
-            delay = self.base_delay * (2 ** (attempt - 1))
-        return min(delay, self.max_delay)
+from .tracing import span
 
 
 async def _maybe_await(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
@@ -34,8 +20,44 @@ async def _maybe_await(func: Callable[..., Any], *args: Any, **kwargs: Any) -> A
     return result
 
 
+def _attempt_limit(deadline: float | None, timeout: float | None) -> float | None:
+    """Return the loop time an attempt must finish by, if it is bounded.
+
+    That is the earlier of the workflow ``deadline`` and ``timeout`` seconds
+    from now. Must be called from a running event loop.
+    """
+    if timeout is None:
+        return deadline
+    until = asyncio.get_running_loop().time() + timeout
+    return until if deadline is None else min(deadline, until)
+
+
+async def _attempt(
+    func: Callable[..., Any], limit: float | None, *args: Any, **kwargs: Any
+) -> Any:
+    """Run one attempt of ``func``, cancelling it at loop time ``limit``."""
+    if limit is None:
+        return await _maybe_await(func, *args, **kwargs)
+    scope = asyncio.timeout_at(limit)
+    try:
+        async with scope:
+            return await _maybe_await(func, *args, **kwargs)
+    except TimeoutError:
+        if scope.expired():
+            raise TimeoutError("Attempt exceeded its time limit") from None
+        raise
+
+
 class RecoveryManager:
-    """Monitor errors and perform recovery actions."""
+    """Monitor errors and perform recovery actions.
+
+    Args:
+        escalation_hook: Called with the recent errors when a call fails
+            for good.
+        max_errors: Number of recent errors kept in :attr:`errors`; older
+            ones are dropped so a long-lived manager does not grow without
+            bound.
+    """
 
     def __init__(
         self,
@@ -43,9 +65,10 @@ class RecoveryManager:
         escalation_hook: (
             Callable[[List[Exception]], Awaitable[None] | None] | None
         ) = None,
+        max_errors: int = 1000,
     ) -> None:
         self.escalation_hook = escalation_hook
-        self.errors: List[Exception] = []
+        self.errors: Deque[Exception] = deque(maxlen=max_errors)
 
     async def execute(
         self,
@@ -54,27 +77,53 @@ class RecoveryManager:
         retry_policy: RetryPolicy | None = None,
         compensation: Callable[[Exception], Awaitable[None] | None] | None = None,
         cleanup: Callable[[], Awaitable[None] | None] | None = None,
+        timeout: float | None = None,
+        deadline: float | None = None,
         **kwargs: Any,
     ) -> Any:
-        """Execute ``func`` with retry and recovery logic."""
+        """Execute ``func`` with retry and recovery logic.
+
+        ``timeout`` bounds each attempt in seconds and ``deadline`` bounds
+        all attempts together, as an absolute event-loop time
+        (:func:`time.monotonic` for the default loop). An attempt running
+        past either is cancelled and fails with :class:`TimeoutError`. A
+        retry whose backoff would end after ``deadline`` is not attempted.
+        ``cleanup`` runs in every case, including cancellation.
+
+        Attempts, backoff sleeps, compensation, escalation and cleanup are
+        recorded as spans of the active :class:`~axiomflow.runtime.tracing.Tracer`.
+        """
         policy = retry_policy or RetryPolicy()
+        loop = asyncio.get_running_loop()
         attempt = 0
         try:
             while True:
                 try:
-                    return await _maybe_await(func, *args, **kwargs)
+                    limit = _attempt_limit(deadline, timeout)
+                    with span("attempt", "recovery", attempt=attempt + 1):
+                        return await _attempt(func, limit, *args, **kwargs)
                 except Exception as exc:  # pragma: no cover - broad for recovery
                     self.errors.append(exc)
                     attempt += 1
                     if compensation:
-                        await _maybe_await(compensation, exc)
+                        with span("compensation", "recovery"):
+                            await _maybe_await(compensation, exc)
                     if attempt >= policy.max_attempts:
                         raise
-                    await asyncio.sleep(policy.backoff(attempt))
+                    delay = policy.backoff(attempt)
+                    if deadline is not None and loop.time() + delay >= deadline:
+                        raise
+                    with span("backoff", "recovery", delay=delay):
+                        await asyncio.sleep(delay)
         except Exception:
             if self.escalation_hook:
-                await _maybe_await(self.escalation_hook, self.errors)
+                with span("escalation", "recovery"):
+                    await _maybe_await(self.escalation_hook, list(self.errors))
             raise
         finally:
             if cleanup:
-                await _maybe_await(cleanup)
+                with span("cleanup", "recovery"):
+                    await _maybe_await(cleanup)
+
+
+__all__ = ["SINGLE_ATTEMPT", "RecoveryManager", "RetryPolicy"]
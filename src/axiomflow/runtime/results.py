@@ -0,0 +1,216 @@
+"""Per-run storage of step outputs for dataflow between workflow steps."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, List, Mapping, Set, Tuple
+
+from axiomflow.dsl.plan import (
+    LITERAL,
+    WORKFLOW_INPUT,
+    ExecutionPlan,
+    InputRef,
+    PlanStep,
+)
+
+from .shm import SharedBuffer, SharedView, free, map_shared, shared_handles
+from .streams import StreamChannel, iterate
+
+
+class ResultStore:
+    """Hold step outputs until their last consumer has run.
+
+    Outputs of a step are reference counted by the number of steps that
+    consume them. Once every consumer has finished the outputs are dropped,
+    keeping the memory held by a run proportional to the live frontier of
+    the DAG rather than its size. Outputs of sink steps (steps without
+    successors) are kept as the workflow result.
+
+    Outputs held in shared memory (:class:`SharedBuffer` handles returned
+    by process-pool steps, possibly nested in lists and mappings) are passed
+    as handles to process-pool consumers and as read-only views to every
+    other consumer, and their segments are freed together with the output.
+    Handles in a result that no declared output keeps are freed as soon as
+    the result is stored. Call :meth:`close` when the run ends.
+
+    Inputs arriving over streaming edges are resolved to the
+    :class:`StreamChannel` opened by the running producer, or replayed from
+    its collected outputs when the producer has already finished.
+
+    Args:
+        plan: Compiled plan being executed.
+        inputs: Workflow-level input values.
+    """
+
+    __slots__ = (
+        "_plan",
+        "inputs",
+        "_outputs",
+        "_pending",
+        "_views",
+        "_streams",
+        "_shared",
+    )
+
+    def __init__(self, plan: ExecutionPlan, inputs: Mapping[str, Any]) -> None:
+        self._plan = plan
+        self.inputs = inputs
+        self._outputs: List[Dict[str, Any] | None] = [None] * len(plan.steps)
+        self._pending = list(plan.consumer_counts)
+        self._views: Dict[SharedBuffer, SharedView] = {}
+        self._streams: Dict[Tuple[int, str], StreamChannel] = {}
+        # Steps whose held outputs contain shared-memory handles.
+        self._shared: Set[int] = set()
+
+    def __len__(self) -> int:
+        """Return the number of steps whose outputs are currently held."""
+        return sum(1 for out in self._outputs if out is not None)
+
+    def put(self, step: PlanStep, result: Any) -> None:
+        """Record the declared outputs of ``step`` from its return value.
+
+        Mappings contribute the keys matching the declared outputs; any other
+        value is bound to the step's single declared output.
+        """
+        outputs = None
+        if step.outputs and (
+            self._pending[step.index] or not self._plan.successors[step.index]
+        ):
+            if isinstance(result, Mapping):
+                outputs = {k: result[k] for k in step.outputs if k in result}
+            elif len(step.outputs) == 1:
+                outputs = {step.outputs[0]: result}
+            else:
+                outputs = {}
+            self._outputs[step.index] = outputs
+        # Only process-pool steps return shared-memory handles.
+        if step.execution == "process":
+            handles = shared_handles(result)
+            if handles:
+                kept = set(shared_handles(outputs))
+                for handle in handles:
+                    if handle not in kept:
+                        free(handle)
+                if kept:
+                    self._shared.add(step.index)
+
+    def resolve(
+        self, step: PlanStep, accepted: FrozenSet[str] | None = None
+    ) -> Dict[str, Any]:
+        """Return keyword arguments for ``step`` from upstream outputs.
+
+        Args:
+            step: Step whose inputs should be resolved.
+            accepted: Parameter names the step function accepts, or ``None``
+                to pass every declared input.
+
+        Raises:
+            ValueError: If a referenced output or workflow input is missing.
+        """
+        kwargs: Dict[str, Any] = {}
+        for ref in step.inputs:
+            if accepted is not None and ref.name not in accepted:
+                channel = self._streams.pop((step.index, ref.name), None)
+                if channel is not None:
+                    channel.close()
+                continue
+            if ref.stream:
+                kwargs[ref.name] = self._stream(step, ref)
+            elif ref.step == LITERAL:
+                kwargs[ref.name] = ref.value
+            elif ref.step == WORKFLOW_INPUT:
+                try:
+                    kwargs[ref.name] = self.inputs[ref.key]
+                except KeyError:
+                    raise ValueError(f"Missing workflow input {ref.key}") from None
+            else:
+                produced = self._outputs[ref.step]
+                if produced is None or ref.key not in produced:
+                    producer = self._plan.steps[ref.step].id
+                    raise ValueError(
+                        f"Step {producer} did not produce output {ref.key}"
+                    )
+                value = produced[ref.key]
+                if ref.step in self._shared and step.execution != "process":
+                    value = map_shared(value, self._attach)
+                kwargs[ref.name] = value
+        return kwargs
+
+    def open_streams(
+        self, step: PlanStep, maxsize: int
+    ) -> Dict[str, List[StreamChannel]]:
+        """Create the channels ``step`` streams into, keyed by output name."""
+        plan = self._plan
+        channels: Dict[str, List[StreamChannel]] = {}
+        for consumer in plan.stream_consumers[step.index]:
+            for ref in plan.steps[consumer].inputs:
+                if ref.stream and ref.step == step.index:
+                    channel = StreamChannel(maxsize)
+                    self._streams[(consumer, ref.name)] = channel
+                    channels.setdefault(ref.key, []).append(channel)
+        return channels
+
+    def release(self, step: PlanStep) -> None:
+        """Mark ``step`` as finished with its inputs, freeing dead outputs."""
+        for ref in step.inputs:
+            if ref.stream:
+                channel = self._streams.pop((step.index, ref.name), None)
+                if channel is not None:
+                    channel.close()
+        successors = self._plan.successors
+        for producer in step.producers:
+            self._pending[producer] -= 1
+            if self._pending[producer] == 0 and successors[producer]:
+                self._drop(producer)
+
+    def sink_outputs(self) -> Dict[str, Dict[str, Any]]:
+        """Return outputs of steps without successors, keyed by step ID.
+
+        Shared-memory outputs are copied out so they outlive :meth:`close`.
+        """
+        plan = self._plan
+        sinks = {}
+        for step in plan.steps:
+            if plan.successors[step.index]:
+                continue
+            outputs = dict(self._outputs[step.index] or {})
+            if step.index in self._shared:
+                outputs = map_shared(outputs, self._materialise)
+            sinks[step.id] = outputs
+        return sinks
+
+    def close(self) -> None:
+        """Free every output still held, including shared-memory segments."""
+        for idx in range(len(self._outputs)):
+            self._drop(idx)
+
+    def _stream(self, step: PlanStep, ref: InputRef) -> Any:
+        channel = self._streams.get((step.index, ref.name))
+        if channel is not None:
+            return channel
+        produced = self._outputs[ref.step] or {}
+        return iterate(produced.get(ref.key) or ())
+
+    def _attach(self, handle: SharedBuffer) -> Any:
+        view = self._views.get(handle)
+        if view is None:
+            view = self._views[handle] = handle.attach()
+        return view.value
+
+    def _materialise(self, handle: SharedBuffer) -> Any:
+        data = self._attach(handle)
+        return data.copy() if hasattr(data, "copy") else bytes(data)
+
+    def _drop(self, idx: int) -> None:
+        outputs = self._outputs[idx]
+        self._outputs[idx] = None
+        if idx not in self._shared:
+            return
+        self._shared.discard(idx)
+        for handle in shared_handles(outputs):
+            view = self._views.pop(handle, None)
+            if view is not None:
+                view.close()
+            free(handle)
+
+
+__all__ = ["ResultStore"]
@@ -13,6 +13,8 @@ from typing import Any, Callable, Dict, Iterable, List, Optional
 
 from axiomflow.logging import request_id_var
 
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,6 +75,12 @@ class AgentRouter:
         """Route a task to the most suitable agent."""
         if correlation_id:
             request_id_var.set(correlation_id)
+        with span("route_task", "routing", skill=task.get("required_skill")):
+            return await self._route(task, agents)
+
+    async def _route(
+        self, task: Dict[str, Any], agents: Iterable[Dict[str, Any]]
+    ) -> Dict[str, Any]:
         start = time.perf_counter()
         candidates = self._filter_agents(task, agents)
         if not candidates:
@@ -0,0 +1,65 @@
+"""Resource-aware admission of workflow steps onto a shared node budget."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class ResourceScheduler:
+    """Admit steps only while their CPU and memory estimates fit the node.
+
+    A single scheduler can be shared by every executor and run in the
+    process, so memory-heavy steps from different workflows are never
+    co-scheduled beyond the node budget. Admission is non-blocking: callers
+    try to acquire a step's estimates and, when it does not fit, move on to
+    smaller ready steps (backfilling) or wait for :meth:`changed`.
+
+    Args:
+        cpu: Total CPU budget, in the same unit as ``estimated_cpu``.
+        memory: Total memory budget, in the same unit as
+            ``estimated_memory``.
+    """
+
+    cpu: float
+    memory: float
+    cpu_in_use: float = field(default=0.0, init=False)
+    memory_in_use: float = field(default=0.0, init=False)
+
+    def __post_init__(self) -> None:
+        self._waiters: List[asyncio.Future[None]] = []
+
+    def fits_node(self, cpu: float, memory: float) -> bool:
+        """Return ``True`` if the demand could ever be admitted."""
+        return cpu <= self.cpu and memory <= self.memory
+
+    def try_acquire(self, cpu: float, memory: float) -> bool:
+        """Reserve ``cpu`` and ``memory`` if they fit the free budget."""
+        if (
+            self.cpu_in_use + cpu > self.cpu
+            or self.memory_in_use + memory > self.memory
+        ):
+            return False
+        self.cpu_in_use += cpu
+        self.memory_in_use += memory
+        return True
+
+    def release(self, cpu: float, memory: float) -> None:
+        """Return a reservation and wake runs waiting for capacity."""
+        self.cpu_in_use = max(0.0, self.cpu_in_use - cpu)
+        self.memory_in_use = max(0.0, self.memory_in_use - memory)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def changed(self) -> asyncio.Future[None]:
+        """Return a future resolved the next time capacity is released."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+
+__all__ = ["ResourceScheduler"]
@@ -0,0 +1,240 @@
+"""Zero-copy transfer of large step outputs between processes.
+
+Process-pool steps that return large ``bytes``-like or NumPy outputs do not
+pickle them back to the parent. The worker copies each such value once into
+a :mod:`multiprocessing.shared_memory` segment (or a memory-mapped file under
+a spill directory) and returns a small :class:`SharedBuffer` handle instead.
+Downstream steps receive read-only views of the segment: process steps
+attach to it by name, in-process steps get a view mapped by the parent.
+Segments are owned by the run's result store, which frees them once their
+last consumer has finished; handles in results that are discarded instead
+(undeclared outputs, cancelled calls, losing hedges) are freed on the spot.
+Shared-memory segments also stay registered with the
+:mod:`multiprocessing` resource tracker, which unlinks any segment still
+left when the program exits.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import uuid
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - numpy is optional
+    np = None
+
+
+@dataclass(frozen=True)
+class SharedBuffer:
+    """Picklable handle to a large output stored outside the pickle stream.
+
+    Attributes:
+        name: Shared-memory segment name, or file path for ``file`` backend.
+        nbytes: Size of the payload in bytes.
+        backend: ``shm`` or ``file``.
+        dtype: NumPy dtype string for array payloads, ``None`` for bytes.
+        shape: Array shape for NumPy payloads.
+    """
+
+    name: str
+    nbytes: int
+    backend: str = "shm"
+    dtype: str | None = None
+    shape: Tuple[int, ...] = ()
+
+    def attach(self) -> "SharedView":
+        """Map the payload and return a read-only view of it."""
+        return SharedView(self)
+
+
+class SharedView:
+    """A mapping of a :class:`SharedBuffer` exposing a read-only ``value``."""
+
+    def __init__(self, handle: SharedBuffer) -> None:
+        self.handle = handle
+        self._mapping: Any
+        if handle.backend == "file":
+            with open(handle.name, "rb") as fh:
+                self._mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            buf = memoryview(self._mapping)
+        else:
+            self._mapping = shared_memory.SharedMemory(name=handle.name)
+            buf = self._mapping.buf
+        window = buf[: handle.nbytes]
+        data = window.toreadonly()
+        self._buffers = [data, window] + ([buf] if handle.backend == "file" else [])
+        if handle.dtype is not None and np is not None:
+            array = np.frombuffer(data, dtype=handle.dtype).reshape(handle.shape)
+            array.flags.writeable = False
+            self.value: Any = array
+        else:
+            self.value = data
+
+    def close(self) -> None:
+        """Unmap the payload; views still referenced elsewhere keep it alive."""
+        self.value = None
+        try:
+            for buf in self._buffers:
+                buf.release()
+            self._mapping.close()
+        except BufferError:  # pragma: no cover - a consumer kept a view
+            pass
+        self._buffers = []
+
+
+def _as_bytes_view(value: Any) -> Tuple[memoryview, str | None, Tuple[int, ...]]:
+    if np is not None and isinstance(value, np.ndarray):
+        contiguous = np.ascontiguousarray(value)
+        return memoryview(contiguous).cast("B"), contiguous.dtype.str, value.shape
+    return memoryview(value).cast("B"), None, ()
+
+
+def _is_buffer(value: Any) -> bool:
+    if np is not None and isinstance(value, np.ndarray):
+        return value.dtype != object
+    return isinstance(value, (bytes, bytearray, memoryview))
+
+
+def export(value: Any, threshold: int, spill_dir: str | None = None) -> Any:
+    """Move ``value`` into shared storage if it is a buffer of ``threshold`` bytes.
+
+    Other values are returned unchanged.
+    """
+    if not _is_buffer(value):
+        return value
+    data, dtype, shape = _as_bytes_view(value)
+    nbytes = data.nbytes
+    if nbytes < max(threshold, 1):
+        return value
+    if spill_dir is not None:
+        path = os.path.join(spill_dir, f"axiomflow-{uuid.uuid4().hex}.buf")
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return SharedBuffer(path, nbytes, "file", dtype, shape)
+    # The segment stays registered with the resource tracker until freed.
+    shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+    shm.buf[:nbytes] = data
+    handle = SharedBuffer(shm.name, nbytes, "shm", dtype, shape)
+    shm.close()
+    return handle
+
+
+def free(handle: SharedBuffer) -> None:
+    """Delete the storage behind ``handle``."""
+    try:
+        if handle.backend == "file":
+            os.unlink(handle.name)
+        else:
+            # Unlinking also unregisters the segment from the resource
+            # tracker.
+            shm = shared_memory.SharedMemory(name=handle.name)
+            shm.close()
+            shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _handles(value: Any) -> Iterator[SharedBuffer]:
+    if isinstance(value, SharedBuffer):
+        yield value
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            yield from _handles(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _handles(item)
+
+
+def shared_handles(value: Any) -> List[SharedBuffer]:
+    """Return the :class:`SharedBuffer` handles in ``value``.
+
+    Mappings, lists and tuples are searched recursively, so handles inside
+    the item results of a ``foreach`` step are found too.
+    """
+    return list(dict.fromkeys(_handles(value)))
+
+
+def contains_shared(result: Any) -> bool:
+    """Return ``True`` if ``result`` is or holds a :class:`SharedBuffer`."""
+    return next(_handles(result), None) is not None
+
+
+def map_shared(value: Any, func: Callable[[SharedBuffer], Any]) -> Any:
+    """Return ``value`` with every nested handle replaced by ``func(handle)``.
+
+    Mappings, lists and tuples holding handles are rebuilt as ``dict``,
+    ``list`` and ``tuple``; anything else is returned unchanged.
+    """
+    if isinstance(value, SharedBuffer):
+        return func(value)
+    if isinstance(value, Mapping):
+        return {k: map_shared(v, func) for k, v in value.items()}
+    if isinstance(value, list):
+        return [map_shared(v, func) for v in value]
+    if isinstance(value, tuple):
+        return tuple(map_shared(v, func) for v in value)
+    return value
+
+
+def free_shared(value: Any) -> None:
+    """Free every handle in a result that is being discarded."""
+    for handle in _handles(value):
+        free(handle)
+
+
+def run_exporting(
+    func: Callable[..., Any],
+    threshold: int,
+    spill_dir: str | None,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+) -> Any:
+    """Worker-side wrapper for process-pool steps.
+
+    Attaches :class:`SharedBuffer` arguments, including handles nested in
+    containers, as read-only views, calls ``func`` and exports large buffer
+    outputs.
+    """
+    views: List[SharedView] = []
+
+    def attach(handle: SharedBuffer) -> Any:
+        view = handle.attach()
+        views.append(view)
+        return view.value
+
+    try:
+        result = func(
+            *(map_shared(a, attach) for a in args),
+            **{k: map_shared(v, attach) for k, v in kwargs.items()},
+        )
+        if not isinstance(result, Mapping):
+            return export(result, threshold, spill_dir)
+        exported: Dict[str, Any] = {}
+        try:
+            for key, value in result.items():
+                exported[key] = export(value, threshold, spill_dir)
+        except BaseException:
+            free_shared(exported)
+            raise
+        return exported
+    finally:
+        for view in views:
+            view.close()
+
+
+__all__ = [
+    "SharedBuffer",
+    "SharedView",
+    "contains_shared",
+    "export",
+    "free",
+    "free_shared",
+    "map_shared",
+    "run_exporting",
+    "shared_handles",
+]
@@ -0,0 +1,96 @@
+"""Bounded channels carrying items between streaming workflow steps.
+
+A step implemented as an async generator may feed its downstream steps
+incrementally: every edge declared with ``stream: true`` gets one
+:class:`StreamChannel` per consuming input. The consumer receives the
+channel as an async iterator and starts as soon as its producer does, so a
+``generate -> review -> test`` chain is pipelined instead of running as
+three full barriers. Channels are bounded; a producer that gets ahead of
+its slowest consumer waits for it (backpressure), keeping the items in
+flight per edge at most ``maxsize``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Iterable
+
+_END = object()
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+class StreamChannel:
+    """Single-producer, single-consumer bounded queue of stream items.
+
+    Args:
+        maxsize: Maximum number of undelivered items.
+    """
+
+    __slots__ = ("_queue", "_end", "closed")
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize)
+        # End-of-stream or failure marker, kept apart from the items so that
+        # ending a full channel never has to wait for the consumer.
+        self._end: Any = None
+        self.closed = False
+
+    async def send(self, item: Any) -> None:
+        """Deliver ``item``, waiting while the channel is full.
+
+        Items sent after the consumer has gone away are dropped.
+        """
+        if not self.closed:
+            await self._queue.put(item)
+
+    def finish(self) -> None:
+        """Signal the end of the stream."""
+        self._put_marker(_END)
+
+    def fail(self, exc: BaseException) -> None:
+        """End the stream with ``exc``, re-raised in the consumer."""
+        self._put_marker(_Failure(exc))
+
+    def close(self) -> None:
+        """Detach the consumer, unblocking a producer waiting on it."""
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def _put_marker(self, marker: Any) -> None:
+        if self.closed or self._end is not None:
+            return
+        self._end = marker
+        # A consumer blocked on an empty queue needs waking up; a full queue
+        # still holds items, after which the consumer finds the marker.
+        if not self._queue.full():
+            self._queue.put_nowait(marker)
+
+    def __aiter__(self) -> "StreamChannel":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._end is not None and self._queue.empty():
+            item = self._end
+        else:
+            item = await self._queue.get()
+        if item is _END:
+            raise StopAsyncIteration
+        if isinstance(item, _Failure):
+            raise item.exc
+        return item
+
+
+async def iterate(items: Iterable[Any]) -> AsyncIterator[Any]:
+    """Replay already collected ``items`` as a stream."""
+    for item in items:
+        yield item
+
+
+__all__ = ["StreamChannel", "iterate"]
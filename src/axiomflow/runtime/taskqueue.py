@@ -0,0 +1,574 @@
+"""Task queues for running workflow steps on remote workers.
+
+With a task queue configured, :class:`~axiomflow.runtime.executor.WorkflowExecutor`
+turns each ready step into a task instead of calling it in-process, and
+:class:`QueueWorker` processes on any host pull and execute those tasks.
+A worker holds a time-limited lease on the task it runs and renews it with
+heartbeats; if the worker dies, the lease runs out and the task is handed
+to the next worker that asks, up to ``max_deliveries`` times.
+
+Two implementations share the :class:`TaskQueue` interface:
+:class:`SQLiteTaskQueue` for a single host and tests, and
+:class:`RedisTaskQueue` for workers spread over several nodes. Task
+arguments and results travel as JSON.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Protocol
+
+from .recovery import RetryPolicy
+
+LEASE_EXPIRED = "Task lease expired too many times"
+
+
+@dataclass(frozen=True)
+class QueuedTask:
+    """A task leased to a worker.
+
+    Attributes:
+        id: Task identifier.
+        payload: Step description sent by the coordinator.
+        token: Lease token; only its holder may renew or settle the task.
+        deliveries: Number of times the task has been leased, this one
+            included.
+    """
+
+    id: str
+    payload: Dict[str, Any]
+    token: str
+    deliveries: int
+
+
+@dataclass(frozen=True)
+class TaskOutcome:
+    """Final state of a task.
+
+    Attributes:
+        ok: Whether the step succeeded.
+        value: The step result, or the error message when ``ok`` is false.
+    """
+
+    ok: bool
+    value: Any
+
+
+class RemoteStepError(RuntimeError):
+    """Raised by the coordinator when a remotely executed step failed."""
+
+
+class TaskQueue(Protocol):
+    """Interface shared by task queue backends.
+
+    ``poll_interval`` is the longest the coordinator waits between checks
+    for a task's outcome.
+    """
+
+    poll_interval: float
+
+    def put(self, task_id: str, payload: Mapping[str, Any]) -> None:
+        """Enqueue a new task."""
+
+    def claim(self, worker: str, lease: float) -> QueuedTask | None:
+        """Lease the oldest available task for ``lease`` seconds."""
+
+    def heartbeat(self, task_id: str, token: str, lease: float) -> bool:
+        """Extend a lease; ``False`` if it was lost."""
+
+    def complete(self, task_id: str, token: str, result: Any) -> bool:
+        """Record a successful result; ``False`` if the lease was lost."""
+
+    def fail(self, task_id: str, token: str, error: str) -> bool:
+        """Record a failure; ``False`` if the lease was lost."""
+
+    def outcome(self, task_id: str) -> TaskOutcome | None:
+        """Return the final state of a task, ``None`` while unsettled."""
+
+    def discard(self, task_id: str) -> None:
+        """Forget a task, revoking any lease on it."""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+class SQLiteTaskQueue:
+    """Task queue stored in a SQLite database file.
+
+    Every process opening the same file shares the queue, which makes it
+    suitable for several workers on one host and for tests.
+
+    Args:
+        path: Database file, created if missing.
+        max_deliveries: Leases a task may expire before it fails.
+        poll_interval: See :class:`TaskQueue`.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        max_deliveries: int = 3,
+        poll_interval: float = 0.1,
+    ) -> None:
+        if max_deliveries < 1:
+            raise ValueError("max_deliveries must be at least 1")
+        self.path = Path(path)
+        self.max_deliveries = max_deliveries
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id TEXT PRIMARY KEY, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "token TEXT, worker TEXT, lease_until REAL, "
+            "deliveries INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until)"
+        )
+
+    def _write(self, sql: str, params: tuple[Any, ...]) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def put(self, task_id: str, payload: Mapping[str, Any]) -> None:
+        self._write(
+            "INSERT INTO tasks (id, payload, status) VALUES (?, ?, 'queued')",
+            (task_id, _dumps(payload)),
+        )
+
+    def claim(self, worker: str, lease: float) -> QueuedTask | None:
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE tasks SET status = 'failed', error = ? "
+                    "WHERE status = 'leased' AND lease_until < ? "
+                    "AND deliveries >= ?",
+                    (LEASE_EXPIRED, now, self.max_deliveries),
+                )
+                row = conn.execute(
+                    "SELECT id, payload, deliveries FROM tasks "
+                    "WHERE status = 'queued' "
+                    "OR (status = 'leased' AND lease_until < ?) "
+                    "ORDER BY rowid LIMIT 1",
+                    (now,),
+                ).fetchone()
+                task = None
+                if row is not None:
+                    token = uuid.uuid4().hex
+                    conn.execute(
+                        "UPDATE tasks SET status = 'leased', token = ?, "
+                        "worker = ?, lease_until = ?, deliveries = deliveries + 1 "
+                        "WHERE id = ?",
+                        (token, worker, now + lease, row[0]),
+                    )
+                    task = QueuedTask(row[0], json.loads(row[1]), token, row[2] + 1)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return task
+
+    def heartbeat(self, task_id: str, token: str, lease: float) -> bool:
+        return bool(
+            self._write(
+                "UPDATE tasks SET lease_until = ? "
+                "WHERE id = ? AND token = ? AND status = 'leased'",
+                (time.time() + lease, task_id, token),
+            )
+        )
+
+    def complete(self, task_id: str, token: str, result: Any) -> bool:
+        return bool(
+            self._write(
+                "UPDATE tasks SET status = 'done', result = ? "
+                "WHERE id = ? AND token = ? AND status = 'leased'",
+                (_dumps(result), task_id, token),
+            )
+        )
+
+    def fail(self, task_id: str, token: str, error: str) -> bool:
+        return bool(
+            self._write(
+                "UPDATE tasks SET status = 'failed', error = ? "
+                "WHERE id = ? AND token = ? AND status = 'leased'",
+                (error, task_id, token),
+            )
+        )
+
+    def outcome(self, task_id: str) -> TaskOutcome | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, result, error, deliveries, lease_until "
+                "FROM tasks WHERE id = ?",
+                (task_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, result, error, deliveries, lease_until = row
+        if status == "done":
+            return TaskOutcome(True, json.loads(result))
+        if status == "failed":
+            return TaskOutcome(False, error)
+        if (
+            status == "leased"
+            and deliveries >= self.max_deliveries
+            and lease_until < time.time()
+        ):
+            # Nobody may pick the task up again; do not wait for a claim to
+            # notice.
+            return TaskOutcome(False, LEASE_EXPIRED)
+        return None
+
+    def discard(self, task_id: str) -> None:
+        self._write("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_CLAIM = """
+local now = tonumber(ARGV[1])
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], id)
+    local key = ARGV[6] .. id
+    if tonumber(redis.call('HGET', key, 'deliveries') or '0') >= tonumber(ARGV[5]) then
+        redis.call('HSET', key, 'status', 'failed', 'error', ARGV[7])
+    elseif redis.call('EXISTS', key) == 1 then
+        redis.call('HSET', key, 'status', 'queued')
+        redis.call('LPUSH', KEYS[1], id)
+    end
+end
+while true do
+    local id = redis.call('RPOP', KEYS[1])
+    if not id then
+        return nil
+    end
+    local key = ARGV[6] .. id
+    if redis.call('HGET', key, 'status') == 'queued' then
+        local deliveries = redis.call('HINCRBY', key, 'deliveries', 1)
+        redis.call('HSET', key, 'status', 'leased', 'token', ARGV[3],
+            'worker', ARGV[4])
+        redis.call('ZADD', KEYS[2], ARGV[2], id)
+        return {id, redis.call('HGET', key, 'payload'), deliveries}
+    end
+end
+"""
+
+_RENEW = """
+local key = ARGV[4] .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased'
+        or redis.call('HGET', key, 'token') ~= ARGV[2] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+_SETTLE = """
+local key = ARGV[5] .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased'
+        or redis.call('HGET', key, 'token') ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HSET', key, 'status', ARGV[3], ARGV[4], ARGV[6])
+return 1
+"""
+
+
+class RedisTaskQueue:
+    """Task queue kept in Redis, shared by workers on any number of hosts.
+
+    Ready task IDs live in a list, leases in a sorted set scored by expiry
+    and task state in one hash per task. Claims, renewals and results are
+    Lua scripts, so each is atomic on the server. Lease expiry uses the
+    workers' wall clocks, which therefore must be roughly in sync.
+
+    Args:
+        client: ``redis.Redis`` client; created from ``url`` when omitted.
+        url: Redis URL used when no client is given.
+        prefix: Prefix of all keys used by the queue.
+        max_deliveries: Leases a task may expire before it fails.
+        poll_interval: See :class:`TaskQueue`.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        *,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "axiomflow:tasks",
+        max_deliveries: int = 3,
+        poll_interval: float = 0.1,
+    ) -> None:
+        if max_deliveries < 1:
+            raise ValueError("max_deliveries must be at least 1")
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.max_deliveries = max_deliveries
+        self.poll_interval = poll_interval
+        self._ready = f"{prefix}:ready"
+        self._leases = f"{prefix}:leases"
+        self._task = f"{prefix}:task:"
+        self._claim = client.register_script(_CLAIM)
+        self._renew = client.register_script(_RENEW)
+        self._settle = client.register_script(_SETTLE)
+
+    def put(self, task_id: str, payload: Mapping[str, Any]) -> None:
+        pipe = self.client.pipeline()
+        pipe.hset(
+            self._task + task_id,
+            mapping={"payload": _dumps(payload), "status": "queued", "deliveries": 0},
+        )
+        pipe.lpush(self._ready, task_id)
+        pipe.execute()
+
+    def claim(self, worker: str, lease: float) -> QueuedTask | None:
+        now = time.time()
+        token = uuid.uuid4().hex
+        row = self._claim(
+            keys=[self._ready, self._leases],
+            args=[
+                now,
+                now + lease,
+                token,
+                worker,
+                self.max_deliveries,
+                self._task,
+                LEASE_EXPIRED,
+            ],
+        )
+        if row is None:
+            return None
+        task_id, payload, deliveries = row
+        if isinstance(task_id, bytes):
+            task_id = task_id.decode()
+        return QueuedTask(task_id, json.loads(payload), token, int(deliveries))
+
+    def heartbeat(self, task_id: str, token: str, lease: float) -> bool:
+        return bool(
+            self._renew(
+                keys=[self._leases],
+                args=[task_id, token, time.time() + lease, self._task],
+            )
+        )
+
+    def complete(self, task_id: str, token: str, result: Any) -> bool:
+        return self._settle_task(task_id, token, "done", "result", _dumps(result))
+
+    def fail(self, task_id: str, token: str, error: str) -> bool:
+        return self._settle_task(task_id, token, "failed", "error", error)
+
+    def _settle_task(
+        self, task_id: str, token: str, status: str, field: str, value: str
+    ) -> bool:
+        return bool(
+            self._settle(
+                keys=[self._leases],
+                args=[task_id, token, status, field, self._task, value],
+            )
+        )
+
+    def outcome(self, task_id: str) -> TaskOutcome | None:
+        status, result, error, deliveries = self.client.hmget(
+            self._task + task_id, "status", "result", "error", "deliveries"
+        )
+        if status in (b"done", "done"):
+            return TaskOutcome(True, json.loads(result))
+        if status in (b"failed", "failed"):
+            return TaskOutcome(False, _text(error))
+        if status in (b"leased", "leased") and int(deliveries) >= self.max_deliveries:
+            expiry = self.client.zscore(self._leases, task_id)
+            if expiry is not None and expiry < time.time():
+                return TaskOutcome(False, LEASE_EXPIRED)
+        return None
+
+    def discard(self, task_id: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.delete(self._task + task_id)
+        pipe.zrem(self._leases, task_id)
+        pipe.lrem(self._ready, 0, task_id)
+        pipe.execute()
+
+
+def _text(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class QueueWorker:
+    """Pull tasks from a queue and run the matching step functions.
+
+    Steps run through a local :class:`WorkflowExecutor`, so their retry
+    policy, attempt timeout, execution mode and hedging behave as they do
+    in-process. While a step runs its lease is renewed every third of
+    ``lease`` seconds; if the renewal fails (the coordinator gave up on the
+    task or the lease was handed to another worker) the step is cancelled.
+
+    Args:
+        queue: Queue to pull from.
+        step_funcs: Step functions keyed by step ID, as passed to
+            :meth:`WorkflowExecutor.run_workflow` by the coordinator.
+        executor: Executor running the steps; one without result sharing
+            is created when omitted.
+        worker_id: Name recorded on leased tasks.
+        lease: Lease duration in seconds.
+        concurrency: Number of tasks run at the same time.
+    """
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        step_funcs: Mapping[str, Callable[..., Any]],
+        *,
+        executor: Any = None,
+        worker_id: str | None = None,
+        lease: float = 30.0,
+        concurrency: int = 1,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if executor is None:
+            from .executor import WorkflowExecutor
+            from .pools import StepPools
+
+            # Shared-memory handles are meaningless on another host.
+            executor = WorkflowExecutor(pools=StepPools(share_threshold=None))
+        self.queue = queue
+        self.step_funcs = dict(step_funcs)
+        self.executor = executor
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.lease = lease
+        self.concurrency = concurrency
+        self.processed = 0
+
+    async def run_once(self) -> bool:
+        """Run one task if any is available.
+
+        Returns:
+            ``True`` if a task was claimed.
+        """
+        task = await asyncio.to_thread(self.queue.claim, self.worker_id, self.lease)
+        if task is None:
+            return False
+        await self._process(task)
+        self.processed += 1
+        return True
+
+    async def run(
+        self, stop: asyncio.Event | None = None, max_tasks: int | None = None
+    ) -> int:
+        """Process tasks until ``stop`` is set or ``max_tasks`` are done.
+
+        Returns:
+            The number of tasks processed.
+        """
+        stop = stop or asyncio.Event()
+        start = self.processed
+
+        async def loop() -> None:
+            while not stop.is_set():
+                if max_tasks is not None and self.processed - start >= max_tasks:
+                    return
+                if not await self.run_once():
+                    try:
+                        await asyncio.wait_for(
+                            stop.wait(), self.queue.poll_interval
+                        )
+                    except TimeoutError:
+                        pass
+
+        await asyncio.gather(*(loop() for _ in range(self.concurrency)))
+        return self.processed - start
+
+    async def _process(self, task: QueuedTask) -> None:
+        payload = task.payload
+        func = self.step_funcs.get(payload["step"])
+        if func is None:
+            await asyncio.to_thread(
+                self.queue.fail,
+                task.id,
+                task.token,
+                f"Missing function for step {payload['step']}",
+            )
+            return
+        retry = payload.get("retry")
+        if retry:
+            policy = RetryPolicy.from_config(retry)
+        else:
+            policy = self.executor.default_retry
+        step = asyncio.ensure_future(
+            self.executor.run_step(
+                func,
+                execution=payload.get("execution", "auto"),
+                retry_policy=policy,
+                timeout=payload.get("timeout"),
+                hedge_key=(
+                    (payload.get("workflow", ""), payload["step"])
+                    if payload.get("idempotent")
+                    else None
+                ),
+                **payload["kwargs"],
+            )
+        )
+        try:
+            while True:
+                done, _ = await asyncio.wait({step}, timeout=self.lease / 3)
+                if done:
+                    break
+                renewed = await asyncio.to_thread(
+                    self.queue.heartbeat, task.id, task.token, self.lease
+                )
+                if not renewed:
+                    step.cancel()
+                    await asyncio.gather(step, return_exceptions=True)
+                    return
+        finally:
+            if not step.done():
+                step.cancel()
+                await asyncio.gather(step, return_exceptions=True)
+        exc = step.exception()
+        if exc is None:
+            try:
+                await asyncio.to_thread(
+                    self.queue.complete, task.id, task.token, step.result()
+                )
+                return
+            except (TypeError, ValueError) as error:  # result is not JSON
+                exc = error
+        await asyncio.to_thread(
+            self.queue.fail, task.id, task.token, f"{type(exc).__name__}: {exc}"
+        )
+
+
+__all__ = [
+    "LEASE_EXPIRED",
+    "QueueWorker",
+    "QueuedTask",
+    "RedisTaskQueue",
+    "RemoteStepError",
+    "SQLiteTaskQueue",
+    "TaskOutcome",
+    "TaskQueue",
+]
@@ -0,0 +1,196 @@
+"""Timed spans exported in the Chrome trace event format.
+
+A :class:`Tracer` collects spans for one workflow run. It is activated
+through a context variable, so the executor, :class:`RecoveryManager`,
+:meth:`AgentRouter.route_task` and :meth:`ContextManager.handoff_context`
+record into whichever tracer is active for the current task without any
+plumbing; with no active tracer :func:`span` is a shared no-op and costs a
+context-variable lookup.
+
+Spans are grouped into lanes (one trace "thread" per lane): each workflow
+step gets its own lane, and spans opened inside it, such as retries and
+backoff sleeps, nest under the step. The file written by
+:meth:`Tracer.export` opens directly in Perfetto or ``chrome://tracing``.
+Every span is tagged with the correlation ID from
+:data:`axiomflow.logging.request_id_var`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from axiomflow.logging import request_id_var
+
+_tracer: ContextVar["Tracer | None"] = ContextVar("axiomflow_tracer", default=None)
+_lane: ContextVar[str] = ContextVar("axiomflow_trace_lane", default="run")
+_NOOP = contextlib.nullcontext()
+
+
+class Tracer:
+    """Collector of spans for one run.
+
+    Args:
+        name: Process name shown in the trace viewer.
+    """
+
+    def __init__(self, name: str = "axiomflow") -> None:
+        self.name = name
+        self.events: List[Dict[str, Any]] = []
+        self._pid = os.getpid()
+        self._origin = time.monotonic()
+        self._lanes: Dict[str, int] = {}
+        self.events.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": 0,
+                "args": {"name": name},
+            }
+        )
+
+    def _tid(self, lane: str) -> int:
+        tid = self._lanes.get(lane)
+        if tid is None:
+            tid = self._lanes[lane] = len(self._lanes) + 1
+            self.events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": lane},
+                }
+            )
+        return tid
+
+    def complete(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        *,
+        cat: str = "axiomflow",
+        lane: str | None = None,
+        args: Dict[str, Any] | None = None,
+    ) -> None:
+        """Record a span between two :func:`time.monotonic` readings."""
+        span_args = dict(args or {})
+        span_args.setdefault("request_id", request_id_var.get())
+        self.events.append(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": max(end - start, 0.0) * 1e6,
+                "pid": self._pid,
+                "tid": self._tid(lane or _lane.get()),
+                "args": span_args,
+            }
+        )
+
+    def instant(self, name: str, *, cat: str = "axiomflow", **args: Any) -> None:
+        """Record a point-in-time event on the current lane."""
+        args.setdefault("request_id", request_id_var.get())
+        self.events.append(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "i",
+                "s": "t",
+                "ts": (time.monotonic() - self._origin) * 1e6,
+                "pid": self._pid,
+                "tid": self._tid(_lane.get()),
+                "args": args,
+            }
+        )
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Make this tracer the active one within the ``with`` block."""
+        token = _tracer.set(self)
+        try:
+            yield self
+        finally:
+            _tracer.reset(token)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trace as a Chrome trace JSON object."""
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def export(self, path: Path | str) -> Path:
+        """Atomically write the trace to ``path`` and return it."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, separators=(",", ":"), default=str)
+        os.replace(tmp, path)
+        return path
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "lane", "args", "start", "token")
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        name: str,
+        cat: str,
+        lane: str | None,
+        args: Dict[str, Any],
+    ) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.lane = lane
+        self.args = args
+        self.token: Any = None
+
+    def __enter__(self) -> "_Span":
+        if self.lane is not None:
+            self.token = _lane.set(self.lane)
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        end = time.monotonic()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.complete(self.name, self.start, end, cat=self.cat, args=self.args)
+        if self.token is not None:
+            _lane.reset(self.token)
+
+
+def current_tracer() -> Tracer | None:
+    """Return the tracer active in the current context, if any."""
+    return _tracer.get()
+
+
+def span(
+    name: str, cat: str = "axiomflow", *, lane: str | None = None, **args: Any
+) -> contextlib.AbstractContextManager[Any]:
+    """Time the ``with`` block as a span of the active tracer.
+
+    Args:
+        name: Span name.
+        cat: Span category, used for filtering in the trace viewer.
+        lane: Lane to record the span and everything nested in it on;
+            defaults to the enclosing span's lane.
+        **args: Extra fields attached to the span.
+    """
+    tracer = _tracer.get()
+    if tracer is None:
+        return _NOOP
+    return _Span(tracer, name, cat, lane, args)
+
+
+__all__ = ["Tracer", "current_tracer", "span"]
@@ -7,6 +7,7 @@ sys.path.append(str(Path(__file__).resolve().parents[2] / "src"))
 
 import pytest
 
+from axiomflow.core.graph import StepGraph
 from axiomflow.dsl.parser import parse_workflow
 
 VALID_WORKFLOW_YAML = """
@@ -129,6 +130,35 @@ def test_parse_yaml_workflow(tmp_path: Path) -> None:
     assert result["name"] == "sample-workflow"
 
 
+def test_retry_block_with_list_values_is_simulated(tmp_path: Path) -> None:
+    retry = (
+        "      retry:\n"
+        "        max_attempts: 3\n"
+        "        backoff_strategy: linear\n"
+        "        retry_conditions: [TimeoutError]\n"
+    )
+    content = VALID_WORKFLOW_YAML.replace(
+        "      estimated_memory: 256\n", "      estimated_memory: 256\n" + retry
+    )
+    result = parse_workflow(str(_write_temp(tmp_path, content)))
+    assert result["steps"][0]["retry"]["retry_conditions"] == ["TimeoutError"]
+    assert result["execution_order"] == ["step1", "step2"]
+
+
+def test_parse_builds_step_graph_once(tmp_path: Path, monkeypatch) -> None:
+    built = []
+    init = StepGraph.__init__
+
+    def counting(self, *args, **kwargs):
+        built.append(self)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(StepGraph, "__init__", counting)
+    result = parse_workflow(str(_write_temp(tmp_path, VALID_WORKFLOW_YAML)))
+    assert result["execution_order"] == ["step1", "step2"]
+    assert len(built) == 1
+
+
 def test_parse_json_workflow(tmp_path: Path) -> None:
     file_path = tmp_path / "workflow.json"
     file_path.write_text(VALID_WORKFLOW_JSON)
@@ -178,3 +208,146 @@ def test_dry_run_execution_order(tmp_path: Path) -> None:
     workflow_path = _write_temp(tmp_path, VALID_WORKFLOW_YAML)
     result = parse_workflow(str(workflow_path), dry_run=True)
     assert result["execution_order"] == ["step1", "step2"]
+
+
+def test_invalid_cache_settings(tmp_path: Path) -> None:
+    yaml_text = VALID_WORKFLOW_YAML.replace(
+        "estimated_cpu: 1.0", "estimated_cpu: 1.0\n      cache:\n        ttl: -5"
+    )
+    workflow_path = _write_temp(tmp_path, yaml_text)
+    with pytest.raises(ValueError, match="cache"):
+        parse_workflow(str(workflow_path))
+
+
+def test_critical_path_makespan_estimate(tmp_path: Path) -> None:
+    yaml_text = (
+        VALID_WORKFLOW_YAML.replace(
+            "estimated_cpu: 1.0", "estimated_cpu: 1.0\n      estimated_runtime: 3"
+        )
+        .replace("estimated_cpu: 2.0", "estimated_cpu: 2.0\n      estimated_runtime: 4")
+        .replace(
+            "  edges:",
+            "    - id: step3\n      persona: dev\n      estimated_runtime: 5\n  edges:",
+        )
+    )
+    workflow_path = _write_temp(tmp_path, yaml_text)
+    estimates = parse_workflow(str(workflow_path))["estimates"]
+    assert estimates["runtime"] == 12.0
+    assert estimates["makespan"] == 7.0
+
+
+def test_invalid_execution_mode(tmp_path: Path) -> None:
+    yaml_text = VALID_WORKFLOW_YAML.replace(
+        "estimated_cpu: 1.0", "estimated_cpu: 1.0\n      execution: gpu"
+    )
+    workflow_path = _write_temp(tmp_path, yaml_text)
+    with pytest.raises(ValueError, match="execution"):
+        parse_workflow(str(workflow_path))
+
+
+def test_streaming_edge_validation(tmp_path: Path) -> None:
+    streaming = VALID_WORKFLOW_YAML.replace(
+        "      to: step2\n", "      to: step2\n      stream: true\n"
+    )
+    workflow = parse_workflow(str(_write_temp(tmp_path, streaming)))
+    assert workflow["edges"][0]["stream"] is True
+
+    invalid = streaming.replace("stream: true", "stream: maybe")
+    with pytest.raises(ValueError, match="stream"):
+        parse_workflow(str(_write_temp(tmp_path, invalid)))
+
+    offloaded = streaming.replace(
+        "estimated_cpu: 2.0", "estimated_cpu: 2.0\n      execution: process"
+    )
+    with pytest.raises(ValueError, match="inline"):
+        parse_workflow(str(_write_temp(tmp_path, offloaded)))
+
+
+def test_foreach_validation(tmp_path: Path) -> None:
+    foreach = "\n      foreach:\n        input: prev_result\n        concurrency: 4"
+    yaml_text = VALID_WORKFLOW_YAML.replace(
+        "estimated_cpu: 2.0", "estimated_cpu: 2.0" + foreach
+    )
+    workflow = parse_workflow(str(_write_temp(tmp_path, yaml_text)))
+    assert workflow["steps"][1]["foreach"]["concurrency"] == 4
+
+    for bad in (
+        "input: missing",
+        "concurrency: .inf",
+        "concurrency: 2.5",
+        "concurrency: 4\n        chunk_size: 0",
+        "concurrency: 4\n        chunk_size: .nan",
+        "concurrency: 4\n        max_failures: .inf",
+        "concurrency: 4\n        max_failures: true",
+    ):
+        field = bad.partition(":")[0]
+        invalid = yaml_text.replace(
+            "input: prev_result" if field == "input" else "concurrency: 4", bad
+        )
+        with pytest.raises(ValueError, match="foreach"):
+            parse_workflow(str(_write_temp(tmp_path, invalid)))
+
+
+def test_dry_run_simulation(tmp_path: Path) -> None:
+    yaml_text = VALID_WORKFLOW_YAML.replace(
+        "estimated_cpu: 1.0", "estimated_cpu: 1.0\n      estimated_runtime: 2.0"
+    ).replace(
+        "estimated_cpu: 2.0", "estimated_cpu: 2.0\n      estimated_runtime: 3.0"
+    )
+    workflow_path = _write_temp(tmp_path, yaml_text)
+    simulation = parse_workflow(str(workflow_path), dry_run=True)["simulation"]
+    assert simulation["makespan"] == 5.0
+    assert simulation["personas"]["dev"]["utilisation"] == 1.0
+
+
+def test_invalid_failure_probability(tmp_path: Path) -> None:
+    yaml_text = VALID_WORKFLOW_YAML.replace(
+        "estimated_cpu: 1.0",
+        "estimated_cpu: 1.0\n      retry:\n        backoff_strategy: linear"
+        "\n        failure_probability: 1.5",
+    )
+    with pytest.raises(ValueError, match="failure probability"):
+        parse_workflow(str(_write_temp(tmp_path, yaml_text)))
+
+
+def test_invalid_step_timeout(tmp_path: Path) -> None:
+    yaml_text = VALID_WORKFLOW_YAML.replace(
+        "estimated_cpu: 1.0", "estimated_cpu: 1.0\n      timeout: -1"
+    )
+    with pytest.raises(ValueError, match="timeout"):
+        parse_workflow(str(_write_temp(tmp_path, yaml_text)))
+
+
+def test_invalid_idempotent_flag(tmp_path: Path) -> None:
+    yaml_text = VALID_WORKFLOW_YAML.replace(
+        "estimated_cpu: 1.0", "estimated_cpu: 1.0\n      idempotent: maybe"
+    )
+    with pytest.raises(ValueError, match="idempotent"):
+        parse_workflow(str(_write_temp(tmp_path, yaml_text)))
+
+
+def test_conditional_edge_validation(tmp_path: Path) -> None:
+    conditional = VALID_WORKFLOW_YAML.replace(
+        "      to: step2\n",
+        "      to: step2\n      condition: not step1.result\n      probability: 0.25\n",
+    )
+    workflow = parse_workflow(str(_write_temp(tmp_path, conditional)))
+    assert workflow["edges"][0]["condition"] == "not step1.result"
+
+    for bad, message in (
+        ("condition: step2.final", "condition"),
+        ("condition: step1.missing", "condition"),
+        ("probability: 1.5", "probability"),
+    ):
+        field = bad.partition(":")[0]
+        lines = [
+            line if not line.strip().startswith(field + ":") else "      " + bad
+            for line in conditional.splitlines()
+        ]
+        invalid = "\n".join(lines)
+        with pytest.raises(ValueError, match=message):
+            parse_workflow(str(_write_temp(tmp_path, invalid)))
+
+    streaming = conditional.replace("probability: 0.25", "stream: true")
+    with pytest.raises(ValueError, match="conditional"):
+        parse_workflow(str(_write_temp(tmp_path, streaming)))
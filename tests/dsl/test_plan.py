@@ -0,0 +1,162 @@
+"""Tests for compiled workflow execution plans."""
+
+import asyncio
+import dataclasses
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "src"))
+
+import pytest
+
+from axiomflow.dsl.parser import WorkflowParser
+from axiomflow.dsl.plan import (
+    LITERAL,
+    WORKFLOW_INPUT,
+    EdgeCondition,
+    ExecutionPlan,
+    InputRef,
+)
+from axiomflow.runtime.executor import WorkflowExecutor
+
+WORKFLOW_YAML = """
+workflow:
+  name: plan-workflow
+  version: "2.0.0"
+  inputs:
+    - name: repo
+      type: string
+  personas:
+    - id: dev
+      name: Developer
+      role: coder
+      capabilities: [code]
+  steps:
+    - id: fetch
+      persona: dev
+      inputs:
+        source: repo
+        depth: 3
+      outputs:
+        tree: string
+      estimated_runtime: 1.5
+      estimated_cost: 2.0
+    - id: review
+      persona: dev
+      inputs:
+        tree: fetch.tree
+      outputs:
+        report: string
+      retry:
+        backoff_strategy: linear
+      estimated_runtime: 0.5
+      estimated_cost: 1.0
+  edges:
+    - from: fetch
+      to: review
+  gates: []
+"""
+
+
+def test_compile_resolves_indexes_and_inputs() -> None:
+    plan = WorkflowParser().compile(WORKFLOW_YAML)
+    assert isinstance(plan, ExecutionPlan)
+    assert (plan.name, plan.version) == ("plan-workflow", "2.0.0")
+    assert plan.index == {"fetch": 0, "review": 1}
+    assert plan.successors == ((1,), ())
+    assert plan.predecessor_counts == (0, 1)
+    assert plan.consumer_counts == (1, 0)
+    assert plan.order == (0, 1)
+    fetch, review = plan.steps
+    assert fetch.inputs == (
+        InputRef("source", WORKFLOW_INPUT, "repo"),
+        InputRef("depth", LITERAL, value=3),
+    )
+    assert review.inputs == (InputRef("tree", 0, "tree"),)
+    assert review.retry == {"backoff_strategy": "linear"}
+    assert plan.upward_rank == (2.0, 0.5)
+    assert plan.estimates == {
+        "runtime": 2.0,
+        "cost": 3.0,
+        "makespan": 2.0,
+        "expected_cost": 3.0,
+    }
+
+
+def test_plan_is_immutable_and_cached() -> None:
+    parser = WorkflowParser()
+    plan = parser.compile(WORKFLOW_YAML)
+    assert parser.compile(WORKFLOW_YAML) is plan
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        plan.name = "other"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        plan.index["fetch"] = 5  # type: ignore[index]
+
+
+def test_executor_reuses_plan_across_runs() -> None:
+    plan = WorkflowParser().compile(WORKFLOW_YAML)
+    calls: list[str] = []
+
+    def make(name: str):
+        async def step():
+            calls.append(name)
+            return {"runtime": 1.0, "cost": 0.5}
+
+        return step
+
+    step_funcs = {"fetch": make("fetch"), "review": make("review")}
+    executor = WorkflowExecutor()
+
+    async def runner():
+        return [
+            await executor.run_workflow(plan, step_funcs, inputs={"repo": "x"})
+            for _ in range(3)
+        ]
+
+    results = asyncio.run(runner())
+    assert [(r["runtime"], r["cost"]) for r in results] == [(2.0, 1.0)] * 3
+    assert calls == ["fetch", "review"] * 3
+
+
+def test_conditional_edges_and_reach() -> None:
+    plan = ExecutionPlan.from_workflow(
+        {
+            "steps": [
+                {"id": "gate", "outputs": {"ok": "bool"}},
+                {"id": "build", "inputs": {"ok": "gate.ok"}, "outputs": {"x": "int"}},
+                {"id": "test", "inputs": {"x": "build.x"}},
+                {"id": "notify"},
+            ],
+            "edges": [
+                {
+                    "from": "gate",
+                    "to": "build",
+                    "condition": "gate.ok",
+                    "probability": 0.8,
+                },
+                {
+                    "from": "gate",
+                    "to": "notify",
+                    "condition": "not gate.ok",
+                    "probability": 0.5,
+                },
+                {"from": "build", "to": "notify"},
+            ],
+        }
+    )
+    assert plan.conditions == {
+        (0, 1): EdgeCondition("ok", probability=0.8),
+        (0, 3): EdgeCondition("ok", negate=True, probability=0.5),
+    }
+    # ``test`` reads ``build``; ``notify`` runs when either edge is taken.
+    assert plan.reach == pytest.approx((1.0, 0.8, 0.8, 1 - 0.2 * 0.5))
+    assert plan.conditions[(0, 3)].holds({"ok": False})
+    assert not plan.conditions[(0, 1)].holds({"ok": False})
+
+    with pytest.raises(ValueError, match="must read an output of gate"):
+        ExecutionPlan.from_workflow(
+            {
+                "steps": [{"id": "gate"}, {"id": "build"}],
+                "edges": [{"from": "gate", "to": "build", "condition": "build.ok"}],
+            }
+        )
@@ -0,0 +1,125 @@
+"""Tests for the dry-run simulator."""
+
+import pytest
+
+from axiomflow.dsl.plan import ExecutionPlan
+from axiomflow.dsl.simulator import simulate
+
+
+def _plan(steps, edges=()):
+    return ExecutionPlan.from_workflow(
+        {"steps": steps, "edges": [{"from": a, "to": b} for a, b in edges]}
+    )
+
+
+def _step(sid, persona="dev", runtime=1.0, cost=1.0, **extra):
+    return {
+        "id": sid,
+        "persona": persona,
+        "estimated_runtime": runtime,
+        "estimated_cost": cost,
+        **extra,
+    }
+
+
+def test_workers_limit_parallelism_and_report_queueing():
+    plan = _plan([_step(f"s{i}") for i in range(4)])
+    serial = simulate(plan, {"dev": 1})
+    assert serial.makespan == 4.0
+    assert serial.personas["dev"].utilisation == 1.0
+    assert serial.personas["dev"].queue_delay == pytest.approx(1.5)
+    assert serial.personas["dev"].max_queue_delay == 3.0
+
+    pair = simulate(plan, {"dev": 2})
+    assert pair.makespan == 2.0
+    assert pair.cost == 4.0
+
+    unlimited = simulate(plan, default_workers=None)
+    assert unlimited.makespan == 1.0
+    assert unlimited.personas["dev"].utilisation is None
+
+
+def test_dependencies_and_personas():
+    plan = _plan(
+        [
+            _step("design", "architect", 2.0),
+            _step("build_a", "dev", 3.0),
+            _step("build_b", "dev", 1.0),
+            _step("review", "reviewer", 1.0),
+        ],
+        [("design", "build_a"), ("design", "build_b"), ("build_a", "review")],
+    )
+    report = simulate(plan, {"dev": 2})
+    assert report.start[plan.index["review"]] == 5.0
+    assert report.makespan == 6.0
+    assert report.personas["architect"].utilisation == pytest.approx(2.0 / 6.0)
+    assert report.personas["dev"].busy == 4.0
+
+
+def test_critical_path_steps_start_first():
+    plan = _plan(
+        [_step("short", runtime=1.0), _step("long", runtime=1.0), _step("tail")],
+        [("long", "tail")],
+    )
+    report = simulate(plan, {"dev": 1})
+    assert report.start[plan.index["long"]] == 0.0
+    assert report.makespan == 3.0
+
+
+def test_global_concurrency_cap():
+    plan = _plan([_step("a", "x"), _step("b", "y"), _step("c", "z")])
+    assert simulate(plan, default_workers=None, max_concurrency=2).makespan == 2.0
+
+
+def test_retry_probability_inflates_runtime_and_cost():
+    retry = {
+        "max_attempts": 3,
+        "backoff_strategy": "linear",
+        "base_delay": 1.0,
+        "max_delay": 10.0,
+        "failure_probability": 0.5,
+    }
+    plan = _plan([_step("flaky", runtime=2.0, cost=1.0, retry=retry)])
+    expected = simulate(plan)
+    # 1 + 0.5 + 0.25 attempts, plus 0.5 * 1s and 0.25 * 2s of backoff.
+    assert expected.cost == pytest.approx(1.75)
+    assert expected.makespan == pytest.approx(3.5 + 1.0)
+
+    samples = [simulate(plan, seed=seed).makespan for seed in range(50)]
+    assert set(samples) == {2.0, 5.0, 9.0}
+    assert simulate(plan, seed=7).makespan == simulate(plan, seed=7).makespan
+
+
+def test_conditional_edges_weight_cost_and_prune_samples():
+    security = {"from": "diff", "to": "security", "condition": "diff.auth"}
+    plan = ExecutionPlan.from_workflow(
+        {
+            "steps": [
+                _step("diff", outputs={"auth": "bool"}),
+                _step("security", cost=4.0, runtime=3.0),
+                _step("merge"),
+            ],
+            "edges": [
+                {**security, "probability": 0.25},
+                {"from": "diff", "to": "merge"},
+                {"from": "security", "to": "merge"},
+            ],
+        }
+    )
+    assert plan.reach == (1.0, 0.25, 1.0)
+    assert plan.estimates["expected_cost"] == 3.0
+    expected = simulate(plan, default_workers=None)
+    assert expected.cost == 3.0
+    # Without sampling every branch is simulated.
+    assert expected.makespan == 5.0
+
+    samples = [simulate(plan, default_workers=None, seed=s) for s in range(40)]
+    assert {(r.makespan, r.cost) for r in samples} == {(2.0, 2.0), (5.0, 6.0)}
+    pruned = next(r for r in samples if r.cost == 2.0)
+    assert pruned.reach == (1.0, 0.0, 1.0)
+    assert pruned.personas["dev"].steps == 2
+
+
+def test_invalid_worker_count():
+    with pytest.raises(ValueError, match="worker"):
+        simulate(_plan([_step("a")]), {"dev": 0})
@@ -0,0 +1,27 @@
+import functools
+
+import pytest
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def record(calls):
+    """Wrap async step functions so every call appends its step id to ``calls``."""
+
+    def wrap(funcs):
+        return {sid: _recorded(sid, func, calls) for sid, func in funcs.items()}
+
+    return wrap
+
+
+def _recorded(sid, func, calls):
+    @functools.wraps(func)
+    async def step(*args, **kwargs):
+        calls.append(sid)
+        return await func(*args, **kwargs)
+
+    return step
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from axiomflow.runtime.admission import ProjectQuota, QueueFull, RunQueue
+from axiomflow.runtime.executor import WorkflowExecutor
+
+WORKFLOW = {"steps": [{"id": "s", "outputs": {"v": "str"}}], "edges": []}
+
+
+async def _fill(queue, project, count, order, gate):
+    async def one():
+        await queue.acquire(project)
+        order.append(project)
+        await gate.wait()
+        queue.release(project)
+
+    return [asyncio.create_task(one()) for _ in range(count)]
+
+
+def test_deficit_round_robin_follows_weights():
+    async def main():
+        queue = RunQueue(
+            None,
+            max_concurrent_runs=1,
+            quotas={"big": ProjectQuota(weight=1.0), "vip": ProjectQuota(weight=2.0)},
+        )
+        order = []
+        # Hold the only slot while both projects queue up.
+        await queue.acquire("hold")
+        gate = asyncio.Event()
+        gate.set()
+        tasks = await _fill(queue, "big", 6, order, gate)
+        tasks += await _fill(queue, "vip", 6, order, gate)
+        await asyncio.sleep(0)
+        assert queue.depth() == 12
+        queue.release("hold")
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(main())
+    assert order[:9] == ["big", "vip", "vip"] * 3
+
+
+def test_max_concurrent_per_project():
+    async def main():
+        queue = RunQueue(
+            None,
+            max_concurrent_runs=4,
+            quotas={"a": ProjectQuota(max_concurrent=1)},
+        )
+        order = []
+        gate = asyncio.Event()
+        tasks = await _fill(queue, "a", 3, order, gate)
+        tasks += await _fill(queue, "b", 2, order, gate)
+        await asyncio.sleep(0.01)
+        snapshot = queue.metrics()
+        gate.set()
+        await asyncio.gather(*tasks)
+        return snapshot
+
+    metrics = asyncio.run(main())
+    assert metrics["running"] == 3
+    assert metrics["projects"]["a"]["running"] == 1
+    assert metrics["projects"]["a"]["queued"] == 2
+    assert metrics["projects"]["b"]["running"] == 2
+    assert metrics["projects"]["a"]["oldest_wait"] > 0
+
+
+def test_full_queue_rejects_or_waits():
+    async def main(overflow):
+        queue = RunQueue(
+            None,
+            max_concurrent_runs=1,
+            default_quota=ProjectQuota(max_queued=1),
+            overflow=overflow,
+        )
+        await queue.acquire("p")
+        queued = asyncio.create_task(queue.acquire("p"))
+        await asyncio.sleep(0)
+        extra = asyncio.create_task(queue.acquire("p"))
+        await asyncio.sleep(0)
+        if overflow == "reject":
+            with pytest.raises(QueueFull):
+                await extra
+            assert queue.metrics()["projects"]["p"]["rejected"] == 1
+            queued.cancel()
+            return queue.depth()
+        assert not extra.done()
+        queue.release("p")
+        await queued
+        await asyncio.sleep(0)
+        assert queue.depth("p") == 1
+        queue.release("p")
+        await extra
+        return queue.depth()
+
+    assert asyncio.run(main("reject")) == 1
+    assert asyncio.run(main("wait")) == 0
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def main():
+        queue = RunQueue(None, max_concurrent_runs=1)
+        await queue.acquire("p")
+        waiter = asyncio.create_task(queue.acquire("q"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        queue.release("p")
+        return queue.metrics()
+
+    metrics = asyncio.run(main())
+    assert metrics["queued"] == 0 and metrics["running"] == 0
+
+
+def test_submit_runs_workflow_under_project():
+    async def step():
+        return {"v": "done"}
+
+    async def main():
+        queue = RunQueue(WorkflowExecutor(), max_concurrent_runs=2)
+        results = await asyncio.gather(
+            *(queue.submit(WORKFLOW, {"s": step}, project="p") for _ in range(5))
+        )
+        return queue, results
+
+    queue, results = asyncio.run(main())
+    assert all(r["outputs"] == {"s": {"v": "done"}} for r in results)
+    metrics = queue.metrics()
+    assert metrics["projects"]["p"]["admitted"] == 5
+    assert metrics["running"] == 0
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from axiomflow.dsl.plan import ExecutionPlan
+from axiomflow.runtime.batch import invariant_steps, varying_inputs
+from axiomflow.runtime.executor import WorkflowExecutor
+
+# ``load`` reads ``path`` and feeds ``fit``, which also reads ``alpha``.
+WORKFLOW = {
+    "steps": [
+        {
+            "id": "load",
+            "inputs": {"path": "path"},
+            "outputs": {"rows": "int", "cost": "float"},
+        },
+        {
+            "id": "fit",
+            "inputs": {"rows": "load.rows", "alpha": "alpha"},
+            "outputs": {"score": "int"},
+        },
+        {
+            "id": "report",
+            "inputs": {"score": "fit.score"},
+            "outputs": {"text": "str"},
+        },
+    ],
+    "edges": [{"from": "load", "to": "fit"}, {"from": "fit", "to": "report"}],
+}
+
+
+async def _load(path):
+    await asyncio.sleep(0.01)
+    return {"rows": len(path), "cost": 2.0}
+
+
+async def _fit(rows, alpha):
+    return {"score": rows * alpha}
+
+
+async def _report(score):
+    return {"text": f"score={score}"}
+
+
+FUNCS = {"load": _load, "fit": _fit, "report": _report}
+
+
+def test_invariant_steps_follow_varying_inputs():
+    plan = ExecutionPlan.from_workflow(WORKFLOW)
+    bindings = [{"path": "data", "alpha": a} for a in (1, 2)]
+    varying = varying_inputs(bindings)
+    assert varying == {"alpha"}
+    assert invariant_steps(plan, varying) == {plan.index["load"]}
+    assert invariant_steps(plan, frozenset({"path"})) == frozenset()
+
+
+def test_batch_runs_shared_steps_once(record, calls):
+    executor = WorkflowExecutor()
+    summaries = asyncio.run(
+        executor.run_batch(
+            WORKFLOW,
+            record(FUNCS),
+            [{"alpha": a} for a in (1, 2, 3)],
+            inputs={"path": "data"},
+        )
+    )
+    assert calls.count("load") == 1
+    assert calls.count("fit") == 3
+    assert [s["outputs"] for s in summaries] == [
+        {"report": {"text": f"score={4 * a}"}} for a in (1, 2, 3)
+    ]
+    assert sorted(s["cost"] for s in summaries) == [0.0, 0.0, 2.0]
+    assert sorted(s["saved"]["cost"] for s in summaries) == [0.0, 2.0, 2.0]
+
+
+def test_batch_failure_cancels_other_runs():
+    executor = WorkflowExecutor()
+
+    async def fit(rows, alpha):
+        if alpha == 0:
+            raise ValueError("bad alpha")
+        await asyncio.sleep(10)
+        return {"score": rows}
+
+    batch = executor.run_batch(
+        WORKFLOW,
+        {**FUNCS, "fit": fit},
+        [{"alpha": 0}, {"alpha": 1}],
+        inputs={"path": "x"},
+    )
+    with pytest.raises(ValueError, match="bad alpha"):
+        asyncio.run(asyncio.wait_for(batch, 2))
+
+
+def test_batch_return_exceptions(record, calls):
+    executor = WorkflowExecutor()
+
+    async def fit(rows, alpha):
+        if alpha == 0:
+            raise ValueError("bad alpha")
+        return await _fit(rows, alpha)
+
+    first, second = asyncio.run(
+        executor.run_batch(
+            WORKFLOW,
+            record({**FUNCS, "fit": fit}),
+            [{"alpha": 0}, {"alpha": 1}],
+            inputs={"path": "x"},
+            return_exceptions=True,
+        )
+    )
+    assert isinstance(first, ValueError)
+    assert second["outputs"] == {"report": {"text": "score=1"}}
+    assert calls.count("load") == 1
+
+
+def test_batch_limits_concurrency_across_runs():
+    executor = WorkflowExecutor()
+    active = peak = 0
+
+    async def fit(rows, alpha):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return {"score": alpha}
+
+    asyncio.run(
+        executor.run_batch(
+            WORKFLOW,
+            {**FUNCS, "fit": fit},
+            [{"alpha": a} for a in range(6)],
+            inputs={"path": "x"},
+            max_concurrency=2,
+        )
+    )
+    assert peak == 2
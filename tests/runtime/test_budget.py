@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from axiomflow.runtime.budget import BudgetController, BudgetExceeded
+from axiomflow.runtime.executor import WorkflowExecutor
+
+
+def _chain(*costs, spent=None):
+    """Chain steps estimated at ``costs`` that each report ``spent``."""
+    steps = [
+        {
+            "id": f"s{i}",
+            "inputs": {"cost": cost if spent is None else spent},
+            "estimated_cost": cost,
+        }
+        for i, cost in enumerate(costs)
+    ]
+    edges = [{"from": f"s{i}", "to": f"s{i + 1}"} for i in range(len(costs) - 1)]
+    return {"steps": steps, "edges": edges}
+
+
+async def _spend(cost):
+    return {"cost": cost}
+
+
+FUNCS = dict.fromkeys(["s0", "s1", "s2"], _spend)
+
+
+def test_projected_overrun_aborts_before_spending(tmp_path, record, calls):
+    budget = BudgetController(run_budget=10.0, report_dir=tmp_path)
+    executor = WorkflowExecutor(budget=budget)
+    with pytest.raises(BudgetExceeded) as excinfo:
+        asyncio.run(
+            executor.run_workflow(_chain(4, 4, 4), record(FUNCS), run_id="r1")
+        )
+    assert calls == []
+    report = json.loads((tmp_path / "r1-budget.json").read_text())
+    assert report == excinfo.value.report
+    assert report["scope"] == "run"
+    assert report["projected"] == 12.0
+    assert report["pending_steps"] == ["s0", "s1", "s2"]
+    assert budget.projected("default") == 0.0
+
+
+def test_actual_cost_updates_projection(record, calls):
+    budget = BudgetController(project_budgets={"acme": 6.0})
+    executor = WorkflowExecutor(budget=budget)
+    with pytest.raises(BudgetExceeded) as excinfo:
+        asyncio.run(
+            executor.run_workflow(
+                _chain(1, 1, 1, spent=5), record(FUNCS), project="acme"
+            )
+        )
+    assert calls == ["s0"]
+    assert excinfo.value.report["scope"] == "project"
+    assert excinfo.value.report["projected"] == 7.0
+    assert budget.spent("acme") == 5.0
+
+
+def test_within_budget_runs_to_completion(record, calls):
+    budget = BudgetController(default_budget=100.0)
+    executor = WorkflowExecutor(budget=budget)
+    result = asyncio.run(executor.run_workflow(_chain(1, 1, 1), record(FUNCS)))
+    assert calls == ["s0", "s1", "s2"]
+    assert result["cost"] == 3.0
+    assert budget.spent("default") == 3.0
+    assert budget.projected("default") == 3.0
+
+
+def test_concurrent_runs_share_project_budget():
+    budget = BudgetController(project_budgets={"acme": 10.0})
+    executor = WorkflowExecutor(budget=budget)
+
+    async def runner():
+        workflow = _chain(2, 2, 2)
+
+        async def run():
+            return await executor.run_workflow(workflow, FUNCS, project="acme")
+
+        return await asyncio.gather(run(), run(), return_exceptions=True)
+
+    results = asyncio.run(runner())
+    aborted = [r for r in results if isinstance(r, BudgetExceeded)]
+    assert len(aborted) == 1
+    assert budget.spent("acme") == 6.0
+
+
+def test_pause_waits_for_budget_increase(record, calls):
+    budget = BudgetController(project_budgets={"acme": 1.0}, action="pause")
+    executor = WorkflowExecutor(budget=budget)
+
+    async def runner():
+        task = asyncio.create_task(
+            executor.run_workflow(_chain(1, 1, 1), record(FUNCS), project="acme")
+        )
+        await asyncio.sleep(0.05)
+        assert calls == [] and not task.done()
+        budget.set_budget("acme", 5.0)
+        return await asyncio.wait_for(task, timeout=1)
+
+    result = asyncio.run(runner())
+    assert calls == ["s0", "s1", "s2"]
+    assert result["cost"] == 3.0
+
+
+def test_unknown_action_rejected():
+    with pytest.raises(ValueError, match="budget action"):
+        BudgetController(action="ignore")
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+from axiomflow.dsl.parser import WorkflowParser
+from axiomflow.runtime.cache import StepCache
+from axiomflow.runtime.executor import WorkflowExecutor
+
+CACHED_YAML = """
+workflow:
+  name: cached
+  version: "1.0.0"
+  inputs:
+    - name: repo
+      type: string
+  personas:
+    - id: dev
+      name: Developer
+      role: coder
+      capabilities: [code]
+  steps:
+    - id: analyse
+      persona: dev
+      inputs:
+        repo: repo
+      outputs:
+        report: string
+      cache:
+        ttl: 3600
+    - id: publish
+      persona: dev
+      inputs:
+        report: analyse.report
+      outputs: {}
+  edges:
+    - from: analyse
+      to: publish
+  gates: []
+"""
+
+
+def test_executor_skips_cached_steps_and_reports_savings():
+    plan = WorkflowParser().compile(CACHED_YAML)
+    calls: list[str] = []
+
+    async def analyse(repo):
+        calls.append(repo)
+        return {"report": f"ok:{repo}", "runtime": 2.0, "cost": 5.0}
+
+    async def publish(report):
+        calls.append(report)
+        return {"runtime": 0.5, "cost": 0.1}
+
+    cache = StepCache()
+    executor = WorkflowExecutor(cache=cache)
+    funcs = {"analyse": analyse, "publish": publish}
+
+    async def runner():
+        first = await executor.run_workflow(plan, funcs, inputs={"repo": "a"})
+        second = await executor.run_workflow(plan, funcs, inputs={"repo": "a"})
+        third = await executor.run_workflow(plan, funcs, inputs={"repo": "b"})
+        return first, second, third
+
+    first, second, third = asyncio.run(runner())
+    assert calls == ["a", "ok:a", "ok:a", "b", "ok:b"]
+    assert first["saved"] == {"runtime": 0.0, "cost": 0.0}
+    assert second["saved"] == {"runtime": 2.0, "cost": 5.0}
+    assert (second["runtime"], second["cost"]) == (0.5, 0.1)
+    assert third["cost"] == 5.1
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+
+
+def test_memory_tier_is_lru_bounded():
+    step = WorkflowParser().compile(CACHED_YAML).steps[0]
+    cache = StepCache(max_entries=2)
+    keys = [cache.key(step, {"repo": name}) for name in "abc"]
+    cache.set(keys[0], 1)
+    cache.set(keys[1], 2)
+    assert cache.get(keys[0]) == (True, 1)
+    cache.set(keys[2], 3)
+    assert cache.get(keys[1]) == (False, None)
+    assert cache.get(keys[0]) == (True, 1)
+    assert cache.stats.evictions == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = StepCache()
+    cache.set("k", "v", ttl=10)
+    now = time.time()
+    monkeypatch.setattr("axiomflow.runtime.cache.time.time", lambda: now + 11)
+    assert cache.get("k") == (False, None)
+
+
+def test_disk_tier_persists_and_evicts(tmp_path):
+    cache = StepCache(directory=tmp_path, max_bytes=200)
+    cache.set("first", {"value": "x" * 50})
+    reopened = StepCache(directory=tmp_path, max_bytes=200)
+    assert reopened.get("first") == (True, {"value": "x" * 50})
+    assert reopened.stats.disk_hits == 1
+    reopened.set("second", {"value": "y" * 50})
+    reopened.set("third", {"value": "z" * 50})
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["second", "third"]
+
+
+def test_uncacheable_inputs_bypass_cache():
+    step = WorkflowParser().compile(CACHED_YAML).steps[0]
+    cache = StepCache()
+    assert cache.key(step, {"repo": object()}) is None
+    assert cache.stats.uncacheable == 1
+
+
+def test_hits_return_independent_copies(tmp_path):
+    cache = StepCache(directory=tmp_path)
+    result = {"items": [1, 2]}
+    cache.set("k", result)
+    result["items"].append(3)
+    _, first = cache.get("k")
+    first["items"].append(4)
+    assert cache.get("k") == (True, {"items": [1, 2]})
+    reopened = StepCache(directory=tmp_path)
+    _, loaded = reopened.get("k")
+    loaded["items"].clear()
+    assert reopened.get("k") == (True, {"items": [1, 2]})
+
+
+def test_async_disk_tier_tracks_size_without_listing(tmp_path, monkeypatch):
+    cache = StepCache(directory=tmp_path, max_bytes=200)
+    reopened = StepCache(directory=tmp_path)
+
+    async def runner():
+        for name in ("first", "second", "third"):
+            await cache.set_async(name, {"value": name * 10})
+        return await reopened.get_async("second")
+
+    # Writes and evictions only consult the in-memory index of files.
+    monkeypatch.setattr(type(tmp_path), "glob", None)
+    assert asyncio.run(runner()) == (True, {"value": "second" * 10})
+    monkeypatch.undo()
+    files = list(tmp_path.glob("*.json"))
+    assert sorted(p.stem for p in files) == ["second", "third"]
+    assert cache._disk_bytes == sum(p.stat().st_size for p in files) <= 200
+
+
+def test_structurally_identical_steps_do_not_share_entries():
+    workflow = {
+        "steps": [
+            {
+                "id": sid,
+                "persona": "dev",
+                "action": "run",
+                "inputs": {},
+                "outputs": {"result": "str"},
+                "cache": True,
+            }
+            for sid in ("lint", "test")
+        ],
+        "edges": [{"from": "lint", "to": "test"}],
+    }
+
+    async def lint():
+        return {"result": "lint-ok"}
+
+    async def test():
+        return {"result": "test-ok"}
+
+    executor = WorkflowExecutor(cache=StepCache())
+    funcs = {"lint": lint, "test": test}
+    summary = asyncio.run(executor.run_workflow(workflow, funcs))
+    assert summary["outputs"] == {"test": {"result": "test-ok"}}
+    assert executor.cache.stats.hits == 0
+
+    step = WorkflowParser().compile(CACHED_YAML).steps[0]
+    keys = {executor.cache.key(step, {}, func) for func in (lint, test)}
+    assert len(keys) == 2
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from axiomflow.runtime.executor import WorkflowExecutor
+
+# ``security`` and its ``report`` only run when the diff touches auth.
+WORKFLOW = {
+    "steps": [
+        {"id": "diff", "inputs": {"paths": "paths"}, "outputs": {"auth": "bool"}},
+        {"id": "security", "outputs": {"findings": "list"}, "estimated_cost": 5.0},
+        {
+            "id": "report",
+            "inputs": {"findings": "security.findings"},
+            "outputs": {"text": "str"},
+            "estimated_cost": 1.0,
+        },
+        {"id": "archive", "inputs": {"text": "report.text"}, "estimated_cost": 1.0},
+        {"id": "merge", "outputs": {"done": "bool"}, "estimated_cost": 1.0},
+    ],
+    "edges": [
+        {
+            "from": "diff",
+            "to": "security",
+            "condition": "diff.auth",
+            "probability": 0.2,
+        },
+        {"from": "diff", "to": "merge"},
+        {"from": "security", "to": "merge"},
+    ],
+}
+
+
+async def _diff(paths):
+    return {"auth": any(p.startswith("auth/") for p in paths)}
+
+
+async def _security():
+    return {"findings": ["weak hash"]}
+
+
+async def _report(findings):
+    return {"text": f"{len(findings)} finding"}
+
+
+async def _archive(text):
+    return None
+
+
+async def _merge():
+    return {"done": True}
+
+
+FUNCS = {
+    "diff": _diff,
+    "security": _security,
+    "report": _report,
+    "archive": _archive,
+    "merge": _merge,
+}
+
+
+def test_false_condition_prunes_unreachable_subgraph(record, calls):
+    executor = WorkflowExecutor(max_concurrency=4)
+    summary = asyncio.run(
+        executor.run_workflow(
+            WORKFLOW, record(FUNCS), inputs={"paths": ["docs/readme.md"]}
+        )
+    )
+    assert sorted(calls) == ["diff", "merge"]
+    assert sorted(summary["pruned"]) == ["archive", "report", "security"]
+    assert summary["outputs"]["merge"] == {"done": True}
+    assert summary["outputs"]["archive"] == {}
+
+
+def test_true_condition_runs_branch(record, calls):
+    executor = WorkflowExecutor(max_concurrency=4)
+    summary = asyncio.run(
+        executor.run_workflow(
+            WORKFLOW, record(FUNCS), inputs={"paths": ["auth/login.py"]}
+        )
+    )
+    assert sorted(calls) == ["archive", "diff", "merge", "report", "security"]
+    assert summary["pruned"] == []
+
+
+def test_pruned_steps_are_journaled(tmp_path):
+    executor = WorkflowExecutor(journal_dir=tmp_path)
+    summary = asyncio.run(
+        executor.run_workflow(WORKFLOW, FUNCS, inputs={"paths": []}, run_id="r1")
+    )
+    lines = (tmp_path / "r1.jsonl").read_text()
+    assert lines.count('"step_pruned"') == len(summary["pruned"]) == 3
+
+
+def test_dry_run_reports_expected_cost():
+    executor = WorkflowExecutor()
+    summary = asyncio.run(executor.run_workflow(WORKFLOW, {}, dry_run=True))
+    # security, report and archive only run one time in five.
+    assert summary["simulation"]["cost"] == pytest.approx(1.0 + 0.2 * 7.0)
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from axiomflow.core.config import Config
+from axiomflow.runtime.executor import WorkflowExecutor
+
+CONFIG = Path(__file__).resolve().parents[2] / "configs" / "orchestrator.yaml"
+
+
+def test_step_timeout_from_dsl_fails_hung_step():
+    workflow = {
+        "steps": [
+            {
+                "id": "hung",
+                "timeout": 0.05,
+                "retry": {"max_attempts": 2, "base_delay": 0},
+            }
+        ],
+        "edges": [],
+    }
+    attempts = 0
+
+    async def hung():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(10)
+
+    executor = WorkflowExecutor()
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        asyncio.run(executor.run_workflow(workflow, {"hung": hung}))
+    assert attempts == 2
+    assert time.perf_counter() - start < 1
+
+
+def test_workflow_deadline_cancels_in_flight_steps():
+    workflow = {
+        "steps": [{"id": "fast"}, {"id": "slow"}, {"id": "after"}],
+        "edges": [{"from": "slow", "to": "after"}],
+    }
+    cancelled = []
+    ran = []
+
+    async def fast():
+        return {}
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def after():
+        ran.append("after")
+
+    executor = WorkflowExecutor(max_concurrency=None, workflow_timeout=0.1)
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        asyncio.run(
+            executor.run_workflow(
+                workflow, {"fast": fast, "slow": slow, "after": after}
+            )
+        )
+    assert time.perf_counter() - start < 1
+    assert cancelled == ["slow"]
+    assert not ran
+
+
+def test_per_run_timeout_overrides_default():
+    workflow = {"steps": [{"id": "nap"}], "edges": []}
+
+    async def nap():
+        await asyncio.sleep(0.05)
+        return {"done": True}
+
+    executor = WorkflowExecutor(workflow_timeout=0.01)
+    result = asyncio.run(executor.run_workflow(workflow, {"nap": nap}, timeout=5))
+    assert result["outputs"] == {"nap": {}}
+
+
+def test_workflow_timeout_read_from_orchestrator_config():
+    executor = WorkflowExecutor.from_config(Config.load(CONFIG), max_concurrency=2)
+    assert executor.workflow_timeout == 300.0
+    assert executor.max_concurrency == 2
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from axiomflow.dsl.parser import WorkflowParser
+from axiomflow.runtime.estimates import EstimateStore
+from axiomflow.runtime.executor import WorkflowExecutor
+
+WORKFLOW_YAML = """
+workflow:
+  name: learned
+  version: "1"
+  personas:
+    - id: dev
+  steps:
+    - id: build
+      persona: dev
+      estimated_runtime: 1.0
+      estimated_cost: 1.0
+    - id: docs
+      persona: dev
+      estimated_runtime: 5.0
+      estimated_cost: 1.0
+  edges: []
+  gates: []
+"""
+
+
+def test_moving_averages_and_quantiles():
+    store = EstimateStore(alpha=0.5, min_runs=2)
+    store.record("wf", "s", "dev", 1.0, cost=2.0)
+    assert store.runtime("wf", "s", "dev") is None
+    store.record("wf", "s", "dev", 3.0, cost=4.0)
+    assert store.runtime("wf", "s", "dev") == 2.0
+    assert store.cost("wf", "s", "dev") == 3.0
+    assert store.get("wf", "s", "dev").total_cost == 6.0
+    assert store.get("wf", "s") is None
+
+    p90 = EstimateStore(quantile=0.9, min_runs=1)
+    for i in range(1, 101):
+        p90.record("wf", "s", None, i / 100)
+    assert p90.runtime("wf", "s") == pytest.approx(0.9, rel=0.05)
+
+
+def test_state_stays_bounded():
+    store = EstimateStore()
+    for i in range(200_000):
+        store.record("wf", "s", None, 0.5 + (i % 1000) / 1000)
+    stats = store.get("wf", "s")
+    assert stats.runs == 200_000
+    # One bucket per 5% of the 0.5s-1.5s range, however many runs.
+    assert len(stats.runtimes.to_dict()["buckets"]) <= 24
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "estimates.json"
+    store = EstimateStore(path=path, min_runs=1)
+    store.record("wf", "s", "dev", 2.0, cost=0.5)
+    store.save()
+    loaded = EstimateStore(path=path, min_runs=1)
+    assert len(loaded) == 1
+    assert loaded.runtime("wf", "s", "dev") == 2.0
+    assert loaded.get("wf", "s", "dev").runtimes.quantile(0.5) == pytest.approx(2.0)
+    with pytest.raises(ValueError):
+        EstimateStore().save()
+
+
+def test_executor_learns_and_parser_uses_estimates():
+    store = EstimateStore(min_runs=2)
+    plan = WorkflowParser(store).compile(WORKFLOW_YAML)
+
+    async def build():
+        return {"runtime": 8.0, "cost": 3.0}
+
+    async def docs():
+        return None
+
+    executor = WorkflowExecutor(estimates=store)
+    for _ in range(2):
+        asyncio.run(executor.run_workflow(plan, {"build": build, "docs": docs}))
+    assert store.runtime("learned", "build", "dev") == 8.0
+    assert store.cost("learned", "build", "dev") == 3.0
+    # Steps that report nothing are credited with their wall-clock time.
+    assert store.runtime("learned", "docs", "dev") < 1.0
+
+    workflow = WorkflowParser(store).parse(WORKFLOW_YAML)
+    build_step = workflow["steps"][0]
+    assert (build_step["estimated_runtime"], build_step["estimated_cost"]) == (
+        8.0,
+        3.0,
+    )
+    assert workflow["estimates"]["makespan"] == 8.0
+
+
+def test_learned_runtimes_reorder_ready_steps():
+    plan = WorkflowParser().compile(WORKFLOW_YAML)
+    order = []
+
+    def make(sid):
+        async def step():
+            order.append(sid)
+
+        return step
+
+    funcs = {"build": make("build"), "docs": make("docs")}
+    asyncio.run(WorkflowExecutor().run_workflow(plan, funcs))
+    assert order == ["docs", "build"]
+
+    store = EstimateStore(min_runs=1)
+    store.record("learned", "build", "dev", 30.0)
+    order.clear()
+    asyncio.run(WorkflowExecutor(estimates=store).run_workflow(plan, funcs))
+    assert order == ["build", "docs"]
@@ -1,7 +1,9 @@
 import asyncio
 
+import pytest
+
 from axiomflow.runtime.executor import WorkflowExecutor
-from axiomflow.runtime.recovery import RetryPolicy
+from axiomflow.runtime.recovery import SINGLE_ATTEMPT, RecoveryManager, RetryPolicy
 
 
 def test_executor_uses_recovery_manager():
@@ -21,3 +23,60 @@ def test_executor_uses_recovery_manager():
         assert result == "done"
 
     asyncio.run(runner())
+
+
+def test_single_attempt_skips_recovery_manager():
+    class Exploding(RecoveryManager):
+        async def execute(self, *args, **kwargs):
+            raise AssertionError("recovery manager used")
+
+    async def step(x):
+        return x + 1
+
+    async def runner():
+        executor = WorkflowExecutor(Exploding())
+        policy = RetryPolicy(max_attempts=1)
+        assert await executor.run_step(step, 1, retry_policy=policy) == 2
+        assert await executor.run_step(lambda: 3, retry_policy=policy) == 3
+        assert await executor.run_step(step, 1, retry_policy=policy, timeout=1) == 2
+
+    asyncio.run(runner())
+
+
+def test_steps_without_retry_block_use_default_retry():
+    calls = []
+
+    async def fails():
+        calls.append(1)
+        raise ValueError("boom")
+
+    workflow = {"steps": [{"id": "s"}], "edges": []}
+    with pytest.raises(ValueError):
+        asyncio.run(WorkflowExecutor().run_workflow(workflow, {"s": fails}))
+    assert len(calls) == 3
+
+    calls.clear()
+    executor = WorkflowExecutor(default_retry=SINGLE_ATTEMPT)
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run_workflow(workflow, {"s": fails}))
+    assert calls == [1]
+
+
+def test_retry_block_with_list_values_runs():
+    retry = {
+        "max_attempts": 3,
+        "backoff_strategy": "linear",
+        "base_delay": 0,
+        "retry_conditions": ["TimeoutError"],
+    }
+    workflow = {"steps": [{"id": "s", "retry": retry}], "edges": []}
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise TimeoutError
+        return {}
+
+    asyncio.run(WorkflowExecutor().run_workflow(workflow, {"s": flaky}))
+    assert len(attempts) == 3
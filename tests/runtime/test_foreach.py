@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from axiomflow.dsl.plan import ExecutionPlan, ForeachSpec
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.foreach import ForeachError, map_chunked
+
+
+def _workflow(**foreach):
+    return {
+        "steps": [
+            {
+                "id": "review",
+                "inputs": {"files": "files", "depth": 2},
+                "outputs": ["reviews", "errors"],
+                "foreach": {"input": "files", "as": "file", **foreach},
+                "retry": {
+                    "max_attempts": 2,
+                    "backoff_strategy": "linear",
+                    "base_delay": 0,
+                },
+            }
+        ],
+        "edges": [],
+    }
+
+
+def test_plan_compiles_foreach_settings():
+    plan = ExecutionPlan.from_workflow(_workflow(concurrency=3, chunk_size=4))
+    assert plan.steps[0].foreach == ForeachSpec("files", "file", 3, 4, None)
+
+
+def test_foreach_maps_items_in_order_with_bounded_concurrency():
+    active = 0
+    peak = 0
+
+    async def review(file, depth):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.001 * (file % 3))
+        active -= 1
+        return {"file": file, "depth": depth, "runtime": 1.0, "cost": 0.5}
+
+    files = list(range(50))
+    executor = WorkflowExecutor()
+    result = asyncio.run(
+        executor.run_workflow(
+            _workflow(concurrency=4, chunk_size=5),
+            {"review": review},
+            inputs={"files": files},
+        )
+    )
+    reviews = result["outputs"]["review"]["reviews"]
+    assert [r["file"] for r in reviews] == files
+    assert all(r["depth"] == 2 for r in reviews)
+    assert result["outputs"]["review"]["errors"] == {}
+    assert peak == 4
+    assert result["runtime"] == 50.0
+    assert result["cost"] == 25.0
+
+
+def test_foreach_retries_items_and_keeps_partial_results():
+    attempts = {}
+
+    def review(file):
+        attempts[file] = attempts.get(file, 0) + 1
+        if file == 1 and attempts[file] == 1:
+            raise RuntimeError("flaky")
+        if file == 3:
+            raise ValueError("broken file")
+        return file * 10
+
+    executor = WorkflowExecutor()
+    result = asyncio.run(
+        executor.run_workflow(
+            _workflow(), {"review": review}, inputs={"files": [0, 1, 2, 3]}
+        )
+    )
+    outputs = result["outputs"]["review"]
+    assert outputs["reviews"] == [0, 10, 20, None]
+    assert outputs["errors"] == {3: "broken file"}
+    assert attempts == {0: 1, 1: 2, 2: 1, 3: 2}
+
+
+def test_foreach_failure_budget():
+    def review(file):
+        raise ValueError(f"bad {file}")
+
+    executor = WorkflowExecutor()
+    with pytest.raises(ForeachError) as excinfo:
+        asyncio.run(
+            executor.run_workflow(
+                _workflow(max_failures=1, concurrency=1),
+                {"review": review},
+                inputs={"files": [0, 1, 2, 3]},
+            )
+        )
+    assert sorted(excinfo.value.errors) == [0, 1]
+
+
+def test_map_chunked_empty():
+    results, errors = asyncio.run(map_chunked(lambda item: item, []))
+    assert results == [] and errors == {}
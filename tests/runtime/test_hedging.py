@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.hedging import HedgingPolicy
+
+
+def _warm(policy, key, seconds, samples=5):
+    for _ in range(samples):
+        policy.stats(key).latency.record(seconds)
+
+
+def test_no_hedge_without_history():
+    policy = HedgingPolicy(min_samples=3)
+    calls = []
+
+    async def step():
+        calls.append(1)
+        return "ok"
+
+    assert asyncio.run(policy.run("s", step)) == "ok"
+    assert calls == [1]
+    assert policy.threshold("s") is None
+    assert policy.report()["s"]["fired"] == 0
+
+
+def test_straggler_is_hedged_and_duplicate_wins():
+    policy = HedgingPolicy(min_samples=5)
+    _warm(policy, "s", 0.01)
+    delays = [1.0, 0.0]
+    cancelled = []
+
+    async def step():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    assert asyncio.run(policy.run("s", step)) == 0.0
+    assert cancelled == [1.0]
+    report = policy.report()["s"]
+    assert report["calls"] == 1
+    assert report["fired"] == 1
+    assert report["won"] == 1
+
+
+def test_abandoned_attempts_are_recorded_as_censored_samples():
+    policy = HedgingPolicy(percentile=0.5, min_samples=5)
+    _warm(policy, "s", 0.01)
+
+    async def step(delays):
+        await asyncio.sleep(delays.pop(0))
+
+    async def main():
+        for _ in range(10):
+            await policy.run("s", step, [1.0, 0.0])
+        # A call cancelled while both attempts straggle is censored too.
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(policy.run("s", step, [1.0, 1.0]), 0.05)
+
+    asyncio.run(main())
+    stats = policy.stats("s")
+    assert (stats.won, stats.censored) == (10, 11)
+    assert len(stats.latency) == 5 + 11
+    # The slow first attempts keep the threshold up, where the fast
+    # duplicates alone would have dragged it towards zero.
+    assert policy.threshold("s") >= 0.01
+
+
+def test_failed_attempt_falls_back_to_other():
+    policy = HedgingPolicy(min_samples=5)
+    _warm(policy, "s", 0.01)
+    attempts = []
+
+    async def step():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            return "slow"
+        raise RuntimeError("boom")
+
+    assert asyncio.run(policy.run("s", step)) == "slow"
+    stats = policy.stats("s")
+    assert (stats.fired, stats.won) == (1, 0)
+
+
+def test_all_attempts_failing_raises():
+    policy = HedgingPolicy(min_samples=1)
+    _warm(policy, "s", 0.001, samples=1)
+
+    async def step():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(policy.run("s", step))
+
+
+def test_min_delay_bounds_threshold():
+    policy = HedgingPolicy(min_samples=1, min_delay=0.5)
+    _warm(policy, "s", 0.001, samples=1)
+    assert policy.threshold("s") == 0.5
+    with pytest.raises(ValueError):
+        HedgingPolicy(percentile=1.0)
+
+
+def test_executor_hedges_only_idempotent_steps():
+    policy = HedgingPolicy(min_samples=3)
+    for sid in ("safe", "unsafe"):
+        _warm(policy, ("ci", sid), 0.005, samples=3)
+    executor = WorkflowExecutor(hedging=policy)
+    calls = {"safe": 0, "unsafe": 0}
+
+    def make(sid):
+        async def step():
+            calls[sid] += 1
+            await asyncio.sleep(0.05 if calls[sid] == 1 else 0.0)
+            return {"value": sid}
+
+        return step
+
+    workflow = {
+        "name": "ci",
+        "steps": [
+            {"id": "safe", "idempotent": True, "outputs": {"value": "str"}},
+            {"id": "unsafe", "outputs": {"value": "str"}},
+        ],
+        "edges": [{"from": "safe", "to": "unsafe"}],
+    }
+    asyncio.run(
+        executor.run_workflow(workflow, {sid: make(sid) for sid in calls})
+    )
+    assert calls == {"safe": 2, "unsafe": 1}
+    report = policy.report()
+    assert report[("ci", "safe")]["won"] == 1
+    assert report[("ci", "unsafe")]["calls"] == 0
+
+    # The same step of another workflow has a history of its own.
+    calls = {"safe": 0, "unsafe": 0}
+    other = {**workflow, "name": "release"}
+    asyncio.run(executor.run_workflow(other, {sid: make(sid) for sid in calls}))
+    assert calls == {"safe": 1, "unsafe": 1}
+    assert policy.stats(("release", "safe")).fired == 0
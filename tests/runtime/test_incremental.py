@@ -0,0 +1,84 @@
+import asyncio
+import copy
+
+import pytest
+
+from axiomflow.runtime.executor import WorkflowExecutor
+
+# ``a`` feeds ``b`` and ``c``; ``b`` feeds ``d``.
+WORKFLOW = {
+    "steps": [
+        {"id": "a", "inputs": {"seed": "seed"}, "outputs": {"v": "int"}},
+        {"id": "b", "inputs": {"v": "a.v", "k": 1}, "outputs": {"v": "int"}},
+        {"id": "c", "inputs": {"v": "a.v"}, "outputs": {"v": "int"}},
+        {"id": "d", "inputs": {"v": "b.v"}, "outputs": {"v": "int"}},
+    ],
+    "edges": [
+        {"from": "a", "to": "b"},
+        {"from": "a", "to": "c"},
+        {"from": "b", "to": "d"},
+    ],
+}
+
+# The same workflow with a changed literal input of ``b``.
+EDITED = copy.deepcopy(WORKFLOW)
+EDITED["steps"][1]["inputs"]["k"] = 5
+
+
+async def _step(v=0, seed=0, k=0):
+    return {"v": v + seed + k + 1}
+
+
+FUNCS = dict.fromkeys("abcd", _step)
+
+
+def test_only_dirty_subgraph_reruns(tmp_path, record, calls):
+    executor = WorkflowExecutor(journal_dir=tmp_path)
+    funcs = record(FUNCS)
+
+    def run(workflow, **kwargs):
+        calls.clear()
+        return asyncio.run(
+            executor.run_workflow(workflow, funcs, inputs={"seed": 1}, **kwargs)
+        )
+
+    first = run(WORKFLOW)
+    assert sorted(calls) == ["a", "b", "c", "d"]
+
+    edited = run(EDITED, base_run=first["run_id"])
+    assert sorted(calls) == ["b", "d"]
+    assert sorted(edited["reused"]) == ["a", "c"]
+    assert edited["outputs"] == {"c": {"v": 3}, "d": {"v": 9}}
+
+    # The edited run holds every result, so it can be the next base.
+    again = run(EDITED, base_run=edited["run_id"])
+    assert calls == []
+    assert again["outputs"] == edited["outputs"]
+
+
+def test_changed_workflow_input_dirties_readers(tmp_path, record, calls):
+    executor = WorkflowExecutor(journal_dir=tmp_path)
+    funcs = record(FUNCS)
+    first = asyncio.run(executor.run_workflow(WORKFLOW, funcs, inputs={"seed": 1}))
+    calls.clear()
+    asyncio.run(
+        executor.run_workflow(
+            WORKFLOW, funcs, inputs={"seed": 2}, base_run=first["run_id"]
+        )
+    )
+    assert sorted(calls) == ["a", "b", "c", "d"]
+
+
+def test_base_run_requires_journal(tmp_path):
+    inputs = {"seed": 1}
+    with pytest.raises(RuntimeError):
+        asyncio.run(
+            WorkflowExecutor().run_workflow(
+                WORKFLOW, FUNCS, inputs=inputs, base_run="missing"
+            )
+        )
+    executor = WorkflowExecutor(journal_dir=tmp_path)
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(
+            executor.run_workflow(WORKFLOW, FUNCS, inputs=inputs, base_run="x")
+        )
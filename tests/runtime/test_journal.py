@@ -0,0 +1,199 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from axiomflow.dsl.parser import WorkflowParser
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.journal import JournalState, RunJournal
+from axiomflow.runtime.recovery import SINGLE_ATTEMPT
+
+CHAIN_YAML = """
+workflow:
+  name: chain
+  version: "1.0.0"
+  inputs:
+    - name: seed
+      type: int
+  personas:
+    - id: dev
+      name: Developer
+      role: coder
+      capabilities: [code]
+  steps:
+    - id: one
+      persona: dev
+      inputs:
+        seed: seed
+      outputs:
+        value: int
+    - id: two
+      persona: dev
+      inputs:
+        value: one.value
+      outputs:
+        value: int
+    - id: three
+      persona: dev
+      inputs:
+        value: two.value
+      outputs:
+        value: int
+  edges:
+    - from: one
+      to: two
+    - from: two
+      to: three
+  gates: []
+"""
+
+
+class Crash(Exception):
+    pass
+
+
+def test_resume_executes_only_remaining_frontier(tmp_path):
+    plan = WorkflowParser().compile(CHAIN_YAML)
+    calls: list[str] = []
+    crash = True
+
+    async def one(seed):
+        calls.append("one")
+        return {"value": seed + 1, "cost": 1.0}
+
+    async def two(value):
+        calls.append("two")
+        return {"value": value * 10, "cost": 2.0}
+
+    async def three(value):
+        calls.append("three")
+        if crash:
+            raise Crash()
+        return {"value": value + 5, "cost": 3.0}
+
+    funcs = {"one": one, "two": two, "three": three}
+    executor = WorkflowExecutor(journal_dir=tmp_path)
+    with pytest.raises(Crash):
+        asyncio.run(
+            executor.run_workflow(plan, funcs, inputs={"seed": 1}, run_id="r1")
+        )
+    assert calls.count("one") == 1 and calls.count("two") == 1
+
+    crash = False
+    calls.clear()
+    result = asyncio.run(executor.resume("r1", plan, funcs))
+    assert calls == ["three"]
+    assert result["outputs"] == {"three": {"value": 25}}
+    assert result["cost"] == 3.0
+    assert JournalState.load(tmp_path / "r1.jsonl").finished
+
+
+def test_changed_step_definition_is_rerun_with_descendants(tmp_path):
+    calls: list[str] = []
+
+    def passthrough(sid):
+        def step(**kwargs):
+            calls.append(sid)
+            return {"value": next(iter(kwargs.values()))}
+
+        return step
+
+    funcs = {sid: passthrough(sid) for sid in ("one", "two", "three")}
+    executor = WorkflowExecutor(journal_dir=tmp_path)
+    plan = WorkflowParser().compile(CHAIN_YAML)
+    asyncio.run(executor.run_workflow(plan, funcs, inputs={"seed": 1}, run_id="r"))
+    edited = WorkflowParser().compile(
+        CHAIN_YAML.replace("seed: seed", "seed: seed\n      action: v2")
+    )
+    calls.clear()
+    asyncio.run(executor.resume("r", edited, funcs))
+    assert calls == ["one", "two", "three"]
+
+
+def test_later_resume_compares_against_previous_resume(tmp_path):
+    calls: list[str] = []
+    crash = True
+
+    def passthrough(sid):
+        def step(**kwargs):
+            calls.append(sid)
+            if sid == "three" and crash:
+                raise Crash()
+            return {"value": next(iter(kwargs.values()))}
+
+        return step
+
+    funcs = {sid: passthrough(sid) for sid in ("one", "two", "three")}
+    executor = WorkflowExecutor(journal_dir=tmp_path, default_retry=SINGLE_ATTEMPT)
+    plan = WorkflowParser().compile(CHAIN_YAML)
+    with pytest.raises(Crash):
+        asyncio.run(
+            executor.run_workflow(plan, funcs, inputs={"seed": 1}, run_id="r")
+        )
+    edited = WorkflowParser().compile(
+        CHAIN_YAML.replace("seed: seed", "seed: seed\n      action: v2")
+    )
+    calls.clear()
+    with pytest.raises(Crash):
+        asyncio.run(executor.resume("r", edited, funcs))
+    assert calls == ["one", "two", "three"]
+
+    # The edited steps that finished during the first resume are kept.
+    crash = False
+    calls.clear()
+    asyncio.run(executor.resume("r", edited, funcs))
+    assert calls == ["three"]
+    calls.clear()
+    result = asyncio.run(executor.resume("r", edited, funcs))
+    assert calls == []
+    assert result["outputs"] == {"three": {"value": 1}}
+
+
+def test_truncated_journal_tail_is_ignored(tmp_path):
+    path = tmp_path / "run.jsonl"
+    with RunJournal(path) as journal:
+        journal.append("run_start", inputs={}, fingerprints={})
+        journal.append("step_finish", step="a", digest=None)
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"event": "step_fin')
+    state = JournalState.load(path)
+    assert state.completed == {}
+    assert not state.finished
+
+
+def test_group_commit_keeps_per_record_overhead_low(tmp_path):
+    journal = RunJournal(tmp_path / "perf.jsonl", commit_interval=0.01)
+    for i in range(2000):
+        journal.append("step_start", step=f"s{i}")
+        journal.maybe_commit()
+    journal.close()
+    assert journal.stats.records == 2000
+    assert journal.stats.commits < 2000
+    assert journal.stats.seconds_per_record < 0.001
+    lines = (tmp_path / "perf.jsonl").read_text().splitlines()
+    assert json.loads(lines[-1])["step"] == "s1999"
+
+
+def test_executor_commits_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    fsync = os.fsync
+
+    def recording(fd):
+        threads.append(threading.current_thread())
+        fsync(fd)
+
+    monkeypatch.setattr("axiomflow.runtime.journal.os.fsync", recording)
+
+    async def step(**kwargs):
+        await asyncio.sleep(0.02)
+        return {"value": 1}
+
+    executor = WorkflowExecutor(journal_dir=tmp_path)
+    funcs = dict.fromkeys(("one", "two", "three"), step)
+    plan = WorkflowParser().compile(CHAIN_YAML)
+    asyncio.run(executor.run_workflow(plan, funcs, inputs={"seed": 1}, run_id="r"))
+    assert len(threads) >= 2
+    assert threading.main_thread() not in threads
+    assert JournalState.load(tmp_path / "r.jsonl").finished
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from axiomflow.logging import request_id_var
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.pools import LoopLagMonitor, StepPools
+
+
+def _cpu_step(n: int) -> dict:
+    return {"pid": os.getpid(), "total": sum(range(n))}
+
+
+def test_blocking_sync_steps_keep_loop_responsive():
+    workflow = {"steps": [{"id": "a"}, {"id": "b"}], "edges": []}
+
+    def blocking():
+        time.sleep(0.2)
+        return {"runtime": 0.2}
+
+    executor = WorkflowExecutor(max_concurrency=None)
+
+    async def runner():
+        async with LoopLagMonitor(interval=0.005) as monitor:
+            start = time.perf_counter()
+            await executor.run_workflow(workflow, {"a": blocking, "b": blocking})
+            elapsed = time.perf_counter() - start
+        return monitor, elapsed
+
+    monitor, elapsed = asyncio.run(runner())
+    assert elapsed < 0.35
+    assert monitor.samples
+    assert monitor.max_lag < 0.1
+
+
+def test_inline_mode_runs_on_loop_thread_and_thread_mode_does_not():
+    pools = StepPools(max_threads=2)
+    loop_thread = threading.get_ident()
+
+    async def runner():
+        inline = await pools.call(threading.get_ident, "inline")
+        threaded = await pools.call(threading.get_ident, "thread")
+        return inline, threaded
+
+    inline, threaded = asyncio.run(runner())
+    pools.shutdown()
+    assert inline == loop_thread
+    assert threaded != loop_thread
+
+
+def test_thread_mode_preserves_correlation_id():
+    pools = StepPools()
+
+    async def runner():
+        request_id_var.set("req-42")
+        return await pools.call(request_id_var.get, "thread")
+
+    assert asyncio.run(runner()) == "req-42"
+    pools.shutdown()
+
+
+def test_process_mode_uses_warm_worker_processes():
+    pools = StepPools(max_processes=1)
+    executor = WorkflowExecutor(pools=pools)
+    workflow = {
+        "steps": [
+            {
+                "id": "crunch",
+                "execution": "process",
+                "inputs": {"n": 1000},
+                "outputs": {"pid": "int", "total": "int"},
+            }
+        ],
+        "edges": [],
+    }
+
+    async def runner():
+        await pools.warm()
+        return await executor.run_workflow(workflow, {"crunch": _cpu_step})
+
+    try:
+        result = asyncio.run(runner())
+    finally:
+        pools.shutdown()
+    assert result["outputs"]["crunch"]["total"] == sum(range(1000))
+    assert result["outputs"]["crunch"]["pid"] != os.getpid()
+
+
+def test_unknown_execution_mode_rejected():
+    with pytest.raises(ValueError):
+        StepPools().bind(print, "gpu")
@@ -58,3 +58,94 @@ def test_recovery_manager_escalates_after_failures():
         assert escalated
 
     asyncio.run(runner())
+
+
+def test_attempt_timeout_is_retried():
+    async def runner():
+        attempts = 0
+
+        async def hangs_once():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                await asyncio.sleep(10)
+            return "ok"
+
+        manager = RecoveryManager()
+        policy = RetryPolicy(max_attempts=2, base_delay=0)
+        result = await manager.execute(hangs_once, retry_policy=policy, timeout=0.05)
+        assert result == "ok"
+        assert isinstance(manager.errors[0], TimeoutError)
+
+    asyncio.run(runner())
+
+
+def test_retry_skipped_when_backoff_exceeds_deadline():
+    async def runner():
+        calls = 0
+        cleaned = False
+
+        async def fail():
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("nope")
+
+        async def cleanup():
+            nonlocal cleaned
+            cleaned = True
+
+        loop = asyncio.get_running_loop()
+        manager = RecoveryManager()
+        policy = RetryPolicy(max_attempts=5, base_delay=1.0)
+        start = loop.time()
+        with pytest.raises(RuntimeError):
+            await manager.execute(
+                fail, retry_policy=policy, cleanup=cleanup, deadline=start + 0.5
+            )
+        assert calls == 1
+        assert cleaned
+        assert loop.time() - start < 0.5
+
+    asyncio.run(runner())
+
+
+def test_deadline_cancels_hung_attempt_and_runs_cleanup():
+    async def runner():
+        cancelled = False
+        cleaned = False
+
+        async def hang():
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        async def cleanup():
+            nonlocal cleaned
+            cleaned = True
+
+        loop = asyncio.get_running_loop()
+        manager = RecoveryManager()
+        with pytest.raises(TimeoutError, match="time limit"):
+            await manager.execute(
+                hang, cleanup=cleanup, deadline=loop.time() + 0.05
+            )
+        assert cancelled and cleaned
+
+    asyncio.run(runner())
+
+
+def test_error_history_is_bounded():
+    async def runner():
+        async def always_fail():
+            raise RuntimeError("nope")
+
+        manager = RecoveryManager(max_errors=3)
+        policy = RetryPolicy(max_attempts=5, base_delay=0)
+        with pytest.raises(RuntimeError):
+            await manager.execute(always_fail, retry_policy=policy)
+        assert len(manager.errors) == 3
+
+    asyncio.run(runner())
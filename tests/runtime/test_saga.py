@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+
+from axiomflow.runtime.executor import WorkflowExecutor
+
+# ``a`` fans out to ``b`` and ``c``; ``b`` feeds ``d``, which fails.
+WORKFLOW = {
+    "steps": [{"id": sid, "outputs": {"v": "str"}} for sid in "abcd"],
+    "edges": [
+        {"from": "a", "to": "b"},
+        {"from": "a", "to": "c"},
+        {"from": "b", "to": "d"},
+    ],
+}
+
+
+async def _a():
+    await asyncio.sleep(0.01)
+    return {"v": "a"}
+
+
+async def _b():
+    await asyncio.sleep(0.01)
+    return {"v": "b"}
+
+
+async def _c():
+    return {"v": "c"}
+
+
+async def _d():
+    await asyncio.sleep(0.01)
+    raise RuntimeError("d failed")
+
+
+async def _d_fixed():
+    return {"v": "d"}
+
+
+FUNCS = {"a": _a, "b": _b, "c": _c, "d": _d}
+
+
+def _undo(log, delay=0.0):
+    """Return a compensation logging the step whose result it undoes."""
+
+    async def undo(result):
+        log.append(("start", result["v"]))
+        await asyncio.sleep(delay)
+        log.append(("end", result["v"]))
+
+    return undo
+
+
+def test_failure_compensates_completed_steps_in_reverse_order():
+    executor = WorkflowExecutor(max_concurrency=4)
+    log = []
+    compensations = dict.fromkeys("abcd", _undo(log))
+    with pytest.raises(RuntimeError, match="d failed"):
+        asyncio.run(
+            executor.run_workflow(WORKFLOW, FUNCS, compensations=compensations)
+        )
+    undone = [entry[1] for entry in log if entry[0] == "end"]
+    assert sorted(undone) == ["a", "b", "c"]
+    assert undone[-1] == "a"
+
+
+def test_independent_branches_compensate_concurrently():
+    executor = WorkflowExecutor(max_concurrency=4)
+    log = []
+    compensations = dict.fromkeys("bcd", _undo(log, delay=0.05))
+    with pytest.raises(RuntimeError):
+        asyncio.run(
+            executor.run_workflow(WORKFLOW, FUNCS, compensations=compensations)
+        )
+    # b and c both start before either finishes.
+    assert [entry[0] for entry in log] == ["start", "start", "end", "end"]
+
+
+def test_successful_run_is_not_compensated():
+    executor = WorkflowExecutor(max_concurrency=4)
+    log = []
+    asyncio.run(
+        executor.run_workflow(
+            WORKFLOW,
+            {**FUNCS, "d": _d_fixed},
+            compensations=dict.fromkeys("abcd", _undo(log)),
+        )
+    )
+    assert log == []
+
+
+def test_failed_compensation_is_journaled(tmp_path, record, calls):
+    executor = WorkflowExecutor(max_concurrency=4, journal_dir=tmp_path)
+    log = []
+    compensations = dict.fromkeys("abcd", _undo(log))
+
+    def broken(result):
+        raise OSError("cannot undo")
+
+    compensations["b"] = broken
+    with pytest.raises(RuntimeError, match="d failed"):
+        asyncio.run(
+            executor.run_workflow(
+                WORKFLOW, FUNCS, run_id="r1", compensations=compensations
+            )
+        )
+    # The rollback continues upstream of the failed handler.
+    assert [entry[1] for entry in log if entry[0] == "end"][-1] == "a"
+    events = [
+        json.loads(line) for line in (tmp_path / "r1.jsonl").read_text().splitlines()
+    ]
+    failed = [e for e in events if e["event"] == "compensation_failed"]
+    assert [e["step"] for e in failed] == ["b"]
+    compensated = {e["step"] for e in events if e["event"] == "step_compensated"}
+    assert compensated == {"a", "c"}
+
+    # Resuming re-runs the compensated steps and everything downstream.
+    asyncio.run(executor.resume("r1", WORKFLOW, record({**FUNCS, "d": _d_fixed})))
+    assert sorted(calls) == ["a", "b", "c", "d"]
+
+
+def test_unknown_compensation_step_is_rejected():
+    executor = WorkflowExecutor()
+    with pytest.raises(ValueError, match="unknown step z"):
+        asyncio.run(
+            executor.run_workflow(
+                WORKFLOW, FUNCS, compensations={"z": lambda result: None}
+            )
+        )
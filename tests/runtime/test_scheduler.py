@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.scheduler import ResourceScheduler
+
+
+def _workflow(steps):
+    return {
+        "steps": [
+            {"id": sid, "estimated_cpu": cpu, "estimated_memory": mem}
+            for sid, cpu, mem in steps
+        ],
+        "edges": [],
+    }
+
+
+def _tracking_funcs(ids, log, scheduler, delay=0.02):
+    def make(sid):
+        async def step():
+            log.append((sid, scheduler.cpu_in_use, scheduler.memory_in_use))
+            await asyncio.sleep(delay)
+            return {}
+
+        return step
+
+    return {sid: make(sid) for sid in ids}
+
+
+def test_running_steps_never_exceed_node_budget():
+    scheduler = ResourceScheduler(cpu=4, memory=1024)
+    workflow = _workflow([(f"s{i}", 2, 512) for i in range(6)])
+    log: list = []
+    funcs = _tracking_funcs([f"s{i}" for i in range(6)], log, scheduler)
+    executor = WorkflowExecutor(max_concurrency=None, scheduler=scheduler)
+    result = asyncio.run(executor.run_workflow(workflow, funcs))
+    assert len(log) == 6
+    assert max(cpu for _, cpu, _ in log) <= 4
+    assert max(mem for _, _, mem in log) <= 1024
+    assert scheduler.cpu_in_use == 0 and scheduler.memory_in_use == 0
+    waits = sorted(result["queue_wait"].values())
+    assert waits[0] < 0.01 and waits[-1] >= 0.03
+
+
+def test_small_steps_backfill_around_large_step():
+    scheduler = ResourceScheduler(cpu=4, memory=1000)
+    # "big" has the highest priority but does not fit next to "medium".
+    workflow = _workflow([("medium", 2, 600), ("big", 2, 800), ("small", 1, 100)])
+    workflow["steps"][1]["estimated_runtime"] = 10
+    log: list = []
+    funcs = _tracking_funcs(["medium", "big", "small"], log, scheduler)
+    executor = WorkflowExecutor(max_concurrency=None, scheduler=scheduler)
+    asyncio.run(executor.run_workflow(workflow, funcs))
+    assert [sid for sid, _, _ in log][:2] == ["big", "small"]
+
+
+def test_scheduler_shared_between_concurrent_runs():
+    scheduler = ResourceScheduler(cpu=2, memory=100)
+    log: list = []
+    executor = WorkflowExecutor(max_concurrency=None, scheduler=scheduler)
+
+    async def runner():
+        runs = []
+        for name in ("a", "b", "c"):
+            workflow = _workflow([(name, 2, 50)])
+            runs.append(
+                executor.run_workflow(
+                    workflow, _tracking_funcs([name], log, scheduler)
+                )
+            )
+        await asyncio.gather(*runs)
+
+    asyncio.run(runner())
+    assert [cpu for _, cpu, _ in log] == [2, 2, 2]
+
+
+def test_step_larger_than_node_rejected():
+    scheduler = ResourceScheduler(cpu=1, memory=100)
+    executor = WorkflowExecutor(scheduler=scheduler)
+    workflow = _workflow([("huge", 1, 500)])
+    with pytest.raises(ValueError, match="node budget"):
+        asyncio.run(executor.run_workflow(workflow, {"huge": lambda: {}}))
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.pools import StepPools
+from axiomflow.runtime.shm import SharedBuffer, contains_shared, export, free
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+
+
+def _produce() -> bytes:
+    return PAYLOAD
+
+
+def _produce_item(item) -> bytes:
+    return PAYLOAD[:-item]
+
+
+def _produce_extra() -> dict:
+    return {"blob": PAYLOAD, "extra": PAYLOAD}
+
+
+def _produce_slowly() -> bytes:
+    time.sleep(0.2)
+    return PAYLOAD
+
+
+def _checksum(blob) -> dict:
+    return {"size": len(blob), "head": bytes(blob[:4])}
+
+
+def _segment_exists(handle: SharedBuffer) -> bool:
+    if handle.backend == "file":
+        return os.path.exists(handle.name)
+    return os.path.exists(f"/dev/shm/{handle.name.lstrip('/')}")
+
+
+def test_export_attach_and_free_roundtrip():
+    handle = export(PAYLOAD, threshold=1024)
+    assert isinstance(handle, SharedBuffer)
+    assert handle.nbytes == len(PAYLOAD)
+    view = handle.attach()
+    assert bytes(view.value) == PAYLOAD
+    with pytest.raises(TypeError):
+        view.value[0] = 1
+    view.close()
+    free(handle)
+    with pytest.raises(FileNotFoundError):
+        handle.attach()
+
+
+def test_small_values_are_not_exported():
+    assert export(b"tiny", threshold=1024) == b"tiny"
+    assert export({"x": 1}, threshold=1) == {"x": 1}
+
+
+def test_file_backend(tmp_path):
+    handle = export(PAYLOAD, threshold=1, spill_dir=str(tmp_path))
+    assert handle.backend == "file"
+    view = handle.attach()
+    assert bytes(view.value[:256]) == bytes(range(256))
+    view.close()
+    free(handle)
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("spill", [False, True])
+def test_process_outputs_are_shared_with_consumers(tmp_path, spill):
+    workflow = {
+        "steps": [
+            {"id": "produce", "outputs": ["blob"], "execution": "process"},
+            {
+                "id": "in_process",
+                "inputs": {"blob": "produce.blob"},
+                "outputs": ["size", "head"],
+                "execution": "process",
+            },
+            {
+                "id": "in_thread",
+                "inputs": {"blob": "produce.blob"},
+                "outputs": ["size", "head"],
+                "execution": "thread",
+            },
+        ],
+        "edges": [],
+    }
+    pools = StepPools(
+        max_processes=2, share_threshold=1024, spill_dir=tmp_path if spill else None
+    )
+    executor = WorkflowExecutor(max_concurrency=None, pools=pools)
+    handles = []
+    record = executor._record
+
+    def spy(run, step, result, cached):
+        if isinstance(result, SharedBuffer):
+            handles.append(result)
+        record(run, step, result, cached)
+
+    executor._record = spy
+    try:
+        result = asyncio.run(
+            executor.run_workflow(
+                workflow,
+                {"produce": _produce, "in_process": _checksum, "in_thread": _checksum},
+            )
+        )
+    finally:
+        pools.shutdown()
+    expected = {"size": len(PAYLOAD), "head": bytes(range(4))}
+    assert result["outputs"] == {"in_process": expected, "in_thread": expected}
+    assert len(handles) == 1
+    assert handles[0].backend == ("file" if spill else "shm")
+    assert not _segment_exists(handles[0])
+
+
+def test_shared_sink_outputs_are_copied_out(tmp_path):
+    workflow = {
+        "steps": [{"id": "produce", "outputs": ["blob"], "execution": "process"}],
+        "edges": [],
+    }
+    pools = StepPools(max_processes=1, share_threshold=1024, spill_dir=tmp_path)
+    executor = WorkflowExecutor(pools=pools)
+    try:
+        result = asyncio.run(executor.run_workflow(workflow, {"produce": _produce}))
+    finally:
+        pools.shutdown()
+    assert result["outputs"]["produce"]["blob"] == PAYLOAD
+    assert not list(tmp_path.iterdir())
+
+
+def test_contains_shared_searches_nested_containers():
+    handle = SharedBuffer("x", 1)
+    assert contains_shared({"out": [None, {"blob": handle}]})
+    assert contains_shared((1, [handle]))
+    assert not contains_shared({"out": [b"x", {"n": 1}]})
+
+
+def test_foreach_process_outputs_are_copied_out_and_freed(tmp_path):
+    workflow = {
+        "steps": [
+            {
+                "id": "produce",
+                "inputs": {"items": "items"},
+                "outputs": ["blobs", "errors"],
+                "foreach": {"input": "items", "as": "item"},
+                "execution": "process",
+            }
+        ],
+        "edges": [],
+    }
+    pools = StepPools(max_processes=2, share_threshold=1024, spill_dir=tmp_path)
+    executor = WorkflowExecutor(pools=pools)
+    try:
+        result = asyncio.run(
+            executor.run_workflow(
+                workflow, {"produce": _produce_item}, inputs={"items": [1, 2, 3]}
+            )
+        )
+    finally:
+        pools.shutdown()
+    blobs = result["outputs"]["produce"]["blobs"]
+    assert blobs == [PAYLOAD[:-1], PAYLOAD[:-2], PAYLOAD[:-3]]
+    assert not list(tmp_path.iterdir())
+
+
+def test_undeclared_shared_outputs_are_freed(tmp_path):
+    workflow = {
+        "steps": [{"id": "produce", "outputs": ["blob"], "execution": "process"}],
+        "edges": [],
+    }
+    pools = StepPools(max_processes=1, share_threshold=1024, spill_dir=tmp_path)
+    executor = WorkflowExecutor(pools=pools)
+    try:
+        result = asyncio.run(
+            executor.run_workflow(workflow, {"produce": _produce_extra})
+        )
+    finally:
+        pools.shutdown()
+    assert result["outputs"]["produce"] == {"blob": PAYLOAD}
+    assert not list(tmp_path.iterdir())
+
+
+def test_outputs_of_cancelled_process_calls_are_freed(tmp_path):
+    pools = StepPools(max_processes=1, share_threshold=1024, spill_dir=tmp_path)
+
+    async def main():
+        await pools.warm()
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(pools.call(_produce_slowly, "process"), 0.05)
+
+    try:
+        asyncio.run(main())
+    finally:
+        # Waits for the abandoned call to finish in the worker.
+        pools.shutdown()
+    assert not list(tmp_path.iterdir())
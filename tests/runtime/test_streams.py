@@ -0,0 +1,195 @@
+import asyncio
+import time
+
+import pytest
+
+from axiomflow.dsl.plan import ExecutionPlan
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.streams import StreamChannel
+
+PIPELINE = {
+    "steps": [
+        {"id": "generate", "outputs": ["item"]},
+        {"id": "review", "inputs": {"items": "generate.item"}, "outputs": ["item"]},
+        {"id": "test", "inputs": {"items": "review.item"}, "outputs": ["passed"]},
+    ],
+    "edges": [
+        {"from": "generate", "to": "review", "stream": True},
+        {"from": "review", "to": "test", "stream": True},
+    ],
+}
+
+
+def test_plan_marks_streaming_inputs():
+    plan = ExecutionPlan.from_workflow(PIPELINE)
+    assert plan.stream_consumers == ((1,), (2,), ())
+    assert plan.steps[1].inputs[0].stream
+
+
+def test_pipeline_overlaps_stages():
+    events = []
+
+    async def generate():
+        for i in range(5):
+            await asyncio.sleep(0.02)
+            events.append(("generate", i))
+            yield i
+
+    async def review(items):
+        async for item in items:
+            events.append(("review", item))
+            yield item * 10
+
+    async def check(items):
+        seen = []
+        async for item in items:
+            events.append(("test", item))
+            seen.append(item)
+        return {"passed": seen}
+
+    executor = WorkflowExecutor(max_concurrency=1)
+    start = time.perf_counter()
+    result = asyncio.run(
+        executor.run_workflow(
+            PIPELINE, {"generate": generate, "review": review, "test": check}
+        )
+    )
+    elapsed = time.perf_counter() - start
+    assert result["outputs"]["test"] == {"passed": [0, 10, 20, 30, 40]}
+    # The first item reaches the end of the chain before generation ends.
+    assert events.index(("test", 0)) < events.index(("generate", 4))
+    assert elapsed < 0.3
+
+
+def test_bounded_channel_applies_backpressure():
+    workflow = {
+        "steps": [
+            {"id": "produce", "outputs": ["n"]},
+            {"id": "consume", "inputs": {"items": "produce.n"}, "outputs": ["total"]},
+        ],
+        "edges": [{"from": "produce", "to": "consume", "stream": True}],
+    }
+    produced = []
+    lead = []
+
+    async def produce():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    async def consume(items):
+        total = 0
+        consumed = 0
+        async for item in items:
+            consumed += 1
+            lead.append(len(produced) - consumed)
+            await asyncio.sleep(0.001)
+            total += item
+        return {"total": total}
+
+    executor = WorkflowExecutor(stream_buffer=2)
+    result = asyncio.run(
+        executor.run_workflow(workflow, {"produce": produce, "consume": consume})
+    )
+    assert result["outputs"]["consume"] == {"total": sum(range(20))}
+    assert max(lead) <= 3
+
+
+def test_consumer_stopping_early_does_not_block_producer():
+    workflow = {
+        "steps": [
+            {"id": "produce", "outputs": ["n"]},
+            {"id": "first", "inputs": {"items": "produce.n"}, "outputs": ["value"]},
+        ],
+        "edges": [{"from": "produce", "to": "first", "stream": True}],
+    }
+
+    async def produce():
+        for i in range(100):
+            yield i
+
+    async def first(items):
+        async for item in items:
+            return {"value": item}
+
+    executor = WorkflowExecutor(stream_buffer=1)
+    result = asyncio.run(
+        asyncio.wait_for(
+            executor.run_workflow(workflow, {"produce": produce, "first": first}),
+            timeout=1,
+        )
+    )
+    assert result["outputs"]["first"] == {"value": 0}
+
+
+def test_producer_failure_reaches_consumer():
+    async def generate():
+        yield 1
+        raise RuntimeError("generator broke")
+
+    async def review(items):
+        async for item in items:
+            yield item
+
+    async def check(items):
+        return {"passed": [item async for item in items]}
+
+    executor = WorkflowExecutor()
+    with pytest.raises(RuntimeError, match="generator broke"):
+        asyncio.run(
+            executor.run_workflow(
+                PIPELINE, {"generate": generate, "review": review, "test": check}
+            )
+        )
+
+
+def test_streaming_producer_must_be_async_generator():
+    async def review(items):
+        yield items
+
+    async def check(items):
+        return {}
+
+    executor = WorkflowExecutor()
+    with pytest.raises(ValueError, match="async generator"):
+        asyncio.run(
+            executor.run_workflow(
+                PIPELINE, {"generate": lambda: [1], "review": review, "test": check}
+            )
+        )
+
+
+def test_closed_channel_drops_items():
+    async def scenario():
+        channel = StreamChannel(maxsize=1)
+        await channel.send(1)
+        channel.close()
+        await channel.send(2)
+        return channel
+
+    channel = asyncio.run(scenario())
+    assert channel.closed
+
+
+def test_full_channel_ends_without_growing():
+    async def drain(channel):
+        return [item async for item in channel]
+
+    async def scenario():
+        finished = StreamChannel(maxsize=2)
+        await finished.send(1)
+        await finished.send(2)
+        finished.finish()
+        assert finished._queue.maxsize == 2
+        items = await drain(finished)
+        assert await drain(finished) == []
+
+        failed = StreamChannel(maxsize=1)
+        await failed.send(1)
+        failed.fail(ValueError("boom"))
+        assert await failed.__anext__() == 1
+        with pytest.raises(ValueError, match="boom"):
+            await failed.__anext__()
+        return items
+
+    assert asyncio.run(scenario()) == [1, 2]
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.taskqueue import (
+    LEASE_EXPIRED,
+    QueueWorker,
+    RedisTaskQueue,
+    RemoteStepError,
+    SQLiteTaskQueue,
+)
+
+WORKFLOW = {
+    "steps": [
+        {"id": "a", "inputs": {"x": "x"}, "outputs": {"y": "int"}},
+        {"id": "b", "inputs": {"y": "a.y"}, "outputs": {"z": "int"}},
+    ],
+    "edges": [{"from": "a", "to": "b"}],
+}
+
+
+async def _double(x):
+    return {"y": x * 2}
+
+
+def _inc(y):
+    return {"z": y + 1}
+
+
+def test_claim_complete_roundtrip(tmp_path):
+    queue = SQLiteTaskQueue(tmp_path / "q.db")
+    queue.put("t1", {"step": "a", "kwargs": {}})
+    task = queue.claim("w1", lease=10)
+    assert task.id == "t1" and task.deliveries == 1
+    assert queue.claim("w2", lease=10) is None
+    assert queue.outcome("t1") is None
+    assert queue.heartbeat("t1", task.token, 10)
+    assert not queue.complete("t1", "stale", 1)
+    assert queue.complete("t1", task.token, {"y": 2})
+    assert queue.outcome("t1").value == {"y": 2}
+    queue.discard("t1")
+    assert queue.outcome("t1") is None
+
+
+def test_expired_lease_is_redelivered_then_failed(tmp_path):
+    queue = SQLiteTaskQueue(tmp_path / "q.db", max_deliveries=2)
+    queue.put("t1", {})
+    first = queue.claim("w1", lease=0.01)
+    time.sleep(0.02)
+    second = queue.claim("w2", lease=0.01)
+    assert second.id == "t1" and second.deliveries == 2
+    assert not queue.heartbeat("t1", first.token, 10)
+    time.sleep(0.02)
+    outcome = queue.outcome("t1")
+    assert not outcome.ok and outcome.value == LEASE_EXPIRED
+    assert queue.claim("w3", lease=10) is None
+
+
+def test_workflow_runs_on_queue_workers(tmp_path):
+    queue = SQLiteTaskQueue(tmp_path / "q.db", poll_interval=0.01)
+    funcs = {"a": _double, "b": _inc}
+    executor = WorkflowExecutor(task_queue=queue)
+
+    async def main():
+        stop = asyncio.Event()
+        workers = [QueueWorker(queue, funcs, lease=1.0) for _ in range(2)]
+        running = [asyncio.create_task(w.run(stop)) for w in workers]
+        try:
+            result = await executor.run_workflow(WORKFLOW, funcs, inputs={"x": 3})
+        finally:
+            stop.set()
+        return result, sum(await asyncio.gather(*running))
+
+    result, processed = asyncio.run(main())
+    assert result["outputs"] == {"b": {"z": 7}}
+    assert processed == 2
+
+
+def test_settled_tasks_are_discarded_off_the_event_loop(tmp_path):
+    threads = []
+
+    class Recording(SQLiteTaskQueue):
+        def discard(self, task_id):
+            threads.append(threading.current_thread())
+            super().discard(task_id)
+
+    queue = Recording(tmp_path / "q.db", poll_interval=0.01)
+    funcs = {"a": _double, "b": _inc}
+    executor = WorkflowExecutor(task_queue=queue)
+
+    async def main():
+        stop = asyncio.Event()
+        worker = asyncio.create_task(QueueWorker(queue, funcs).run(stop))
+        try:
+            await executor.run_workflow(WORKFLOW, funcs, inputs={"x": 3})
+        finally:
+            stop.set()
+            await worker
+
+    asyncio.run(main())
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_remote_failure_is_raised(tmp_path):
+    queue = SQLiteTaskQueue(tmp_path / "q.db", poll_interval=0.01)
+
+    def broken(x):
+        raise KeyError(x)
+
+    funcs = {"a": broken, "b": _inc}
+    executor = WorkflowExecutor(task_queue=queue)
+
+    async def main():
+        stop = asyncio.Event()
+        worker = asyncio.create_task(QueueWorker(queue, funcs).run(stop))
+        try:
+            await executor.run_workflow(WORKFLOW, funcs, inputs={"x": 3})
+        finally:
+            stop.set()
+            await worker
+
+    with pytest.raises(RemoteStepError, match="KeyError"):
+        asyncio.run(main())
+
+
+def test_lost_lease_cancels_worker_step(tmp_path):
+    queue = SQLiteTaskQueue(tmp_path / "q.db")
+
+    async def main():
+        seen = []
+
+        async def slow(x):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                seen.append("cancelled")
+                raise
+
+        queue.put("t1", {"step": "a", "kwargs": {"x": 1}})
+        worker = QueueWorker(queue, {"a": slow}, lease=0.06)
+        run = asyncio.create_task(worker.run_once())
+        await asyncio.sleep(0.01)
+        queue.discard("t1")
+        await asyncio.wait_for(run, 1.0)
+        return seen
+
+    assert asyncio.run(main()) == ["cancelled"]
+
+
+@pytest.mark.skipif("REDIS_URL" not in os.environ, reason="needs a Redis server")
+def test_redis_queue_roundtrip():
+    queue = RedisTaskQueue(url=os.environ["REDIS_URL"], prefix="axiomflow:test")
+    queue.put("t1", {"step": "a"})
+    task = queue.claim("w1", lease=10)
+    assert task.payload == {"step": "a"}
+    assert queue.complete("t1", task.token, [1, 2])
+    assert queue.outcome("t1").value == [1, 2]
+    queue.discard("t1")
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+from cryptography.fernet import Fernet
+
+from axiomflow.logging import request_id_var
+from axiomflow.runtime.context import Context, ContextManager
+from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.recovery import RecoveryManager, RetryPolicy
+from axiomflow.runtime.router import AgentRouter
+from axiomflow.runtime.tracing import Tracer, current_tracer, span
+
+
+def _spans(trace):
+    return [e for e in trace["traceEvents"] if e["ph"] == "X"]
+
+
+def test_span_is_noop_without_tracer():
+    assert current_tracer() is None
+    with span("idle"):
+        pass
+
+
+def test_spans_carry_lane_and_request_id(tmp_path):
+    tracer = Tracer("test")
+    token = request_id_var.set("req-1")
+    try:
+        with tracer.activate():
+            with span("outer", lane="step-a"):
+                with span("inner", detail=1):
+                    pass
+            with pytest.raises(ValueError):
+                with span("broken"):
+                    raise ValueError
+    finally:
+        request_id_var.reset(token)
+    trace = json.loads(tracer.export(tmp_path / "t.json").read_text())
+    spans = {e["name"]: e for e in _spans(trace)}
+    assert spans["inner"]["tid"] == spans["outer"]["tid"]
+    assert spans["broken"]["tid"] != spans["outer"]["tid"]
+    assert spans["inner"]["args"] == {"detail": 1, "request_id": "req-1"}
+    assert spans["broken"]["args"]["error"] == "ValueError"
+    lanes = {
+        e["args"]["name"] for e in trace["traceEvents"] if e["name"] == "thread_name"
+    }
+    assert lanes == {"step-a", "run"}
+
+
+def test_executor_writes_trace_per_run(tmp_path):
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("transient")
+        return {"v": 1}
+
+    async def after(v):
+        return {"w": v + 1}
+
+    workflow = {
+        "steps": [
+            {
+                "id": "flaky",
+                "outputs": {"v": "int"},
+                "retry": {"max_attempts": 2, "base_delay": 0.01},
+            },
+            {"id": "after", "inputs": {"v": "flaky.v"}, "outputs": {"w": "int"}},
+        ],
+        "edges": [{"from": "flaky", "to": "after"}],
+    }
+    executor = WorkflowExecutor(trace_dir=tmp_path)
+    result = asyncio.run(
+        executor.run_workflow(workflow, {"flaky": flaky, "after": after})
+    )
+    trace = json.loads((tmp_path / f"{result['run_id']}.trace.json").read_text())
+    spans = _spans(trace)
+    names = [e["name"] for e in spans]
+    assert names.count("attempt") == 3
+    assert names.count("backoff") == 1
+    assert names.count("queued") == 2
+    assert {"run", "flaky", "after"} <= set(names)
+    flaky_lane = next(e["tid"] for e in spans if e["name"] == "flaky")
+    failed = [e for e in spans if e["name"] == "attempt" and "error" in e["args"]]
+    assert [e["tid"] for e in failed] == [flaky_lane]
+
+
+def test_router_and_handoff_emit_spans():
+    class Model:
+        async def score(self, features):
+            return features["load"]
+
+    agent = {"id": "a", "skills": {"x"}, "load": 0.1, "policies": set()}
+    agents = [{**agent, "status": "available"}]
+    manager = ContextManager(Fernet.generate_key(), {"a"})
+    tracer = Tracer()
+
+    async def main():
+        with tracer.activate():
+            await AgentRouter(Model()).route_task(
+                {"required_skill": "x"}, agents, correlation_id="corr"
+            )
+            await manager.handoff_context(Context.create({"k": 1}), "a")
+
+    asyncio.run(main())
+    spans = {e["name"]: e for e in _spans(tracer.to_dict())}
+    assert spans["route_task"]["args"] == {"skill": "x", "request_id": "corr"}
+    assert spans["handoff_context"]["args"]["recipient"] == "a"
+
+
+def test_recovery_records_cleanup_span():
+    tracer = Tracer()
+
+    async def main():
+        with tracer.activate():
+            await RecoveryManager().execute(
+                lambda: 1,
+                retry_policy=RetryPolicy(max_attempts=1),
+                cleanup=lambda: None,
+            )
+
+    asyncio.run(main())
+    assert [e["name"] for e in _spans(tracer.to_dict())] == ["attempt", "cleanup"]
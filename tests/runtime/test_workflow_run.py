@@ -1,7 +1,11 @@
 import asyncio
 
+import pytest
+
 from axiomflow.dsl.parser import WorkflowParser
+from axiomflow.dsl.plan import ExecutionPlan
 from axiomflow.runtime.executor import WorkflowExecutor
+from axiomflow.runtime.results import ResultStore
 
 WORKFLOW_YAML = """
 workflow:
@@ -71,5 +75,179 @@ def test_dry_run_produces_no_calls():
 
     executor = WorkflowExecutor()
     step_funcs = {"step1": recorder, "step2": recorder}
-    asyncio.run(executor.run_workflow(workflow, step_funcs, dry_run=True))
+    result = asyncio.run(executor.run_workflow(workflow, step_funcs, dry_run=True))
     assert not calls
+    assert result["simulation"]["makespan"] == workflow["estimates"]["makespan"]
+
+
+FAN_OUT_WORKFLOW = {
+    "steps": [{"id": "root"}] + [{"id": f"branch{i}"} for i in range(5)],
+    "edges": [{"from": "root", "to": f"branch{i}"} for i in range(5)],
+}
+
+
+def test_concurrent_mode_runs_independent_branches_in_parallel():
+    active = 0
+    peak = 0
+
+    async def step():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return {"runtime": 0.05, "cost": 1.0}
+
+    executor = WorkflowExecutor(max_concurrency=3)
+    step_funcs = {s["id"]: step for s in FAN_OUT_WORKFLOW["steps"]}
+    actual = asyncio.run(executor.run_workflow(FAN_OUT_WORKFLOW, step_funcs))
+    assert peak == 3
+    assert actual["cost"] == 6.0
+    assert abs(actual["runtime"] - 0.3) < 1e-9
+
+
+def test_concurrent_mode_cancels_siblings_on_failure():
+    cancelled: list[str] = []
+
+    async def root():
+        return {}
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    def slow(name: str):
+        async def run():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+
+        return run
+
+    step_funcs = {"root": root, "branch0": fail}
+    step_funcs.update({f"branch{i}": slow(f"branch{i}") for i in range(1, 5)})
+    executor = WorkflowExecutor(max_concurrency=None)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(executor.run_workflow(FAN_OUT_WORKFLOW, step_funcs))
+    assert sorted(cancelled) == ["branch1", "branch2", "branch3", "branch4"]
+
+
+DATAFLOW_YAML = """
+workflow:
+  name: dataflow
+  version: "1.0.0"
+  inputs:
+    - name: repo
+      type: string
+  personas:
+    - id: dev
+      name: Developer
+      role: coder
+      capabilities: [code]
+  steps:
+    - id: fetch
+      persona: dev
+      inputs:
+        url: repo
+      outputs:
+        files: list
+    - id: lint
+      persona: dev
+      inputs:
+        files: fetch.files
+        strict: true
+      outputs:
+        issues: list
+    - id: report
+      persona: dev
+      inputs:
+        issues: lint.issues
+        files: fetch.files
+      outputs:
+        summary: string
+  edges:
+    - from: fetch
+      to: lint
+    - from: lint
+      to: report
+  gates: []
+"""
+
+
+def test_step_inputs_resolved_from_upstream_outputs():
+    workflow = WorkflowParser().parse(DATAFLOW_YAML)
+    seen = {}
+
+    async def fetch(url):
+        seen["url"] = url
+        return {"files": ["a.py", "b.py"], "runtime": 1.0}
+
+    def lint(files, strict):
+        seen["lint"] = (files, strict)
+        return {"issues": [f for f in files if f.startswith("a")]}
+
+    async def report(**kwargs):
+        seen["report"] = kwargs
+        return {"summary": f"{len(kwargs['issues'])}/{len(kwargs['files'])}"}
+
+    executor = WorkflowExecutor()
+    result = asyncio.run(
+        executor.run_workflow(
+            workflow,
+            {"fetch": fetch, "lint": lint, "report": report},
+            inputs={"repo": "git@example"},
+        )
+    )
+    assert seen["url"] == "git@example"
+    assert seen["lint"] == (["a.py", "b.py"], True)
+    assert seen["report"] == {"issues": ["a.py"], "files": ["a.py", "b.py"]}
+    assert result["outputs"] == {"report": {"summary": "1/2"}}
+    assert result["runtime"] == 1.0
+
+
+def test_result_store_frees_outputs_after_last_consumer():
+    plan = ExecutionPlan.from_workflow(WorkflowParser().parse(DATAFLOW_YAML))
+    store = ResultStore(plan, {"repo": "r"})
+    fetch, lint, report = plan.steps
+    store.put(fetch, {"files": [1]})
+    store.release(lint)
+    store.put(lint, {"issues": []})
+    assert len(store) == 2
+    assert store.resolve(report) == {"issues": [], "files": [1]}
+    store.release(report)
+    assert len(store) == 0
+
+
+def test_missing_workflow_input_rejected():
+    workflow = WorkflowParser().parse(DATAFLOW_YAML)
+    funcs = {sid: _step1 for sid in ("fetch", "lint", "report")}
+    with pytest.raises(ValueError, match="repo"):
+        asyncio.run(WorkflowExecutor().run_workflow(workflow, funcs))
+
+
+def test_ready_queue_prefers_longest_remaining_path():
+    # "short" and "head" are both ready at start; "head" leads a long chain.
+    workflow = {
+        "steps": [
+            {"id": "short", "estimated_runtime": 5.0},
+            {"id": "head", "estimated_runtime": 1.0},
+            {"id": "tail", "estimated_runtime": 10.0},
+        ],
+        "edges": [{"from": "head", "to": "tail"}],
+    }
+    started: list[str] = []
+
+    def make(name):
+        async def step():
+            started.append(name)
+            return {}
+
+        return step
+
+    executor = WorkflowExecutor(max_concurrency=1)
+    funcs = {sid: make(sid) for sid in ("short", "head", "tail")}
+    asyncio.run(executor.run_workflow(workflow, funcs))
+    assert started == ["head", "tail", "short"]
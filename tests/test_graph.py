@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from axiomflow.core.graph import CycleError, StepGraph
+from axiomflow.dsl.parser import WorkflowParser
+
+
+def _chain_workflow(size: int) -> dict:
+    steps = [
+        {
+            "id": "s0",
+            "persona": "dev",
+            "inputs": {},
+            "outputs": {"result": "string"},
+        }
+    ]
+    for i in range(1, size):
+        steps.append(
+            {
+                "id": f"s{i}",
+                "persona": "dev",
+                "inputs": {"prev": f"s{i - 1}.result"},
+                "outputs": {"result": "string"},
+            }
+        )
+    edges = [{"from": f"s{i - 1}", "to": f"s{i}"} for i in range(1, size)]
+    return {
+        "personas": [{"id": "dev"}],
+        "gates": [],
+        "steps": steps,
+        "edges": edges,
+    }
+
+
+def test_topological_order_and_levels():
+    graph = StepGraph(
+        ["a", "b", "c", "d"], [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")]
+    )
+    assert graph.topological_order() == ["a", "b", "c", "d"]
+    assert graph.levels() == [["a"], ["b", "c"], ["d"]]
+
+
+def test_cycle_is_reported():
+    graph = StepGraph(["a", "b", "c"], [("a", "b"), ("b", "c"), ("c", "b")])
+    assert graph.find_cycle() == ["b", "c", "b"]
+    with pytest.raises(CycleError) as excinfo:
+        graph.topological_order()
+    assert excinfo.value.cycle == ["b", "c", "b"]
+    assert "b -> c -> b" in str(excinfo.value)
+
+
+def test_unknown_edge_endpoint_rejected():
+    with pytest.raises(ValueError):
+        StepGraph(["a"], [("a", "missing")])
+
+
+def test_large_chain_validated_and_ordered():
+    # Far deeper than the recursion limit; timings live in
+    # benchmarks/graph_ordering.py.
+    workflow = _chain_workflow(100_000)
+    WorkflowParser()._validate_semantics(workflow)
+    graph = StepGraph.from_workflow(workflow)
+    order = graph.topological_order()
+    assert order == [f"s{i}" for i in range(100_000)]
+    assert len(graph.levels()) == 100_000
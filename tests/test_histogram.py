@@ -0,0 +1,43 @@
+import pytest
+
+from axiomflow.core.histogram import LatencyHistogram
+
+
+def test_quantiles_within_relative_error():
+    hist = LatencyHistogram(growth=1.02)
+    for i in range(1, 1001):
+        hist.record(i / 1000)
+    assert len(hist) == 1000
+    assert hist.mean == pytest.approx(0.5005)
+    assert hist.quantile(0.5) == pytest.approx(0.5, rel=0.02)
+    assert hist.quantile(0.95) == pytest.approx(0.95, rel=0.02)
+    assert hist.quantile(0.0) == pytest.approx(0.001, rel=0.02)
+    assert hist.quantile(1.0) == 1.0
+
+
+def test_quantile_is_clamped_to_observed_range():
+    hist = LatencyHistogram()
+    hist.record(0.25)
+    assert hist.quantile(0.5) == 0.25
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        LatencyHistogram(growth=1.0)
+    hist = LatencyHistogram()
+    with pytest.raises(ValueError):
+        hist.quantile(0.5)
+    hist.record(1.0)
+    with pytest.raises(ValueError):
+        hist.quantile(1.5)
+
+
+def test_round_trip_through_dict():
+    hist = LatencyHistogram()
+    for value in (0.1, 0.2, 0.4):
+        hist.record(value)
+    copy = LatencyHistogram.from_dict(hist.to_dict())
+    assert len(copy) == 3
+    assert copy.quantile(0.5) == hist.quantile(0.5)
+    assert (copy.min, copy.max, copy.mean) == (hist.min, hist.max, hist.mean)
+    assert len(LatencyHistogram.from_dict(LatencyHistogram().to_dict())) == 0